@@ -0,0 +1,158 @@
+import os
+import sys
+import argparse
+import pandas as pd
+from config import Config
+from simulation.parallel_runner import run_scenarios
+from simulation.result_cache import ResultCache
+from utils.encoding import setup_utf8_output
+from utils.workbook import (excel_to_parameters, export_file_name, prepare_input_data,
+                            prepare_results_data, prepare_metadata, export_to_excel, stopping_rule,
+                            scenario_seeds)
+
+# ==================== КОНСОЛЬНИЙ ПАКЕТНИЙ ЗАПУСК ====================
+# Запуск симуляції для Excel-файлів без графічного інтерфейсу (без tkinter
+# і matplotlib). Вхідні файли мають той самий формат, що й для вкладки
+# "Завантаження даних", а результат — та сама книга, що й "Експорт даних".
+#
+#   python cli.py файл1.xlsx [файл2.xlsx ...] [--workers N] [--output-dir ПАПКА]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетна симуляція моделі реактивності без GUI")
+    parser.add_argument("files", nargs="+", help="Вхідні Excel-файли (.xlsx)")
+    parser.add_argument("--output-dir", default=Config.EXPORT_FOLDER,
+                        help=f"Папка для результатів (за замовчуванням: {Config.EXPORT_FOLDER})")
+    parser.add_argument("--workers", type=int, default=Config.SIMULATION_WORKERS,
+                        help="Кількість процесів (0 — усі ядра, 1 — послідовно)")
+    parser.add_argument("--data", choices=["input", "results", "all"], default="all",
+                        help="Дані для експорту: вхідні параметри, результати або все")
+    parser.add_argument("--precision", type=float, default=None,
+                        help="Послідовна зупинка: цільова відносна напівширина 95%% ДІ "
+                             "(N з файлу — верхня межа)")
+    parser.add_argument("--warmup", choices=["fixed", "mser"], default=Config.WARMUP_RULE,
+                        help="Перехідний період: fixed — відкинути 5%% з обох кінців, "
+                             "mser — визначити за даними (MSER-5)")
+    parser.add_argument("--crn", action="store_true",
+                        help="Спільні випадкові числа: усі сценарії з одного потоку прибуттів "
+                             "(гладкі криві розгортки за параметром)")
+    parser.add_argument("--quantiles", action="store_true",
+                        help="Додати показники 19-28 — процентилі часу очікування і перебування")
+    parser.add_argument("--control-variates", action="store_true",
+                        help="Уточнити показники контрольними змінними з відомим середнім "
+                             "(показники 31-32 — досягнуте зменшення дисперсії)")
+    parser.add_argument("--rare-events", action="store_true",
+                        help="Оцінювати малу ймовірність порушення D2 умовним методом Монте-Карло "
+                             "(показник 33 — відносна напівширина ДІ)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Потоковий рушій: пам'ять не залежить від N (лише фіксоване вікно, "
+                             "без --precision, --control-variates, --rare-events і --checkpoint-dir)")
+    parser.add_argument("--jit", action="store_true",
+                        help="Рушій jit: цикл подій, скомпільований numba (якщо її встановлено; "
+                             "інакше — звичайний рушій coded)")
+    parser.add_argument("--checkpoint-dir", default=Config.CHECKPOINT_FOLDER,
+                        help="Папка контрольних точок: перерваний прогін продовжується з неї, "
+                             "а прогін з більшим N — з кінця попереднього")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Не використовувати дисковий кеш результатів")
+    args = parser.parse_args(argv)
+    if args.streaming and args.jit:
+        parser.error("--streaming не поєднується з --jit")
+    if args.streaming and (args.warmup != "fixed" or args.precision is not None or args.control_variates
+                           or args.rare_events or args.checkpoint_dir):
+        parser.error("--streaming не поєднується з --warmup mser, --precision, --control-variates, "
+                     "--rare-events і --checkpoint-dir")
+    return args
+
+
+# Зчитує вхідну таблицю та перевіряє мінімальну структуру
+def load_workbook(file_path):
+    excel_data = pd.read_excel(file_path, header=None)
+
+    if excel_data.shape[0] < Config.MIN_ROWS or excel_data.shape[1] < Config.MIN_COLS:
+        raise ValueError(f"Файл має неправильний формат: потрібно мінімум {Config.MIN_ROWS} рядків "
+                         f"і {Config.MIN_COLS} стовпці")
+
+    return excel_data
+
+
+# Симулює всі сценарії одного файлу і зберігає книгу експорту
+def run_workbook(file_path, output_dir, workers=None, data_type="all", cache=None, stopping=None,
+                 warmup="fixed", checkpoint_dir=None):
+    excel_data = load_workbook(file_path)
+    parameters = excel_to_parameters(excel_data)
+    seeds = scenario_seeds(parameters)
+    total = sum(1 for p in parameters if p is not None)
+
+    print(f"\n📁 {os.path.basename(file_path)}: сценаріїв {total} (порожніх: {len(parameters) - total})")
+
+    completed = 0
+
+    def on_result(idx, result, error):
+        nonlocal completed
+        completed += 1
+        if error is None:
+            print(f"  ✓ Сценарій {idx + 1} ({completed}/{total})")
+        else:
+            print(f"  ✗ Сценарій {idx + 1}: помилка - {error}")
+
+    simulation_results = run_scenarios(parameters, seeds, workers=workers, on_result=on_result,
+                                       cache=cache, quantiles=Config.REPORT_QUANTILES,
+                                       stopping=stopping, warmup=warmup,
+                                       control_variates=Config.CONTROL_VARIATES,
+                                       rare_events=Config.RARE_EVENT_MODE,
+                                       checkpoint_dir=checkpoint_dir, engine=Config.SIMULATION_ENGINE)
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    file_name = f"{stem}_{export_file_name()}"
+    out_path = os.path.join(output_dir, file_name)
+
+    export_data = {}
+    if data_type in ["input", "all"]:
+        export_data["Вхідні_параметри"] = prepare_input_data(excel_data)
+    if data_type in ["results", "all"]:
+        export_data["Результати_симуляції"], _ = prepare_results_data(simulation_results)
+    export_data["Метадані"] = prepare_metadata(simulation_results, file_name, output_dir, file_path)
+
+    export_to_excel(out_path, export_data)
+    print(f"✅ Збережено: {out_path}")
+    return out_path
+
+
+def main(argv=None):
+    setup_utf8_output()
+    args = parse_args(argv)
+
+    use_cache = Config.RESULT_CACHE_ENABLED and not args.no_cache
+    cache = ResultCache() if use_cache else None
+    if args.precision is not None:
+        Config.TARGET_REL_HALF_WIDTH = args.precision  # Показники 29-30 у книзі експорту
+    stopping = stopping_rule()
+    if args.quantiles:
+        Config.REPORT_QUANTILES = True
+    if args.control_variates:
+        Config.CONTROL_VARIATES = True
+    if args.rare_events:
+        Config.RARE_EVENT_MODE = True
+    if args.streaming:
+        Config.SIMULATION_ENGINE = "streaming"
+    if args.jit:
+        Config.SIMULATION_ENGINE = "jit"
+    if args.crn:
+        Config.COMMON_RANDOM_NUMBERS = True  # Також позначається в метаданих книги
+
+    failed = 0
+    for file_path in args.files:
+        try:
+            run_workbook(file_path, args.output_dir, args.workers, args.data, cache, stopping,
+                         args.warmup, args.checkpoint_dir)
+        except Exception as e:
+            print(f"❌ {file_path}: {e}")
+            failed += 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
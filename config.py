@@ -7,6 +7,23 @@ class Config:
     PLOTS_FOLDER = "Графіки_симуляції"
     MIN_ROWS = 8
     MIN_COLS = 2
+    SIMULATION_WORKERS = None  # Кількість процесів для симуляції (None — усі ядра)
+    SIMULATION_ENGINE = "coded"  # Рушій циклу подій: "coded", "jit" (numba, якщо встановлено), "streaming" (пам'ять не залежить від N) або "calendar" (K класів)
+    BASE_SEED = 41  # Сценарій i отримує seed BASE_SEED + i
+    COMMON_RANDOM_NUMBERS = False  # Спільний потік прибуттів для всіх сценаріїв (гладкі криві розгортки)
+    SHARE_DEADLINE_RUNS = True  # Один прогін для стовпців, що відрізняються лише D1/D2
+    REPORT_QUANTILES = False  # Додати до результатів показники 19-28 (процентилі)
+    TARGET_REL_HALF_WIDTH = None  # Послідовна зупинка: цільова відносна напівширина ДІ (None — фіксоване N)
+    PRECISION_METRICS = (1, 4, 5)  # Показники, за якими перевіряється точність
+    PRECISION_TIME_BUDGET = None  # Обмеження часу на сценарій, с (None — без обмеження)
+    WARMUP_RULE = "fixed"  # Перехідний період: "fixed" (5%/95%) або "mser" (MSER-5)
+    CONTROL_VARIATES = False  # Уточнення показників контрольними змінними (показники 31-32)
+    RARE_EVENT_MODE = False  # Умовна оцінка малої ймовірності порушення D2 (показник 33)
+    RESULT_CACHE_ENABLED = True  # Дисковий кеш результатів сценаріїв
+    CHECKPOINT_FOLDER = None  # Папка контрольних точок довгих прогонів (None — без них)
+    CHECKPOINT_INTERVAL = 600  # Мінімальний інтервал між записами контрольної точки, с
+    CACHE_FOLDER = "Кеш_симуляції"
+    CACHE_MAX_ENTRIES = 20000
     PARAM_NAMES = ['lambda1', 's1', 's2', 'N', 'D1', 'lambda2', 's2b', 'D2']
     PLOT_COLORS = ['blue', 'green', 'red', 'purple', 'orange', 'brown']
     PLOT_MARKERS = ['o', 's', '^', 'D', 'v', '>']
@@ -40,4 +57,35 @@ class Config:
             "Коефіцієнт завантаження вторинного обробника подіями жорсткого РЧ",
             "Імовірність порушення дедлайну подіями м'якого РЧ",
             "Імовірність порушення дедлайну подіями жорсткого РЧ"
-            ]
\ No newline at end of file
+            ]
+
+    # Показники 19-28 (Config.REPORT_QUANTILES)
+    QUANTILE_METRIC_NAMES = [
+            "95-й процентиль часу очікування первинної обробки",
+            "99-й процентиль часу очікування первинної обробки",
+            "95-й процентиль часу очікування вторинної обробки для подій м'якого РЧ",
+            "99-й процентиль часу очікування вторинної обробки для подій м'якого РЧ",
+            "95-й процентиль часу очікування вторинної обробки для подій жорсткого РЧ",
+            "99-й процентиль часу очікування вторинної обробки для подій жорсткого РЧ",
+            "95-й процентиль повного часу перебування подій м'якого РЧ у системі",
+            "99-й процентиль повного часу перебування подій м'якого РЧ у системі",
+            "95-й процентиль повного часу перебування подій жорсткого РЧ у системі",
+            "99-й процентиль повного часу перебування подій жорсткого РЧ у системі"
+            ]
+
+    # Показники 29-30 (послідовна зупинка, Config.TARGET_REL_HALF_WIDTH)
+    SEQUENTIAL_METRIC_NAMES = [
+            "Фактична кількість подій N (послідовна зупинка)",
+            "Досягнута відносна напівширина довірчого інтервалу"
+            ]
+
+    # Показники 31-32 (контрольні змінні, Config.CONTROL_VARIATES)
+    CONTROL_VARIATE_METRIC_NAMES = [
+            "Зменшення дисперсії контрольними змінними: час перебування подій м'якого РЧ",
+            "Зменшення дисперсії контрольними змінними: довжина черги первинної обробки"
+            ]
+
+    # Показник 33 (умовна оцінка рідкісних подій, Config.RARE_EVENT_MODE)
+    RARE_EVENT_METRIC_NAMES = [
+            "Відносна напівширина ДІ ймовірності порушення жорсткого РЧ (умовна оцінка)"
+            ]
@@ -22,6 +22,9 @@ class GUIBase:
         self.s2_values, self.d1_values = [], [] # Списки
         self.editing_item = self.editing_column = self.editing_row = self.entry_edit = None 
         self._is_validating = False
+        self._sim_thread = self._sim_queue = self._cancel_event = self._sim_results = None # Фонова симуляція
+        self._dirty_columns = set() # Індекси сценаріїв, змінених після останньої симуляції
+        self._result_seeds = None # Seed, з якими отримано simulation_results
 
     # ==================== СТВОРЕННЯ ІНТЕРФЕЙСУ ====================
 
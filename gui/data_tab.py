@@ -3,6 +3,7 @@ import pandas as pd
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from config import Config
+from utils.workbook import excel_to_parameters
 
 # ==================== ВКЛАДКА 1: ЗАВАНТАЖЕННЯ ДАНИХ ====================
 class DataTabMixin:
@@ -66,7 +67,7 @@ class DataTabMixin:
         self.data_columns = self.num_columns - 1
         
         self._refresh_table_display()
-        self._update_parameters_after_change()
+        self._update_parameters_after_change(dirty_columns=[new_col_idx - 1])
         self.stats_label.config(
             text=f"Статистика: Рядків: {self.num_rows}, Стовпців: {self.num_columns} (з них з даними: {self.data_columns})"
         )        
@@ -139,6 +140,7 @@ class DataTabMixin:
                 
                 # Перенумеровуємо стовпці
                 self.excel_data.columns = range(len(self.excel_data.columns))
+                self._remove_result_columns(col_numbers)
                 
                 self.num_columns = self.excel_data.shape[1]
                 self.data_columns = self.num_columns - 1
@@ -279,7 +281,7 @@ class DataTabMixin:
                 print(f"Оновлено комірку [{self.editing_row}, {self.editing_column}] = {new_value}")
                 
                 # Оновлюємо параметри для симуляції
-                self._update_parameters_after_change()
+                self._update_parameters_after_change(dirty_columns=[self.editing_column - 1])
                 
             except ValueError:
                 # ВСТАНОВЛЮЄМО ПРАПОРЕЦЬ ПЕРЕД ПОКАЗОМ ПОМИЛКИ
@@ -304,7 +306,7 @@ class DataTabMixin:
             values = list(self.tree.item(self.editing_item)['values'])
             values[self.editing_column] = ''
             self.tree.item(self.editing_item, values=values)
-            self._update_parameters_after_change()
+            self._update_parameters_after_change(dirty_columns=[self.editing_column - 1])
         
         self.cancel_edit()
     
@@ -360,8 +362,10 @@ class DataTabMixin:
             self.save_edit()
     
     # Оновлює параметри для симуляції після зміни даних
-    def _update_parameters_after_change(self):
+    # dirty_columns — індекси сценаріїв, які треба перерахувати при наступному запуску
+    def _update_parameters_after_change(self, dirty_columns=()):
         self.convert_excel_to_parameters()
+        self._dirty_columns.update(dirty_columns)
         
         # Оновлюємо s2_values та d1_values
         if self.excel_data is not None and self.num_columns > 1:
@@ -374,6 +378,26 @@ class DataTabMixin:
             if hasattr(self, 'plot_combobox'):
                 self.update_plot_options_based_on_s2_and_d1()
     
+    # Узгоджує результати з таблицею після видалення стовпців (номери з 1)
+    def _remove_result_columns(self, col_numbers):
+        # Результати, що надходять, прив'язані до старих номерів стовпців
+        if hasattr(self, 'cancel_simulation'):
+            self._discard_running_simulation()
+        
+        deleted = {col - 1 for col in col_numbers}
+        self._dirty_columns = {i - sum(1 for d in deleted if d < i)
+                               for i in self._dirty_columns if i not in deleted}
+        
+        # Seed стовпців, що зсунулись, зміниться (Config.BASE_SEED + номер) —
+        # це виявить порівняння з _result_seeds при наступному запуску
+        if self._result_seeds is not None:
+            self._result_seeds = [s for i, s in enumerate(self._result_seeds) if i not in deleted]
+        
+        if self.simulation_results is not None:
+            self.simulation_results = [r for i, r in enumerate(self.simulation_results) if i not in deleted]
+            if hasattr(self, 'display_results'):
+                self.display_results(self.simulation_results)
+    
     # Оновлює відображення таблиці
     def _refresh_table_display(self):
         if self.excel_data is None:
@@ -432,6 +456,9 @@ class DataTabMixin:
     # ОЧИЩАЄ ПОПЕРЕДНІ РЕЗУЛЬТАТИ ПРИ ЗАВАНТАЖЕННІ НОВОГО ФАЙЛУ
     def _clear_previous_results(self):
         print("\n🧹 Очищення попередніх результатів...")
+        
+        if hasattr(self, 'cancel_simulation'):
+            self._discard_running_simulation()
                 
         if hasattr(self, 'results_tree'):
             for item in self.results_tree.get_children():
@@ -446,6 +473,8 @@ class DataTabMixin:
                 widget.destroy()
                 
         self.simulation_results = self.current_plot_frame = None
+        self._dirty_columns = set()
+        self._result_seeds = None
                 
         if hasattr(self, 'status_label'):
             self.status_label.config(text="Статус: Очікування запуску")
@@ -621,56 +650,12 @@ class DataTabMixin:
         if self.excel_data is None:
             return []
         
-        parameter_sets = []
-        
-        for col in range(1, self.excel_data.shape[1]):
-            params = self._extract_column_params(col)
-            parameter_sets.append(params)
+        parameter_sets = excel_to_parameters(self.excel_data)
         
         self.excel_parameters = parameter_sets
         self._log_parameter_stats(parameter_sets)
         return parameter_sets
 
-    # Витягує параметри з одного стовпця
-    def _extract_column_params(self, col):
-        if not self._column_has_data(col):
-            return None
-        
-        params = {}
-        try:
-            for row, param_name in enumerate(Config.PARAM_NAMES):
-                value_str = str(self.excel_data.iloc[row, col]).strip()
-                
-                if param_name == 'N':
-                    params[param_name] = int(float(value_str.replace(',', '.'))) if value_str else 0
-                else:
-                    params[param_name] = self._convert_to_float(value_str)
-            
-            if all(v == 0 or v == 0.0 for v in params.values()):
-                return None
-            
-            return params
-            
-        except Exception as e:
-            print(f"Помилка стовпця {col}: {e}")
-            return None
-
-    # Перевіряє чи стовпець має хоча б одне непорожнє значення
-    def _column_has_data(self, col):
-        for row in range(Config.MIN_ROWS):
-            cell_value = self.excel_data.iloc[row, col]
-            if pd.notna(cell_value) and str(cell_value).strip() != "":
-                return True
-        return False
-
-    # Конвертує рядок у float
-    def _convert_to_float(self, value_str):
-        try:
-            clean_str = str(value_str).strip().replace(',', '.')
-            return float(clean_str) if clean_str else 0.0
-        except (ValueError, TypeError):
-            return 0.0
-
     # Логує статистику по наборам параметрів
     def _log_parameter_stats(self, parameter_sets):
         total = len(parameter_sets)
@@ -1,11 +1,11 @@
 import os
-import pandas as pd
 import tkinter as tk
 import matplotlib.pyplot as plt
 from tkinter import ttk, messagebox
 from config import Config
 from datetime import datetime
-from openpyxl.utils import get_column_letter
+from utils.workbook import (export_file_name, prepare_input_data, prepare_results_data,
+                            prepare_metadata, export_to_excel)
 
 # ==================== ВКЛАДКА 4: ЕКСПОРТ ====================
 class ExportMixin:
@@ -68,8 +68,7 @@ class ExportMixin:
                 os.makedirs(export_folder)
                 self._log_export(f"Створено папку: {export_folder}")
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_name = f"симуляція_експорт_{timestamp}.xlsx"
+            file_name = export_file_name()
             file_path = os.path.join(export_folder, file_name)
             
             self._log_export(f"Початок експорту даних...")
@@ -79,22 +78,23 @@ class ExportMixin:
             
             if self.export_data_type.get() in ["input", "all"] and hasattr(self, 'excel_data'):
                 self._log_export("Додавання вхідних параметрів...")
-                export_data["Вхідні_параметри"] = self._prepare_input_data()
+                export_data["Вхідні_параметри"] = prepare_input_data(self.excel_data)
             
             if self.export_data_type.get() in ["results", "all"] and self.simulation_results:
                 self._log_export("Додавання результатів симуляції...")
-                results_df, stats = self._prepare_results_data()
+                results_df, stats = prepare_results_data(self.simulation_results)
                 export_data["Результати_симуляції"] = results_df
             
             self._log_export("Додавання метаданих...")
-            export_data["Метадані"] = self._prepare_metadata(file_name, export_folder)
+            export_data["Метадані"] = prepare_metadata(self.simulation_results, file_name, export_folder,
+                                                    self.current_file_path)
             
             if not export_data:
                 self._log_export("❌ Немає даних для експорту")
                 messagebox.showwarning("Попередження", "Немає даних для експорту!")
                 return
             
-            self._export_to_excel(file_path, export_data)
+            export_to_excel(file_path, export_data)
             
             self._log_export(f"✅ Експорт успішно завершено!")
             self._log_export(f"📁 Файл збережено: {file_path}")
@@ -107,92 +107,6 @@ class ExportMixin:
             self._log_export(f"❌ {error_msg}")
             messagebox.showerror("Помилка експорту", error_msg)
 
-    # Підготовка вхідних даних
-    def _prepare_input_data(self):
-        input_df = self.excel_data.copy()
-        
-        if input_df.shape[0] >= Config.MIN_ROWS:
-            param_names = Config.PARAMETER_NAMES[:Config.MIN_ROWS] + [""] * (input_df.shape[0] - Config.MIN_ROWS)
-            input_df.iloc[:, 0] = param_names
-            input_df.rename(columns={input_df.columns[0]: "Параметр"}, inplace=True)
-        
-        for i in range(1, len(input_df.columns)):
-            input_df.rename(columns={input_df.columns[i]: f"Стовпець {i}"}, inplace=True)
-        
-        return input_df
-
-    # Підготовка результатів симуляції
-    def _prepare_results_data(self):
-        results_by_metric = []
-        valid_scenarios = empty_scenarios = 0 # Лічильники для статистики
-        
-        for metric_idx, metric_label in enumerate(Config.METRIC_NAMES, 1):
-            metric_row = {"Метрика": metric_label}
-            
-            for scenario_idx, result in enumerate(self.simulation_results, 1):
-                if result is None:
-                    metric_row[f"Сценарій {scenario_idx}"] = ""
-                    if scenario_idx == 1: # Лічимо пусті сценарії тільки один раз
-                        empty_scenarios += 1
-                elif metric_idx in result:
-                    value = result[metric_idx]
-                    metric_row[f"Сценарій {scenario_idx}"] = self._format_export_value(value)
-                else:
-                    metric_row[f"Сценарій {scenario_idx}"] = "(відсутня метрика)"
-            
-            results_by_metric.append(metric_row)
-        
-        valid_scenarios = len(self.simulation_results) - empty_scenarios
-        results_df = pd.DataFrame(results_by_metric)
-        
-        stats = {'total': len(self.simulation_results),
-                 'valid': valid_scenarios,
-                 'empty': empty_scenarios }
-        
-        return results_df, stats
-
-    # Форматує значення для експорту
-    def _format_export_value(self, value):
-        if isinstance(value, str) and value == "Помилка":
-            return "Помилка"
-        
-        if value is None:
-            return "(пропущено)"
-        
-        if not isinstance(value, (int, float)):
-            return str(value)
-        
-        try:
-            if value == 0:
-                return "0"
-            elif abs(value) >= 1000:
-                return f"{value:.2f}"
-            elif abs(value) >= 1:
-                return f"{value:.6f}"
-            else:
-                return f"{value:.8f}"
-        except:
-            return str(value)
-
-    # Підготовка метаданих
-    def _prepare_metadata(self, file_name, export_folder):
-        valid_count = len([r for r in self.simulation_results if r is not None])
-        empty_count = len([r for r in self.simulation_results if r is None])
-        
-        metadata = {
-            "Дата_експорту": [datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-            "Ім'я_файлу": [file_name],
-            "Загальна_кількість_сценаріїв": [valid_count + empty_count],
-            "Валідних_сценаріїв": [valid_count],
-            "Порожніх_сценаріїв": [empty_count],
-            "Кількість_метрик": [len(Config.METRIC_NAMES)],
-            "Версія_програми": ["1.0"],
-            "Оригінальний_файл": [os.path.basename(self.current_file_path) if self.current_file_path else "Не вказано"],
-            "Папка_збереження": [os.path.abspath(export_folder)]
-        }
-        
-        return pd.DataFrame(metadata)
-
     # Експорт всіх доступних графіків в окремі файли
     def export_all_plots(self):
         if not self.simulation_results:
@@ -253,36 +167,6 @@ class ExportMixin:
             self._log_export(f"❌ Помилка: {str(e)}")
             messagebox.showerror("Помилка експорту", str(e))
 
-    # Експорт у Excel
-    def _export_to_excel(self, file_path, data_dict):
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            for sheet_name, df in data_dict.items():
-                sheet_name = str(sheet_name)[:31]
-                
-                if not isinstance(df, pd.DataFrame):
-                    df = pd.DataFrame(df)
-                
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                try:
-                    worksheet = writer.sheets[sheet_name]
-                    for idx, column in enumerate(df.columns, 1):
-                        try:
-                            if df[column].dtype == 'object':
-                                max_length = df[column].astype(str).str.len().max()
-                            else:
-                                max_length = max(df[column].astype(str).str.len().max(), len(str(df[column].dtype)))
-                            
-                            column_length = max(max_length, len(str(column))) + 2
-                            column_width = min(column_length, 50)
-                            
-                            column_letter = get_column_letter(idx)
-                            worksheet.column_dimensions[column_letter].width = column_width
-                        except:
-                            continue
-                except:
-                    pass   
-
     # Логування експорту
     def _log_export(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
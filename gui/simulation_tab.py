@@ -1,6 +1,11 @@
+import queue
+import threading
+import multiprocessing
 from tkinter import ttk, messagebox
 from config import Config
-from simulation.priority_simulator import PriorityQueueSimulation
+from simulation.parallel_runner import run_scenarios, error_result, ERROR_VALUE
+from simulation.result_cache import ResultCache
+from utils.workbook import result_metrics, stopping_rule, scenario_seeds
 
 # ==================== ВКЛАДКА 2: СИМУЛЯЦІЯ ====================
 class SimulationMixin:
@@ -12,7 +17,10 @@ class SimulationMixin:
         control_frame = ttk.LabelFrame(main_frame, text="Керування симуляцією", padding=10)
         control_frame.pack(fill='x', pady=(0, 10))
         
-        ttk.Button(control_frame, text="Запустити симуляцію", command=self.run_simulation).pack(side='left', padx=5)
+        self.run_button = ttk.Button(control_frame, text="Запустити симуляцію", command=self.run_simulation)
+        self.run_button.pack(side='left', padx=5)
+        self.cancel_button = ttk.Button(control_frame, text="Скасувати", command=self.cancel_simulation, state='disabled')
+        self.cancel_button.pack(side='left', padx=5)
         ttk.Button(control_frame, text="Очистити результати", command=self.clear_results).pack(side='left', padx=5)
         
         self.status_label = ttk.Label(control_frame, text="Статус: Очікування запуску")
@@ -33,61 +41,182 @@ class SimulationMixin:
             messagebox.showwarning("Попередження", "Спочатку завантажте дані з Excel файлу!")
             return
         
+        if self._sim_thread is not None and self._sim_thread.is_alive():
+            messagebox.showinfo("Інформація", "Симуляція вже виконується")
+            return
+        
         try:
             self.status_label.config(text="Статус: Запуск симуляції...")
             self.progress['value'] = 0
-            self.root.update_idletasks()
+            previous_results = self.simulation_results
             self.clear_results()
             
-            all_results = []
-            successful, skipped, errors = 0, 0, 0
-            
             # Використовуємо ПОТОЧНУ кількість параметрів (після видалення стовпців)
             total_params = len(self.excel_parameters)
             
-            for i, params in enumerate(self.excel_parameters, 1):
+            run_params = list(self.excel_parameters)
+            seeds = scenario_seeds(run_params)
+            all_results = [None] * total_params
+            self._sim_counts = {'successful': 0, 'skipped': 0, 'errors': 0, 'completed': 0}
+            
+            # Незмінені стовпці беруться з попереднього запуску, перераховуються лише змінені
+            reused = self._reuse_previous_results(previous_results, run_params, seeds, all_results)
+            self._dirty_columns = set()
+            self._result_seeds = seeds
+            
+            for idx, params in enumerate(run_params):
                 if params is None:
-                    all_results.append(None)
-                    skipped += 1
+                    if all_results[idx] is None:
+                        self._sim_counts['skipped'] += 1
                     continue
                 
                 try:
                     self._validate_params(params)
-                    
-                    progress_value = (i / total_params) * 100
-                    self.progress['value'] = progress_value
-                    self.status_label.config(text=f"Статус: Симуляція {i}/{total_params}")
-                    self.root.update_idletasks()
-                    
-                    sim = PriorityQueueSimulation(seed=41 + i)
-                    result = sim.run_simulation_priority2_full(**params)
-                    all_results.append(result)
-                    successful += 1
-                    
                 except Exception as e:
-                    print(f"Симуляція {i}: помилка - {e}")
-                    error_result = {j: "Помилка" for j in range(1, 19)}
-                    all_results.append(error_result)
-                    errors += 1
+                    print(f"Симуляція {idx + 1}: помилка - {e}")
+                    all_results[idx] = error_result()
+                    run_params[idx] = None
+                    self._sim_counts['errors'] += 1
             
-            self.simulation_results = all_results
+            self._sim_total = sum(1 for p in run_params if p is not None)
+            self._sim_results = self.simulation_results = all_results
             self.display_results(all_results)
+            if reused:
+                print(f"♻️ Повторно використано {reused} сценаріїв, перераховується {self._sim_total}")
             
-            status_text = f"Статус: Завершено. Успішно: {successful}"
-            if skipped > 0:
-                status_text += f", Пропущено: {skipped}"
-            if errors > 0:
-                status_text += f", Помилок: {errors}"
-            
-            self.status_label.config(text=status_text)
-            self.progress['value'] = 100
-            
-            print(f"\n📊 Симуляція завершена: {total_params} параметрів обробл ено")
+            # Симуляція виконується у фоновому потоці (сценарії — у пулі процесів),
+            # а результати передаються через чергу, яку опитує root.after
+            self._sim_queue = queue.Queue()
+            self._cancel_event = multiprocessing.Event()
+            self._sim_thread = threading.Thread(
+                target=self._simulation_worker,
+                args=(run_params, seeds, self._sim_queue, self._cancel_event),
+                daemon=True
+            )
+            self.run_button.config(state='disabled')
+            self.cancel_button.config(state='normal')
+            self._sim_thread.start()
+            self.root.after(100, self._poll_simulation_queue)
             
         except Exception as e:
             self.status_label.config(text="Статус: Помилка при симуляції")
             messagebox.showerror("Помилка", f"Не вдалося виконати симуляцію: {str(e)}")
 
+    # Переносить у all_results результати стовпців, не змінених після попереднього
+    # запуску (ті самі параметри і seed), і позначає їх у run_params як None.
+    # Повертає кількість таких стовпців
+    def _reuse_previous_results(self, previous_results, run_params, seeds, all_results):
+        if not previous_results or self._result_seeds is None:
+            return 0
+        
+        reused = 0
+        for idx, result in enumerate(previous_results[:len(run_params)]):
+            if (run_params[idx] is None or result is None or idx in self._dirty_columns
+                    or idx >= len(self._result_seeds) or self._result_seeds[idx] != seeds[idx]
+                    or result.get(1) == ERROR_VALUE):
+                continue
+            all_results[idx] = result
+            run_params[idx] = None
+            reused += 1
+        
+        self._sim_counts['successful'] += reused
+        return reused
+
+    # Виконується у фоновому потоці: жодних звернень до Tk, лише черга
+    def _simulation_worker(self, run_params, seeds, result_queue, cancel_event):
+        try:
+            cache = ResultCache() if Config.RESULT_CACHE_ENABLED else None
+            run_scenarios(
+                run_params, seeds, workers=Config.SIMULATION_WORKERS, engine=Config.SIMULATION_ENGINE,
+                cancel_event=cancel_event, cache=cache, quantiles=Config.REPORT_QUANTILES,
+                stopping=stopping_rule(), warmup=Config.WARMUP_RULE,
+                control_variates=Config.CONTROL_VARIATES,
+                rare_events=Config.RARE_EVENT_MODE, checkpoint_dir=Config.CHECKPOINT_FOLDER,
+                on_result=lambda idx, result, error: result_queue.put(('result', idx, result, error))
+            )
+            result_queue.put(('done',))
+        except Exception as e:
+            result_queue.put(('failed', str(e)))
+
+    # Обробляє повідомлення фонового потоку в головному потоці Tk
+    def _poll_simulation_queue(self):
+        finished = False
+        updated = False
+        
+        while True:
+            try:
+                message = self._sim_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if message[0] == 'result':
+                _, idx, result, error = message
+                self._sim_counts['completed'] += 1
+                if error is None:
+                    self._sim_counts['successful'] += 1
+                else:
+                    print(f"Симуляція {idx + 1}: помилка - {error}")
+                    self._sim_counts['errors'] += 1
+                if self._sim_results is not None:
+                    self._sim_results[idx] = result
+                    updated = True
+            elif message[0] == 'done':
+                finished = True
+            elif message[0] == 'failed':
+                finished = True
+                self.status_label.config(text="Статус: Помилка при симуляції")
+                messagebox.showerror("Помилка", f"Не вдалося виконати симуляцію: {message[1]}")
+        
+        if updated:
+            # Часткові результати відображаються одразу
+            self.simulation_results = self._sim_results
+            self.display_results(self.simulation_results)
+            completed = self._sim_counts['completed']
+            self.progress['value'] = (completed / max(1, self._sim_total)) * 100
+            if not self._cancel_event.is_set():
+                self.status_label.config(text=f"Статус: Симуляція {completed}/{self._sim_total}")
+        
+        if finished:
+            self._finish_simulation()
+        else:
+            self.root.after(100, self._poll_simulation_queue)
+
+    def _finish_simulation(self):
+        self.run_button.config(state='normal')
+        self.cancel_button.config(state='disabled')
+        
+        counts = self._sim_counts
+        cancelled = self._cancel_event.is_set()
+        
+        status_text = "Статус: Скасовано. " if cancelled else "Статус: Завершено. "
+        status_text += f"Успішно: {counts['successful']}"
+        if counts['skipped'] > 0:
+            status_text += f", Пропущено: {counts['skipped']}"
+        if counts['errors'] > 0:
+            status_text += f", Помилок: {counts['errors']}"
+        
+        self.status_label.config(text=status_text)
+        if not cancelled:
+            self.progress['value'] = 100
+        
+        print(f"\n📊 Симуляція {'скасована' if cancelled else 'завершена'}: "
+              f"{counts['completed']}/{self._sim_total} сценаріїв оброблено")
+
+    # Зупиняє симуляцію: нові сценарії не запускаються, поточні перериваються
+    def cancel_simulation(self):
+        if self._sim_thread is None or not self._sim_thread.is_alive():
+            return
+        
+        self._cancel_event.set()
+        self.cancel_button.config(state='disabled')
+        self.status_label.config(text="Статус: Скасування...")
+
+    # Скасовує фонову симуляцію і відкидає її подальші результати
+    def _discard_running_simulation(self):
+        if self._sim_thread is not None and self._sim_thread.is_alive():
+            self.cancel_simulation()
+            self._sim_results = None
+
     def _validate_params(self, params):
         for key, value in params.items():
             if not isinstance(value, (int, float)):
@@ -111,7 +240,7 @@ class SimulationMixin:
             else:
                 self.results_tree.column(col, width=100, anchor='center', minwidth=80)
         
-        for metric_idx, metric_label in enumerate(Config.METRIC_NAMES, 1):
+        for metric_idx, metric_label in result_metrics():
             row_values = [metric_label]
             
             for result in all_results:
@@ -150,6 +279,8 @@ class SimulationMixin:
             return str(value)
 
     def clear_results(self):
+        self._discard_running_simulation()
+        
         for item in self.results_tree.get_children():
             self.results_tree.delete(item)
         
@@ -0,0 +1,114 @@
+import numpy as np # type: ignore
+
+# ======================================
+# ОБ'ЄДНАНИЙ РОЗКЛАД ПРИБУТТІВ
+# ======================================
+# Прибуття обох типів відомі до початку циклу подій: пуассонівські прибуття
+# типу 1 генеруються наперед, а k-та подія типу 2 надходить рівно в момент
+# k / λ2 (кожен момент обчислюється окремо, без накопичення похибки
+# додаванням 1/λ2). Тому цикл подій не вибирає між двома потоками на кожній
+# ітерації, а читає готовий об'єднаний розклад за індексом. При однакових
+# часах подія типу 1 іде першою.
+
+# Коди прибуттів у розкладі (збігаються з EV_ARR1 і EV_ARR2 циклів подій)
+ARRIVAL1 = 0
+ARRIVAL2 = 1
+
+TAIL_BLOCK = 4096  # Розмір блоку прибуттів типу 2 після останньої події типу 1
+SCHEDULE_BLOCK = 1 << 16  # Найбільша кількість прибуттів типу 1 в одному блоці розкладу
+
+
+def type2_count(lambda2: float, t_end: float) -> int:
+    """Кількість подій типу 2 з моментами k / λ2 <= t_end."""
+    if lambda2 <= 0:
+        return 0
+    count = int(t_end * lambda2)
+    # Поправка на округлення добутку
+    while (count + 1) / lambda2 <= t_end:
+        count += 1
+    while count > 0 and count / lambda2 > t_end:
+        count -= 1
+    return count
+
+
+def type2_arrivals(lambda2: float, t_end: float) -> np.ndarray:
+    """
+    Часи детермінованих прибуттів подій типу 2 на інтервалі (0, t_end].
+
+    Момент k-ї події — k / λ2, так само, як у циклі подій.
+    """
+    return np.arange(1, type2_count(lambda2, t_end) + 1) / lambda2
+
+
+def merge_positions(arr1: np.ndarray, arr2: np.ndarray):
+    """
+    Позиції подій обох типів в об'єднаному впорядкованому потоці.
+
+    При однакових часах подія типу 1 іде першою — так само, як у циклі подій.
+
+    Повернення:
+        (pos1, pos2) — індекси подій типу 1 і типу 2 в об'єднаному масиві
+    """
+    pos1 = np.arange(len(arr1)) + np.searchsorted(arr2, arr1, side='left')
+    pos2 = np.arange(len(arr2)) + np.searchsorted(arr1, arr2, side='right')
+    return pos1, pos2
+
+
+def merge_arrivals(arr1: np.ndarray, arr2: np.ndarray):
+    """
+    Об'єднаний розклад двох впорядкованих потоків.
+
+    Повернення:
+        (times, codes) — часи прибуттів і їх коди (ARRIVAL1 / ARRIVAL2)
+    """
+    pos1, pos2 = merge_positions(arr1, arr2)
+    times = np.empty(len(arr1) + len(arr2))
+    times[pos1] = arr1
+    times[pos2] = arr2
+    codes = np.full(len(times), ARRIVAL2, dtype=np.int8)
+    codes[pos1] = ARRIVAL1
+    return times, codes
+
+
+def split_blocks(arrival_chunks, size: int = SCHEDULE_BLOCK):
+    """
+    Розбити блоки прибуттів на частини не довші за size (зрізи без копіювання).
+
+    Розклад у вигляді списків Python займає ~40 байт на подію, тож розмір
+    блоку розкладу, а не блоку генерації прибуттів, визначає пам'ять циклу.
+    """
+    for chunk in arrival_chunks:
+        for k in range(0, len(chunk), size):
+            yield chunk[k:k + size]
+
+
+def arrival_schedule(arrival_chunks, lambda2: float):
+    """
+    Об'єднаний розклад прибуттів блоками.
+
+    Для кожного блоку прибуттів типу 1 — блок розкладу з ними і подіями типу 2
+    до останнього прибуття блоку; далі (цикл подій ще спорожнює черги) —
+    необмежені блоки по TAIL_BLOCK подій типу 2 (якщо λ2 > 0).
+
+    Аргументи:
+        arrival_chunks: Ітерабельне впорядкованих блоків часів прибуття типу 1
+        lambda2: Частота подій типу 2
+
+    Повернення:
+        Генератор кортежів (блок прибуттів типу 1, часи розкладу, коди) —
+        часи і коди списками Python, для індексації в циклі
+    """
+    count2 = 0
+    for chunk in arrival_chunks:
+        last2 = type2_count(lambda2, chunk[-1])
+        times, codes = merge_arrivals(chunk, np.arange(count2 + 1, last2 + 1) / lambda2)
+        count2 = last2
+        yield chunk, times.tolist(), codes.tolist()
+
+    if lambda2 <= 0:
+        return
+    empty = np.zeros(0)
+    while True:
+        times = np.arange(count2 + 1, count2 + TAIL_BLOCK + 1) / lambda2
+        count2 += TAIL_BLOCK
+        yield empty, times.tolist(), [ARRIVAL2] * TAIL_BLOCK
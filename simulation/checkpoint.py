@@ -0,0 +1,298 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+from array import array
+import numpy as np # type: ignore
+
+from simulation.coded_engine import AREA_COUNT
+from simulation.job_store import JOB_COLUMNS1, JOB_COLUMNS2
+
+# ======================================
+# КОНТРОЛЬНІ ТОЧКИ ДОВГИХ ПРОГОНІВ
+# ======================================
+# Файл контрольної точки — послідовність записів pickle: заголовок (версія
+# симулятора, параметри динаміки, стан генератора до генерації прибуттів) і
+# сегменти знімків run_coded_event_loop, що дописуються в кінець файлу.
+# Прибуття типу 1 не зберігаються: той самий стан генератора дає ті самі
+# перші N прибуттів для будь-якого більшого N, тож після відновлення їх
+# генерують заново.
+#
+# Сегмент містить лише те, що з'явилося після попереднього: рядки таблиць
+# завдань, що вже залишили систему (вони більше не змінюються), накопичені
+# площі в моменти нових подій типу 1 (area_marks), початки вторинної
+# обробки подій типу 2, що залишили систему (sec2_starts), і нові записи
+# завдань типу 1 у start_sec2 ще не прибулих подій типу 2 — а також стан для
+# продовження: лічильники, обробник, черги, площі і рядки завдань, що ще в
+# системі. Тож запис займає час, пропорційний подіям від попереднього запису,
+# а не всьому прогону. Обірваний останній сегмент (збій під час запису)
+# відкидається; перший запис прогону переписує файл заголовком і одним
+# сегментом з усім станом.
+
+CHECKPOINT_FORMAT = 2
+
+# Стан циклу в сегменті (решта знімка — таблиці, area_marks і sec2_starts)
+LOOP_STATE_KEYS = ('arrivals1', 'cnt2', 'next_times', 'service', 'queues', 'areas',
+                   't_prev', 't_start')
+
+
+def checkpoint_file(folder: str, params, seed, arrival_sampler: str = "inverse") -> str:
+    """
+    Шлях контрольної точки сценарію в папці folder.
+
+    Ім'я — хеш параметрів динаміки, seed і генератора прибуттів; N і дедлайни
+    в нього не входять, тож прогін з більшим N продовжує збережений.
+    """
+    payload = {
+        'params': {name: params[name] for name in sorted(params) if name not in ('N', 'D1', 'D2')},
+        'seed': seed if seed is None else int(seed),
+        'arrival_sampler': arrival_sampler,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=float)
+    return os.path.join(folder, hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32] + ".ckpt")
+
+
+def _open_bounds(snapshot):
+    """
+    Найменші номери завдань типу 1 і 2, що ще в системі (якщо таких немає —
+    номери наступних прибуттів).
+
+    Рядки таблиць з меншими номерами вже не змінюються: завдання типу 1 з
+    черги S2 пише лише в нульовий start_sec2 свого номера, а для події типу 2,
+    що залишила систему, він уже записаний.
+    """
+    bounds = [0, snapshot['arrivals1'] + 1, snapshot['cnt2'] + 1]
+    _, prim_type, prim_idx, sec_type, sec_idx = snapshot['service']
+    in_service = [(prim_type, prim_idx), (sec_type, sec_idx)]
+    for typ, idx in in_service + [job for queue in snapshot['queues'] for job in queue]:
+        if typ and idx < bounds[typ]:
+            bounds[typ] = idx
+    return bounds[1], bounds[2]
+
+
+def _segment(snapshot, written):
+    """
+    Сегмент файлу зі знімка циклу.
+
+    Аргументи:
+        snapshot: Знімок run_coded_event_loop
+        written: Кінець попереднього сегмента — (межа рядків типу 1, межа рядків
+            типу 2, довжина area_marks); (0, 0, 0) — сегмент з усім станом
+
+    Повернення:
+        (сегмент, written для наступного сегмента)
+    """
+    lists = snapshot['lists']
+    arrivals1, cnt2 = snapshot['arrivals1'], snapshot['cnt2']
+    bound1, bound2 = _open_bounds(snapshot)
+    lo1, lo2, marks_from = written
+
+    rows = {}
+    open_rows = {}
+    open_index = []
+    for columns, lo, bound, hi in ((JOB_COLUMNS1, lo1, bound1, arrivals1 + 1),
+                                   (JOB_COLUMNS2, lo2, bound2, cnt2 + 1)):
+        used = np.unique(np.concatenate([np.flatnonzero(lists[name][bound:hi]) for name in columns]))
+        index = bound + used
+        open_index.append(index)
+        for name in columns:
+            rows[name] = lists[name][lo:bound]
+            open_rows[name] = lists[name][index]
+
+    # Після cnt2 непорожній лише start_sec2 — його пишуть завдання типу 1 з черги S2,
+    # і лише один раз; нові записи — з номерами не менше межі типу 1 попереднього сегмента
+    first = max(cnt2 + 1, lo1)
+    pending = first + np.flatnonzero(lists['start_sec2'][first:arrivals1 + 1])
+
+    marks = snapshot['area_marks']
+    marks_to = AREA_COUNT * arrivals1
+    sec2_starts = snapshot['sec2_starts']
+    state = {key: snapshot[key] for key in LOOP_STATE_KEYS}
+    closed2 = None
+    if sec2_starts is not None:
+        closed2 = {j: sec2_starts[j] for j in range(lo2, bound2) if j in sec2_starts}
+        state['sec2_open'] = {j: sec2_starts[j] for j in range(bound2, cnt2 + 1) if j in sec2_starts}
+
+    segment = {
+        'written': written,
+        'rows': rows,
+        'open_rows': open_rows,
+        'open_index': tuple(open_index),
+        'pending_index': pending,
+        'pending_starts': lists['start_sec2'][pending],
+        'lengths': (len(lists[JOB_COLUMNS1[0]]), len(lists[JOB_COLUMNS2[0]])),
+        'area_marks': marks[marks_from:marks_to],
+        'sec2_starts': closed2,
+        'state': state,
+    }
+    return segment, (bound1, bound2, marks_to)
+
+
+def _merge(segments):
+    """
+    Знімок, з якого можна продовжити run_coded_event_loop, з послідовності
+    сегментів (без сегментів, що не продовжують попередні).
+
+    Повернення:
+        Знімок або None, якщо придатних сегментів немає
+    """
+    rows = {name: [] for name in JOB_COLUMNS1 + JOB_COLUMNS2}
+    pending = []
+    marks = array('d')
+    sec2_starts = {}
+    written = (0, 0, 0)
+    last = None
+    for segment in segments:
+        if not isinstance(segment, dict) or segment.get('written') != written:
+            break
+        for name, values in segment['rows'].items():
+            rows[name].append(values)
+        pending.append((segment['pending_index'], segment['pending_starts']))
+        marks.extend(segment['area_marks'])
+        if segment['sec2_starts'] is not None:
+            sec2_starts.update(segment['sec2_starts'])
+        written = (written[0] + len(segment['rows'][JOB_COLUMNS1[0]]),
+                   written[1] + len(segment['rows'][JOB_COLUMNS2[0]]), len(marks))
+        last = segment
+    if last is None:
+        return None
+
+    lists = {}
+    for columns, length, index in zip((JOB_COLUMNS1, JOB_COLUMNS2), last['lengths'], last['open_index']):
+        for name in columns:
+            values = np.zeros(length)
+            if name == 'start_sec2':
+                for pending_index, pending_starts in pending:
+                    values[pending_index] = pending_starts
+            closed = np.concatenate(rows[name])
+            values[:len(closed)] = closed
+            values[index] = last['open_rows'][name]
+            lists[name] = values
+
+    snapshot = {key: last['state'][key] for key in LOOP_STATE_KEYS}
+    snapshot['lists'] = lists
+    snapshot['area_marks'] = marks
+    snapshot['sec2_starts'] = None
+    if 'sec2_open' in last['state']:
+        sec2_starts.update(last['state']['sec2_open'])
+        snapshot['sec2_starts'] = sec2_starts
+    return snapshot
+
+
+def save_checkpoint(path: str, header, snapshot):
+    """
+    Записати контрольну точку з усім станом знімка (заголовок і один сегмент).
+
+    Запис іде в тимчасовий файл, який потім замінює попередній, тож збій під
+    час запису не псує вже збережену контрольну точку.
+
+    Повернення:
+        Кінець сегмента (written для _segment наступного дописаного сегмента)
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    segment, written = _segment(snapshot, (0, 0, 0))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'format': CHECKPOINT_FORMAT, 'header': header}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(segment, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return written
+
+
+def load_checkpoint(path: str):
+    """
+    Прочитати контрольну точку.
+
+    Повернення:
+        (заголовок, знімок циклу) або None, якщо файлу немає, він пошкоджений
+        чи записаний в іншому форматі
+    """
+    segments = []
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+            if not isinstance(data, dict) or data.get('format') != CHECKPOINT_FORMAT:
+                return None
+            while True:
+                try:
+                    segments.append(pickle.load(f))
+                except (EOFError, pickle.UnpicklingError, ValueError):
+                    # Кінець файлу або обірваний останній сегмент
+                    break
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    snapshot = _merge(segments)
+    if snapshot is None:
+        return None
+    return data['header'], snapshot
+
+
+def resumable_snapshot(path: str, header, window_start: float):
+    """
+    Знімок з контрольної точки, з якого можна продовжити прогін header.
+
+    Продовжити можна, якщо збігаються параметри динаміки, стан генератора,
+    генератор прибуттів і режим запису початків вторинної обробки, знімок
+    зроблено не пізніше header['N']-ї події типу 1, а площі в знімку
+    накопичені не пізніше, ніж від window_start. Якщо знімок зроблено до
+    window_start, площі починаються заново з window_start (як у прогоні без
+    перерви); інакше продовжуються від збереженого початку t_start.
+
+    Аргументи:
+        window_start: Початок накопичення площ прогону (0 — з першої події)
+
+    Повернення:
+        Знімок циклу або None (прогін починається спочатку)
+    """
+    loaded = load_checkpoint(path)
+    if loaded is None:
+        return None
+    saved, snapshot = loaded
+
+    same_run = all(saved.get(key) == value for key, value in header.items()
+                   if key not in ('N', 'deadlines'))
+    if not same_run or snapshot['arrivals1'] > header['N']:
+        return None
+    if snapshot['t_prev'] <= window_start:
+        snapshot['t_start'] = window_start
+        snapshot['areas'] = (0.0,) * AREA_COUNT
+        snapshot['area_marks'] = array('d', bytes(8 * len(snapshot['area_marks'])))
+    elif snapshot['t_start'] > window_start:
+        return None
+    return snapshot
+
+
+class CheckpointWriter:
+    """
+    Обробник on_snapshot для run_coded_event_loop, що періодично пише контрольну точку.
+
+    Знімок записується, якщо від попереднього запису минуло щонайменше interval
+    секунд, і завжди — після останньої події типу 1 (до спорожнення черг),
+    щоб прогін можна було продовжити з більшим N. Перший запис замінює файл
+    (save_checkpoint), наступні дописують у нього сегменти зі змінами.
+    """
+
+    def __init__(self, path: str, header, interval: float = None):
+        self.path = path
+        self.header = header
+        self.interval = interval
+        self._written = None
+        self._last_write = time.perf_counter()
+
+    def __call__(self, snapshot) -> None:
+        final = snapshot['arrivals1'] == self.header['N']
+        due = self.interval is not None and time.perf_counter() - self._last_write >= self.interval
+        if not (final or due):
+            return
+        if self._written is None:
+            self._written = save_checkpoint(self.path, self.header, snapshot)
+        else:
+            segment, self._written = _segment(snapshot, self._written)
+            with open(self.path, 'ab') as f:
+                pickle.dump(segment, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._last_write = time.perf_counter()
@@ -0,0 +1,329 @@
+import numpy as np # type: ignore
+from collections import deque
+
+from simulation.job_store import JobTable, JOB_COLUMNS1, JOB_COLUMNS2
+from simulation.arrivals import ARRIVAL1, ARRIVAL2, arrival_schedule, split_blocks
+
+# ======================================
+# ЦИКЛ ПОДІЙ З ЦІЛОЧИСЕЛЬНИМИ КОДАМИ
+# ======================================
+
+# Коди станів обробника
+IDLE = 0
+PRIMARY = 1
+SECONDARY = 2
+
+# Коди подій (коди прибуттів — ті самі, що в об'єднаному розкладі прибуттів)
+EV_ARR1 = ARRIVAL1
+EV_ARR2 = ARRIVAL2
+EV_PRIM_DONE = 2
+EV_SEC_DONE = 3
+
+INF = 1e30
+
+# Як часто (у подіях типу 1) перевіряти запит на скасування
+STOP_CHECK_MASK = 0xFFFF
+
+
+# Кількість площ циклу: черги P, S1, S2 і зайнятість P, S1, S2
+AREA_COUNT = 6
+
+
+class SimulationCancelled(Exception):
+    """Симуляцію перервано на запит користувача."""
+
+
+def area_marks_table(area_marks) -> np.ndarray:
+    """Накопичені площі area_marks як масив (подія типу 1 × AREA_COUNT)."""
+    return np.array(area_marks, dtype=float).reshape(-1, AREA_COUNT)
+
+
+def run_coded_event_loop(arr1, N: int, lambda2: float, s1: float, s2: float,
+                         s2b: float, cap2: int, t_start: float, t_end: float,
+                         should_stop=None, area_marks=None, sec2_starts=None,
+                         on_snapshot=None, resume=None):
+    """
+    Головний цикл подій на цілочисельних кодах станів та подій.
+
+    Логіка повністю повторює класичний цикл PriorityQueueSimulation (включно з
+    порядком вибору подій при рівних часах), тому для одного й того ж seed
+    результати збігаються побітово. Відмінності лише у виконанні: прибуття
+    читаються за індексом з об'єднаного розкладу (simulation.arrivals), довжини
+    черг зберігаються у скалярних змінних, записи завдань читаються через
+    memoryview таблиць JobTable, а _schedule_next вбудовано у цикл.
+
+    Журнал подій не ведеться: площі під кривими довжин черг і зайнятості
+    обробників (показники 11-16) накопичуються прямо в циклі, обрізані до
+    [t_start, t_end], у тому ж порядку, що й у _calculate_time_averages.
+
+    Аргументи:
+        arr1: Масив часів прибуття подій типу 1 (індекси 1..N)
+        N: Кількість подій типу 1
+        lambda2, s1, s2, s2b: Параметри моделі
+        cap2: Початкова ємність таблиці подій типу 2 (type2_capacity; не менше N + 1)
+        t_start, t_end: Стаціонарне вікно для часових середніх
+        should_stop: Необов'язкова функція без аргументів; перевіряється кожні
+            STOP_CHECK_MASK + 1 подій типу 1, і якщо повертає True — цикл
+            переривається винятком SimulationCancelled
+        area_marks: Необов'язковий array('d'); якщо задано, після кожної події
+            типу 1 до нього дописуються AREA_COUNT накопичених площ на її момент
+            (рядок i - 1 area_marks_table — для події i), щоб потім рахувати
+            площі для довільного вікна
+        sec2_starts: Необов'язковий dict; якщо задано, до нього записується момент
+            першого початку вторинної обробки кожної події типу 2 (ключ — її номер).
+            На відміну від start_sec2, на нього не впливають завдання типу 1,
+            що обслуговуються з черги S2
+        on_snapshot: Необов'язкова функція. Викликається зі знімком стану циклу
+            (dict) після кожної STOP_CHECK_MASK + 1-ї і після N-ї події типу 1 —
+            до спорожнення черг, тож зі знімка можна продовжити і з більшим N.
+            Знімок посилається на робочі таблиці, area_marks і sec2_starts і
+            дійсний лише до повернення з on_snapshot
+        resume: Знімок, з якого продовжити цикл, з тими самими параметрами
+            моделі, t_start і arr1, що збігається з попереднім на перших
+            arrivals1 подіях; N може бути більшим, ніж при знімку. area_marks і
+            sec2_starts мають бути порожніми — вони відновлюються зі знімка
+
+    Повернення:
+        (cnt2, jobs, areas) — лічильник подій типу 2, dict масивів по завданнях
+        та кортеж площ (черга P, черга S1, черга S2, зайнятість P, S1, S2)
+    """
+    table1 = JobTable(JOB_COLUMNS1, N + 1)
+    table2 = JobTable(JOB_COLUMNS2, max(cap2, N + 1))
+    cnt2 = 0
+    if resume is not None:
+        # Записи подій типу 1 після arrivals1-ї і типу 2 після cnt2-ї — нулі,
+        # тож ємність таблиць при знімку не впливає на результат
+        lists = resume['lists']
+        table2.ensure(len(lists['arr2']) - 1)
+        table1.fill(lists)
+        table2.fill(lists)
+        cnt2 = resume['cnt2']
+
+    start_prim1, end_prim1, start_sec1, end_sec1, rem_sec1 = table1.views()
+    arr2, start_prim2, end_prim2, start_sec2, end_sec2, rem_sec2 = table2.views()
+
+    # Таблиці за типом події для уніфікованої обробки прибуттів
+    start_prim = (None, start_prim1, start_prim2)
+
+    # Розклад прибуттів: блоки по SCHEDULE_BLOCK подій типу 1 (списки Python
+    # існують лише для поточного блоку), далі — лише події типу 2, поки черги
+    # спорожнюються
+    schedule = arrival_schedule(split_blocks([arr1[1:N + 1]]), lambda2)
+    _, sched_times, sched_codes = next(schedule)
+    pos = 0
+    next_prim_done = INF
+    next_sec_done = INF
+    state = IDLE
+
+    # Черги — deque кортежів (тип, номер): у циклі на Python це швидше, ніж
+    # JobQueue (simulation.job_queue); кільцеві буфери int64 — у ядрі рушія "jit"
+    primary_q = deque()
+    secondary_q1 = deque()
+    secondary_q2 = deque()
+    n_pq = n_sq1 = n_sq2 = 0
+
+    cur_prim_type = cur_prim_idx = 0
+    cur_sec_type = cur_sec_idx = 0
+
+    # Накопичувачі площ для часових середніх; t_prev = INF пропускає
+    # відрізок перед першою подією (як і журнал, що починається з неї)
+    area_p = area_s1 = area_s2 = 0.0
+    busy_p = busy_s1 = busy_s2 = 0.0
+    t_prev = INF
+
+    arrivals1 = 0
+
+    if resume is not None:
+        arrivals1 = resume['arrivals1']
+        # Прибуття в розкладі впорядковані за часом, тож перші arrivals1 + cnt2
+        # з них уже оброблено і для більшого N
+        pos = arrivals1 + cnt2
+        while pos >= len(sched_times):
+            pos -= len(sched_times)
+            _, sched_times, sched_codes = next(schedule, (None, [INF], [EV_ARR2]))
+        next_prim_done, next_sec_done = resume['next_times']
+        state, cur_prim_type, cur_prim_idx, cur_sec_type, cur_sec_idx = resume['service']
+        primary_q.extend(resume['queues'][0])
+        secondary_q1.extend(resume['queues'][1])
+        secondary_q2.extend(resume['queues'][2])
+        n_pq, n_sq1, n_sq2 = len(primary_q), len(secondary_q1), len(secondary_q2)
+        area_p, area_s1, area_s2, busy_p, busy_s1, busy_s2 = resume['areas']
+        t_prev = resume['t_prev']
+        if area_marks is not None:
+            area_marks.extend(resume['area_marks'])
+        if sec2_starts is not None:
+            sec2_starts.update(resume['sec2_starts'])
+
+    # Зв'язані методи в локальних змінних — без пошуку атрибутів у циклі
+    pq_push = primary_q.append
+    pq_pop = primary_q.popleft
+    sq1_push = secondary_q1.append
+    sq1_push_front = secondary_q1.appendleft
+    sq1_pop = secondary_q1.popleft
+    sq2_push = secondary_q2.append
+    sq2_push_front = secondary_q2.appendleft
+    sq2_pop = secondary_q2.popleft
+
+    next_arr = sched_times[pos]
+    next_code = sched_codes[pos]
+
+    while arrivals1 < N or state != IDLE or n_pq or n_sq1 or n_sq2:
+        # Вибір наступної події (при рівних часах перемагає прибуття, потім
+        # завершення первинної обробки)
+        t = next_arr
+        ev = next_code
+        if next_prim_done < t:
+            t = next_prim_done
+            ev = EV_PRIM_DONE
+        if next_sec_done < t:
+            t = next_sec_done
+            ev = EV_SEC_DONE
+
+        # Відрізок [t_prev, t] зі станом після попередньої події
+        if t > t_start and t_prev < t_end:
+            dt = (t if t < t_end else t_end) - (t_prev if t_prev > t_start else t_start)
+            if n_pq:
+                area_p += n_pq * dt
+            if n_sq1:
+                area_s1 += n_sq1 * dt
+            if n_sq2:
+                area_s2 += n_sq2 * dt
+            if state == PRIMARY:
+                busy_p += dt
+            elif cur_sec_type == 1:
+                busy_s1 += dt
+            elif cur_sec_type == 2:
+                busy_s2 += dt
+        t_prev = t
+
+        if ev <= EV_ARR2:
+            pos += 1
+            if pos == len(sched_times):
+                # Розклад вичерпано (λ2 = 0) — прибуттів більше немає
+                _, sched_times, sched_codes = next(schedule, (None, [INF], [EV_ARR2]))
+                pos = 0
+            next_arr = sched_times[pos]
+            next_code = sched_codes[pos]
+
+            if ev == EV_ARR1:
+                arrivals1 += 1
+                if not arrivals1 & STOP_CHECK_MASK and should_stop is not None and should_stop():
+                    raise SimulationCancelled()
+                if area_marks is not None:
+                    area_marks.extend((area_p, area_s1, area_s2, busy_p, busy_s1, busy_s2))
+                typ = 1
+                idx = arrivals1
+            else:
+                cnt2 += 1
+                if cnt2 >= len(arr2):
+                    table2.ensure(cnt2)
+                    arr2, start_prim2, end_prim2, start_sec2, end_sec2, rem_sec2 = table2.views()
+                    start_prim = (None, start_prim1, start_prim2)
+                arr2[cnt2] = t
+                typ = 2
+                idx = cnt2
+
+            if state == PRIMARY:
+                pq_push((typ, idx))
+                n_pq += 1
+            else:
+                if state == SECONDARY:
+                    # Перервати вторинну обробку, повернути її в чергу
+                    rem = next_sec_done - t
+                    if rem < 0:
+                        rem = 0
+                    if cur_sec_type == 1:
+                        rem_sec1[cur_sec_idx] = rem
+                        if n_sq1 > 0:
+                            sq1_push_front((1, cur_sec_idx))
+                            n_sq1 += 1
+                        else:
+                            sq2_push((1, cur_sec_idx))
+                            n_sq2 += 1
+                    else:
+                        rem_sec2[cur_sec_idx] = rem
+                        if n_sq2 > 0:
+                            sq2_push_front((2, cur_sec_idx))
+                        else:
+                            sq2_push((2, cur_sec_idx))
+                        n_sq2 += 1
+                    cur_sec_type = cur_sec_idx = 0
+                    next_sec_done = INF
+
+                state = PRIMARY
+                cur_prim_type = typ
+                cur_prim_idx = idx
+                start_prim[typ][idx] = t
+                next_prim_done = t + s1
+
+        else:
+            if ev == EV_PRIM_DONE:
+                if cur_prim_type == 1:
+                    end_prim1[cur_prim_idx] = t
+                    if rem_sec1[cur_prim_idx] <= 0:
+                        rem_sec1[cur_prim_idx] = s2
+                    sq1_push((1, cur_prim_idx))
+                    n_sq1 += 1
+                else:
+                    end_prim2[cur_prim_idx] = t
+                    if rem_sec2[cur_prim_idx] <= 0:
+                        rem_sec2[cur_prim_idx] = s2b
+                    sq2_push((2, cur_prim_idx))
+                    n_sq2 += 1
+                cur_prim_type = cur_prim_idx = 0
+                next_prim_done = INF
+            else:
+                if cur_sec_type == 1:
+                    end_sec1[cur_sec_idx] = t
+                else:
+                    end_sec2[cur_sec_idx] = t
+                cur_sec_type = cur_sec_idx = 0
+                next_sec_done = INF
+
+            # Вибрати наступну дію: primary_q -> S2 -> S1 -> idle
+            if n_pq > 0:
+                cur_prim_type, cur_prim_idx = pq_pop()
+                n_pq -= 1
+                start_prim[cur_prim_type][cur_prim_idx] = t
+                next_prim_done = t + s1
+                state = PRIMARY
+            elif n_sq2 > 0:
+                # Елементи черги S2 обслуговуються за таблицею типу 2
+                cur_sec_type, cur_sec_idx = sq2_pop()
+                n_sq2 -= 1
+                if sec2_starts is not None and cur_sec_type == 2:
+                    sec2_starts.setdefault(cur_sec_idx, t)
+                if start_sec2[cur_sec_idx] == 0:
+                    start_sec2[cur_sec_idx] = t
+                rem = rem_sec2[cur_sec_idx]
+                rem_sec2[cur_sec_idx] = 0
+                next_sec_done = t + (rem if rem > 0 else s2b)
+                state = SECONDARY
+            elif n_sq1 > 0:
+                cur_sec_type, cur_sec_idx = sq1_pop()
+                n_sq1 -= 1
+                if start_sec1[cur_sec_idx] == 0:
+                    start_sec1[cur_sec_idx] = t
+                rem = rem_sec1[cur_sec_idx]
+                rem_sec1[cur_sec_idx] = 0
+                next_sec_done = t + (rem if rem > 0 else s2)
+                state = SECONDARY
+            else:
+                state = IDLE
+
+        if (on_snapshot is not None and ev == EV_ARR1
+                and (arrivals1 == N or not arrivals1 & STOP_CHECK_MASK)):
+            on_snapshot({
+                'arrivals1': arrivals1, 'cnt2': cnt2,
+                'next_times': (next_prim_done, next_sec_done),
+                'service': (state, cur_prim_type, cur_prim_idx, cur_sec_type, cur_sec_idx),
+                'queues': (list(primary_q), list(secondary_q1), list(secondary_q2)),
+                'areas': (area_p, area_s1, area_s2, busy_p, busy_s1, busy_s2),
+                't_prev': t_prev, 't_start': t_start,
+                'lists': {**table1.arrays(), **table2.arrays()},
+                'area_marks': area_marks, 'sec2_starts': sec2_starts,
+            })
+
+    jobs = {**table1.arrays(), **table2.arrays()}
+    del jobs['rem_sec1'], jobs['rem_sec2']
+    return cnt2, jobs, (area_p, area_s1, area_s2, busy_p, busy_s1, busy_s2)
@@ -0,0 +1,47 @@
+import numpy as np # type: ignore
+
+# ======================================
+# КОНТРОЛЬНІ ЗМІННІ
+# ======================================
+# Якщо величина C з відомим математичним сподіванням μ корельована з
+# показником Y, то оцінка Y - β(C - μ) має ту саму границю, що й Y, а її
+# дисперсія менша в 1 - ρ²(Y, C) разів. Коефіцієнти β оцінюються регресією
+# пакетних середніх Y на пакетні середні контрольних змінних; множник
+# (B - 2) / (B - q - 2) враховує втрату точності через оцінювання β
+# (B — кількість пакетів, q — кількість контрольних змінних).
+
+
+def control_variate_adjustment(y_batches, control_batches, control_values, control_means):
+    """
+    Поправка до оцінки показника за контрольними змінними.
+
+    Аргументи:
+        y_batches: Пакетні середні показника (довжина B)
+        control_batches: Пакетні значення контрольних змінних (B × q)
+        control_values: Значення контрольних змінних за весь прогін (довжина q)
+        control_means: Відомі математичні сподівання контрольних змінних (довжина q)
+
+    Повернення:
+        (поправка, яку слід відняти від показника, частка дисперсії, що лишається);
+        якщо контрольні змінні не зменшують дисперсію — (0.0, 1.0)
+    """
+    y = np.asarray(y_batches, dtype=float)
+    controls = np.asarray(control_batches, dtype=float).reshape(len(y), -1)
+    B, q = controls.shape
+    if B - q - 2 <= 0:
+        return 0.0, 1.0
+
+    y_c = y - y.mean()
+    controls_c = controls - controls.mean(axis=0)
+    sst = float(y_c @ y_c)
+    if sst == 0:
+        return 0.0, 1.0
+
+    beta = np.linalg.lstsq(controls_c, y_c, rcond=None)[0]
+    resid = y_c - controls_c @ beta
+    ratio = (float(resid @ resid) / (B - q - 1)) / (sst / (B - 1)) * (B - 2) / (B - q - 2)
+    if not ratio < 1:
+        return 0.0, 1.0
+
+    deviation = np.asarray(control_values, dtype=float) - np.asarray(control_means, dtype=float)
+    return float(beta @ deviation), float(ratio)
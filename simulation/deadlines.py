@@ -0,0 +1,90 @@
+import numpy as np # type: ignore
+from typing import Dict, List
+
+# ======================================
+# ДЕДЛАЙНИ ТА РОЗПОДІЛ ЧАСУ ПЕРЕБУВАННЯ
+# ======================================
+# D1 і D2 не впливають на динаміку системи — вони лише порівнюються з часом
+# перебування завдань (показники 17 і 18). Тому один прогін з відсортованими
+# часами перебування дає частку запізнілих завдань для будь-якого дедлайну.
+
+DEADLINE_PARAMS = ('D1', 'D2')
+
+# Тривалості обробки детерміновані, тож час перебування з додатною ймовірністю
+# дорівнює дедлайну точно (сума s1 і s2b), а у float — з похибкою округлення,
+# що росте з моментом прибуття. Правило одне для всіх оцінок: завершення в
+# момент дедлайну — вчасне, запізнення — T > D з відносним допуском
+DEADLINE_TOLERANCE = 1e-6
+
+
+def late_threshold(deadline):
+    """Поріг запізнення: час перебування більше нього — порушення дедлайну."""
+    return deadline + DEADLINE_TOLERANCE * np.maximum(1.0, np.abs(deadline))
+
+
+class SojournProfile:
+    """
+    Емпіричний розподіл часу перебування завдань у стаціонарному вікні.
+
+    Зберігає відсортовані вибірки для обох типів подій; частка запізнілих
+    завдань для довільного дедлайну рахується бінарним пошуком і точно
+    збігається з показниками 17 і 18 повної симуляції з тим самим дедлайном.
+    """
+
+    def __init__(self, sojourn1=(), sojourn2=()):
+        self.sojourn1 = np.sort(np.asarray(sojourn1, dtype=float))
+        self.sojourn2 = np.sort(np.asarray(sojourn2, dtype=float))
+
+    def violation_probability(self, deadline, job_type: int = 1):
+        """
+        Частка завдань з часом перебування більше deadline (P(T > d)).
+
+        Аргументи:
+            deadline: Дедлайн або масив дедлайнів
+            job_type: 1 — події МРЧ (показник 17), 2 — події жорсткого РЧ (показник 18)
+
+        Повернення:
+            float для скалярного дедлайну, інакше np.ndarray
+        """
+        samples = self.sojourn1 if job_type == 1 else self.sojourn2
+        if len(samples) == 0:
+            return 0.0 if np.ndim(deadline) == 0 else np.zeros(np.shape(deadline))
+
+        late = len(samples) - np.searchsorted(samples, late_threshold(deadline), side='right')
+        if np.ndim(late) == 0:
+            return int(late) / len(samples)
+        return late / len(samples)
+
+    def cdf(self, t, job_type: int = 1):
+        """Емпірична функція розподілу часу перебування P(T <= t)."""
+        return 1.0 - self.violation_probability(t, job_type)
+
+    def apply_deadlines(self, results: Dict, D1: float, D2: float) -> Dict:
+        """Копія результатів прогону з показниками 17 і 18 для інших дедлайнів."""
+        updated = dict(results)
+        updated[17] = self.violation_probability(D1, 1)
+        updated[18] = self.violation_probability(D2, 2)
+        return updated
+
+
+def dynamics_key(params: Dict) -> tuple:
+    """Ключ параметрів, що визначають динаміку (усі, крім дедлайнів)."""
+    return tuple(sorted((name, value) for name, value in params.items()
+                        if name not in DEADLINE_PARAMS))
+
+
+def shared_deadline_seeds(parameters: List, seeds: List) -> List:
+    """
+    Seed для спільного прогону сценаріїв, що відрізняються лише D1/D2.
+
+    Кожен такий сценарій отримує seed першого стовпця зі своєї групи, тож
+    run_scenarios виконує для групи одну симуляцію, а точки кривої дедлайнів
+    отримують спільні випадкові числа. Для None-параметрів seed не змінюється.
+    """
+    first_seed = {}
+    shared = list(seeds)
+    for i, params in enumerate(parameters):
+        if params is None:
+            continue
+        shared[i] = first_seed.setdefault(dynamics_key(params), seeds[i])
+    return shared
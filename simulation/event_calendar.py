@@ -0,0 +1,263 @@
+import heapq
+from collections import deque
+
+from simulation.coded_engine import IDLE, PRIMARY, SECONDARY, INF, STOP_CHECK_MASK, SimulationCancelled
+from simulation.job_store import JobTable
+
+# ======================================
+# ЦИКЛ ПОДІЙ З КАЛЕНДАРЕМ ДЛЯ K КЛАСІВ ПОДІЙ
+# ======================================
+# Узагальнення run_coded_event_loop на довільну кількість класів. Наступні
+# події зберігаються в бінарній купі (heapq) — вибір наступної події коштує
+# O(log K) замість порівняння K + 2 кандидатів, — а записи завдань кожного класу
+# — у таблиці JobTable (JOB_COLUMNS), тож код прибуття, первинної та вторинної
+# обробки один для всіх класів.
+#
+# Модель та сама: спільна FIFO-черга первинної обробки з абсолютним пріоритетом
+# над вторинною, для кожного класу — своя черга вторинної обробки; вільний
+# обробник бере вторинну обробку з черги класу з найменшим priority. Перервана
+# вторинна обробка повертається на початок своєї черги.
+#
+# З legacy_slots=True відтворюється поведінка інших рушіїв: якщо черга
+# перерваної події порожня, подія стає в кінець черги найвищого пріоритету і
+# обслуговується за таблицею класу цієї черги (з чужим залишком і моментом
+# початку). Так для two_class_model результати побітово ті самі, що й у
+# run_simulation_priority2_full.
+
+# Коди подій календаря; при рівних часах першою обробляється подія з меншим
+# кодом, а прибуття — в порядку класів (як у run_coded_event_loop)
+EV_ARRIVAL = 0
+EV_PRIM_DONE = 1
+EV_SEC_DONE = 2
+
+# Стовпці таблиці завдань класу
+JOB_COLUMNS = ('arr', 'start_prim', 'end_prim', 'start_sec', 'end_sec', 'rem_sec')
+ARR, START_PRIM, END_PRIM, START_SEC, END_SEC, REM_SEC = range(len(JOB_COLUMNS))
+
+ARRIVAL_PROCESSES = ("poisson", "periodic")
+
+
+class JobClass:
+    """
+    Клас подій (завдань реального часу) моделі з K класами.
+
+    Класи з пуассонівським потоком відповідають м'якому реальному часу (як
+    події типу 1), з періодичним — жорсткому (як події типу 2 з дедлайном D2).
+    """
+
+    def __init__(self, name: str, rate: float, primary: float, secondary: float,
+                 priority: int = 0, deadline: float = INF, arrival: str = "poisson"):
+        """
+        Аргументи:
+            name: Назва класу (ключ у результатах)
+            rate: Інтенсивність потоку λ
+            primary: Тривалість первинної обробки
+            secondary: Тривалість вторинної обробки
+            priority: Пріоритет черги вторинної обробки (менше — раніше)
+            deadline: Дедлайн часу перебування (частка запізнілих подій)
+            arrival: "poisson" — пуассонівський потік, "periodic" — прибуття
+                кожні 1 / rate, перше — в момент 1 / rate
+        """
+        if arrival not in ARRIVAL_PROCESSES:
+            raise ValueError(f"Невідомий потік прибуттів: {arrival}")
+        self.name = name
+        self.rate = rate
+        self.primary = primary
+        self.secondary = secondary
+        self.priority = priority
+        self.deadline = deadline
+        self.arrival = arrival
+
+
+def two_class_model(lambda1: float, s1: float, s2: float, lambda2: float, s2b: float,
+                    D1: float = INF, D2: float = INF):
+    """Класи моделі run_simulation_priority2_full: події типу 1 і типу 2 (вища черга S2)."""
+    return [
+        JobClass("type1", lambda1, s1, s2, priority=1, deadline=D1, arrival="poisson"),
+        JobClass("type2", lambda2, s1, s2b, priority=0, deadline=D2, arrival="periodic"),
+    ]
+
+
+def periodic_arrivals(rate: float):
+    """Нескінченний потік прибуттів у моменти 1 / rate, 2 / rate, ... (кожен обчислюється окремо)."""
+    if rate <= 0:
+        return
+    k = 1
+    while True:
+        yield k / rate
+        k += 1
+
+
+def run_calendar_event_loop(classes, arrival_streams, N: int, capacities,
+                            t_start: float, t_end: float, should_stop=None,
+                            legacy_slots: bool = False):
+    """
+    Цикл подій для K класів з календарем на бінарній купі.
+
+    Перший клас — опорний: цикл моделює N його прибуттів і працює, доки
+    обробник не звільниться і черги не спорожніють (прибуття інших класів
+    тим часом тривають, як і події типу 2 у run_coded_event_loop).
+
+    Аргументи:
+        classes: Список JobClass
+        arrival_streams: Для кожного класу ітерабельне зростаючих моментів
+            прибуття (для опорного — щонайменше N, для інших — необмежене)
+        N: Кількість прибуттів опорного класу
+        capacities: Початкова ємність таблиці завдань кожного класу (номери
+            завдань починаються з 1; за потреби таблиця розширюється)
+        t_start, t_end: Стаціонарне вікно для часових середніх
+        should_stop: Як у run_coded_event_loop (перевіряється за прибуттями
+            опорного класу)
+        legacy_slots: Повертати перервану подію з порожньою чергою в чергу
+            найвищого пріоритету, як інші рушії (див. вище)
+
+    Повернення:
+        (counts, tables, areas) — кількість прибуттів кожного класу, таблиці
+        завдань JobTable і кортеж площ (черга первинної обробки,
+        зайнятість первинної обробки, список площ черг вторинної обробки,
+        список зайнятості вторинною обробкою подій кожного класу)
+    """
+    K = len(classes)
+    primary = [job_class.primary for job_class in classes]
+    secondary = [job_class.secondary for job_class in classes]
+    # Черги вторинної обробки в порядку обслуговування
+    order = sorted(range(K), key=lambda k: (classes[k].priority, k))
+    top = order[0]
+
+    tables = [JobTable(JOB_COLUMNS, capacity) for capacity in capacities]
+    # Стовпці таблиць (memoryview); оновлюються після розширення таблиці
+    rows = [table.views() for table in tables]
+    counts = [0] * K
+    streams = [iter(stream) for stream in arrival_streams]
+
+    # Календар: (час, код події, клас або номер запланованої вторинної обробки)
+    calendar = []
+    push = heapq.heappush
+    pop = heapq.heappop
+    for k in range(K):
+        t_next = next(streams[k], None)
+        if t_next is not None and (k != 0 or N > 0):
+            push(calendar, (t_next, EV_ARRIVAL, k))
+    # Завершення перерваної вторинної обробки лишається в купі і пропускається
+    # за номером (ледаче видалення)
+    sec_token = 0
+    next_sec_done = INF
+
+    state = IDLE
+    primary_q = deque()
+    secondary_qs = [deque() for _ in range(K)]
+    n_pq = 0
+    n_sq = [0] * K
+
+    cur_prim_class = cur_prim_idx = 0
+    cur_sec_class = cur_sec_idx = -1
+
+    area_p = busy_p = 0.0
+    area_sq = [0.0] * K
+    busy_sec = [0.0] * K
+    t_prev = INF
+
+    while counts[0] < N or state != IDLE or n_pq or any(n_sq):
+        t, ev, key = pop(calendar)
+        if ev == EV_SEC_DONE and key != sec_token:
+            continue
+
+        # Відрізок [t_prev, t] зі станом після попередньої події
+        if t > t_start and t_prev < t_end:
+            dt = (t if t < t_end else t_end) - (t_prev if t_prev > t_start else t_start)
+            if n_pq:
+                area_p += n_pq * dt
+            for k in range(K):
+                if n_sq[k]:
+                    area_sq[k] += n_sq[k] * dt
+            if state == PRIMARY:
+                busy_p += dt
+            elif state == SECONDARY:
+                busy_sec[cur_sec_class] += dt
+        t_prev = t
+
+        if ev == EV_ARRIVAL:
+            k = key
+            counts[k] += 1
+            idx = counts[k]
+            if k == 0:
+                if not idx & STOP_CHECK_MASK and should_stop is not None and should_stop():
+                    raise SimulationCancelled()
+            elif tables[k].ensure(idx):
+                rows[k] = tables[k].views()
+            table = rows[k]
+            table[ARR][idx] = t
+            if k != 0 or idx < N:
+                t_next = next(streams[k], None)
+                if t_next is not None:
+                    push(calendar, (t_next, EV_ARRIVAL, k))
+
+            if state == PRIMARY:
+                primary_q.append((k, idx))
+                n_pq += 1
+            else:
+                if state == SECONDARY:
+                    # Перервати вторинну обробку, повернути її в чергу
+                    rem = next_sec_done - t
+                    if rem < 0:
+                        rem = 0
+                    rows[cur_sec_class][REM_SEC][cur_sec_idx] = rem
+                    if n_sq[cur_sec_class] > 0 or not legacy_slots:
+                        secondary_qs[cur_sec_class].appendleft((cur_sec_class, cur_sec_idx))
+                        n_sq[cur_sec_class] += 1
+                    else:
+                        secondary_qs[top].append((cur_sec_class, cur_sec_idx))
+                        n_sq[top] += 1
+                    cur_sec_class = cur_sec_idx = -1
+                    next_sec_done = INF
+                    sec_token += 1
+
+                state = PRIMARY
+                cur_prim_class = k
+                cur_prim_idx = idx
+                table[START_PRIM][idx] = t
+                push(calendar, (t + primary[k], EV_PRIM_DONE, 0))
+
+        else:
+            if ev == EV_PRIM_DONE:
+                k = cur_prim_class
+                table = rows[k]
+                table[END_PRIM][cur_prim_idx] = t
+                if table[REM_SEC][cur_prim_idx] <= 0:
+                    table[REM_SEC][cur_prim_idx] = secondary[k]
+                secondary_qs[k].append((k, cur_prim_idx))
+                n_sq[k] += 1
+            else:
+                rows[cur_sec_class][END_SEC][cur_sec_idx] = t
+                cur_sec_class = cur_sec_idx = -1
+                next_sec_done = INF
+
+            # Вибрати наступну дію: черга первинної обробки, потім черги
+            # вторинної обробки за пріоритетом, інакше простій
+            if n_pq > 0:
+                cur_prim_class, cur_prim_idx = primary_q.popleft()
+                n_pq -= 1
+                rows[cur_prim_class][START_PRIM][cur_prim_idx] = t
+                push(calendar, (t + primary[cur_prim_class], EV_PRIM_DONE, 0))
+                state = PRIMARY
+            else:
+                state = IDLE
+                for q in order:
+                    if n_sq[q] > 0:
+                        # Елементи черги обслуговуються за таблицею її класу
+                        cur_sec_class, cur_sec_idx = secondary_qs[q].popleft()
+                        n_sq[q] -= 1
+                        if tables[q].ensure(cur_sec_idx):
+                            rows[q] = tables[q].views()
+                        table = rows[q]
+                        if table[START_SEC][cur_sec_idx] == 0:
+                            table[START_SEC][cur_sec_idx] = t
+                        rem = table[REM_SEC][cur_sec_idx]
+                        table[REM_SEC][cur_sec_idx] = 0
+                        next_sec_done = t + (rem if rem > 0 else secondary[q])
+                        sec_token += 1
+                        push(calendar, (next_sec_done, EV_SEC_DONE, sec_token))
+                        state = SECONDARY
+                        break
+
+    return counts, tables, (area_p, busy_p, area_sq, busy_sec)
@@ -0,0 +1,390 @@
+import numpy as np # type: ignore
+
+from simulation.coded_engine import (IDLE, PRIMARY, SECONDARY, EV_ARR1, EV_ARR2, EV_PRIM_DONE,
+                                     EV_SEC_DONE, INF, STOP_CHECK_MASK, SimulationCancelled,
+                                     run_coded_event_loop)
+from simulation.job_store import JobTable, JOB_COLUMNS1, JOB_COLUMNS2
+from simulation.job_queue import JOB_INDEX_SHIFT, JOB_TYPE_MASK, QUEUE_CAPACITY
+from simulation.arrivals import merge_arrivals, type2_arrivals
+
+# ======================================
+# JIT-КОМПІЛЬОВАНИЙ ЦИКЛ ПОДІЙ (NUMBA)
+# ======================================
+# Логіка run_coded_event_loop у вигляді ядра на масивах фіксованого типу:
+# розклад прибуттів — масиви часів і кодів, записи завдань — блоки таблиць
+# JobTable, черги — кільцеві буфери int64 з елементами pack_job (як у JobQueue,
+# simulation.job_queue), скалярний стан — масиви istate і fstate. numba
+# імпортується лише при першому виклику run_jit_event_loop (інші рушії і
+# процеси пулу її не завантажують): якщо її встановлено, ядро компілюється
+# (numba.njit) і цикл виконується без інтерпретатора; якщо ні —
+# run_jit_event_loop просто викликає run_coded_event_loop.
+#
+# Ядро не розширює масиви і не викликає код Python: коли не вистачає місця в
+# таблиці типу 2 чи в черзі, або настав час перевірити запит на скасування,
+# воно повертає код статусу до обробки чергової події, а обгортка розширює
+# масиви і викликає ядро знову — весь стан циклу лежить у масивах.
+#
+# Результати побітово ті самі, що й у run_coded_event_loop: ті самі операції
+# над float64 у тому самому порядку.
+
+# Коди статусу ядра
+KERNEL_DONE = 0
+KERNEL_PAUSED = 1  # Досягнуто stop_at (перевірка should_stop)
+KERNEL_GROW_TABLE2 = 2
+KERNEL_GROW_QUEUES = 3
+
+# Цілочисельний стан циклу (istate)
+(I_POS, I_ARRIVALS1, I_CNT2, I_STATE, I_PRIM_TYPE, I_PRIM_IDX, I_SEC_TYPE, I_SEC_IDX,
+ I_PQ_HEAD, I_PQ_LEN, I_SQ1_HEAD, I_SQ1_LEN, I_SQ2_HEAD, I_SQ2_LEN) = range(14)
+ISTATE_SIZE = 14
+
+# Дійсний стан циклу (fstate): часи завершень, момент попередньої події і площі
+(F_PRIM_DONE, F_SEC_DONE, F_PREV, F_AREA_P, F_AREA_S1, F_AREA_S2,
+ F_BUSY_P, F_BUSY_S1, F_BUSY_S2) = range(9)
+FSTATE_SIZE = 9
+
+# Черги (рядки масиву queues): первинна, S1, S2
+Q_PRIMARY, Q_SEC1, Q_SEC2 = range(3)
+
+
+def _event_loop_kernel(sched_times, sched_codes, N, lambda2, s1, s2, s2b, t_start, t_end,
+                       stop_at, block1, block2, queues, istate, fstate):
+    """
+    Цикл подій run_coded_event_loop над масивами (компілюється numba).
+
+    Аргументи:
+        sched_times, sched_codes: Об'єднаний розклад прибуттів до N-ї події
+            типу 1 (далі події типу 2 — в моменти k / λ2)
+        N, lambda2, s1, s2, s2b: Параметри моделі
+        t_start, t_end: Стаціонарне вікно для часових середніх
+        stop_at: Повернути KERNEL_PAUSED, коли кількість подій типу 1 досягне stop_at
+        block1, block2: Блоки таблиць завдань типу 1 і 2 (JOB_COLUMNS1, JOB_COLUMNS2)
+        queues: Кільцеві буфери черг (3 × ємність — степінь двійки)
+        istate, fstate: Стан циклу (змінюється на місці)
+
+    Повернення:
+        Код статусу KERNEL_*
+    """
+    start_prim1 = block1[0]
+    end_prim1 = block1[1]
+    start_sec1 = block1[2]
+    end_sec1 = block1[3]
+    rem_sec1 = block1[4]
+    arr2 = block2[0]
+    start_prim2 = block2[1]
+    end_prim2 = block2[2]
+    start_sec2 = block2[3]
+    end_sec2 = block2[4]
+    rem_sec2 = block2[5]
+    pq = queues[Q_PRIMARY]
+    sq1 = queues[Q_SEC1]
+    sq2 = queues[Q_SEC2]
+    n_sched = len(sched_times)
+    capacity2 = block2.shape[1]
+    queue_capacity = queues.shape[1]
+    mask = queue_capacity - 1
+
+    pos = istate[I_POS]
+    arrivals1 = istate[I_ARRIVALS1]
+    cnt2 = istate[I_CNT2]
+    state = istate[I_STATE]
+    cur_prim_type = istate[I_PRIM_TYPE]
+    cur_prim_idx = istate[I_PRIM_IDX]
+    cur_sec_type = istate[I_SEC_TYPE]
+    cur_sec_idx = istate[I_SEC_IDX]
+    pq_head = istate[I_PQ_HEAD]
+    n_pq = istate[I_PQ_LEN]
+    sq1_head = istate[I_SQ1_HEAD]
+    n_sq1 = istate[I_SQ1_LEN]
+    sq2_head = istate[I_SQ2_HEAD]
+    n_sq2 = istate[I_SQ2_LEN]
+
+    next_prim_done = fstate[F_PRIM_DONE]
+    next_sec_done = fstate[F_SEC_DONE]
+    t_prev = fstate[F_PREV]
+    area_p = fstate[F_AREA_P]
+    area_s1 = fstate[F_AREA_S1]
+    area_s2 = fstate[F_AREA_S2]
+    busy_p = fstate[F_BUSY_P]
+    busy_s1 = fstate[F_BUSY_S1]
+    busy_s2 = fstate[F_BUSY_S2]
+
+    status = KERNEL_DONE
+    while arrivals1 < N or state != IDLE or n_pq or n_sq1 or n_sq2:
+        if arrivals1 >= stop_at:
+            status = KERNEL_PAUSED
+            break
+        # Подія додає щонайбільше один елемент у кожну чергу
+        if n_pq == queue_capacity or n_sq1 == queue_capacity or n_sq2 == queue_capacity:
+            status = KERNEL_GROW_QUEUES
+            break
+
+        if pos < n_sched:
+            next_arr = sched_times[pos]
+            next_code = sched_codes[pos]
+        elif lambda2 > 0:
+            next_arr = (cnt2 + 1) / lambda2
+            next_code = EV_ARR2
+        else:
+            next_arr = INF
+            next_code = EV_ARR2
+        if next_code == EV_ARR2 and cnt2 + 1 >= capacity2:
+            status = KERNEL_GROW_TABLE2
+            break
+
+        # Вибір наступної події (при рівних часах перемагає прибуття, потім
+        # завершення первинної обробки)
+        t = next_arr
+        ev = next_code
+        if next_prim_done < t:
+            t = next_prim_done
+            ev = EV_PRIM_DONE
+        if next_sec_done < t:
+            t = next_sec_done
+            ev = EV_SEC_DONE
+
+        # Відрізок [t_prev, t] зі станом після попередньої події
+        if t > t_start and t_prev < t_end:
+            dt = (t if t < t_end else t_end) - (t_prev if t_prev > t_start else t_start)
+            if n_pq:
+                area_p += n_pq * dt
+            if n_sq1:
+                area_s1 += n_sq1 * dt
+            if n_sq2:
+                area_s2 += n_sq2 * dt
+            if state == PRIMARY:
+                busy_p += dt
+            elif cur_sec_type == 1:
+                busy_s1 += dt
+            elif cur_sec_type == 2:
+                busy_s2 += dt
+        t_prev = t
+
+        if ev <= EV_ARR2:
+            pos += 1
+            if ev == EV_ARR1:
+                arrivals1 += 1
+                typ = 1
+                idx = arrivals1
+            else:
+                cnt2 += 1
+                arr2[cnt2] = t
+                typ = 2
+                idx = cnt2
+
+            if state == PRIMARY:
+                pq[(pq_head + n_pq) & mask] = idx << JOB_INDEX_SHIFT | typ
+                n_pq += 1
+            else:
+                if state == SECONDARY:
+                    # Перервати вторинну обробку, повернути її в чергу
+                    rem = next_sec_done - t
+                    if rem < 0:
+                        rem = 0.0
+                    if cur_sec_type == 1:
+                        rem_sec1[cur_sec_idx] = rem
+                        if n_sq1 > 0:
+                            sq1_head = (sq1_head - 1) & mask
+                            sq1[sq1_head] = cur_sec_idx << JOB_INDEX_SHIFT | 1
+                            n_sq1 += 1
+                        else:
+                            sq2[(sq2_head + n_sq2) & mask] = cur_sec_idx << JOB_INDEX_SHIFT | 1
+                            n_sq2 += 1
+                    else:
+                        rem_sec2[cur_sec_idx] = rem
+                        if n_sq2 > 0:
+                            sq2_head = (sq2_head - 1) & mask
+                            sq2[sq2_head] = cur_sec_idx << JOB_INDEX_SHIFT | 2
+                        else:
+                            sq2[(sq2_head + n_sq2) & mask] = cur_sec_idx << JOB_INDEX_SHIFT | 2
+                        n_sq2 += 1
+                    cur_sec_type = 0
+                    cur_sec_idx = 0
+                    next_sec_done = INF
+
+                state = PRIMARY
+                cur_prim_type = typ
+                cur_prim_idx = idx
+                if typ == 1:
+                    start_prim1[idx] = t
+                else:
+                    start_prim2[idx] = t
+                next_prim_done = t + s1
+
+        else:
+            if ev == EV_PRIM_DONE:
+                if cur_prim_type == 1:
+                    end_prim1[cur_prim_idx] = t
+                    if rem_sec1[cur_prim_idx] <= 0:
+                        rem_sec1[cur_prim_idx] = s2
+                    sq1[(sq1_head + n_sq1) & mask] = cur_prim_idx << JOB_INDEX_SHIFT | 1
+                    n_sq1 += 1
+                else:
+                    end_prim2[cur_prim_idx] = t
+                    if rem_sec2[cur_prim_idx] <= 0:
+                        rem_sec2[cur_prim_idx] = s2b
+                    sq2[(sq2_head + n_sq2) & mask] = cur_prim_idx << JOB_INDEX_SHIFT | 2
+                    n_sq2 += 1
+                cur_prim_type = 0
+                cur_prim_idx = 0
+                next_prim_done = INF
+            else:
+                if cur_sec_type == 1:
+                    end_sec1[cur_sec_idx] = t
+                else:
+                    end_sec2[cur_sec_idx] = t
+                cur_sec_type = 0
+                cur_sec_idx = 0
+                next_sec_done = INF
+
+            # Вибрати наступну дію: primary_q -> S2 -> S1 -> idle
+            if n_pq > 0:
+                item = pq[pq_head]
+                pq_head = (pq_head + 1) & mask
+                n_pq -= 1
+                cur_prim_type = item & JOB_TYPE_MASK
+                cur_prim_idx = item >> JOB_INDEX_SHIFT
+                if cur_prim_type == 1:
+                    start_prim1[cur_prim_idx] = t
+                else:
+                    start_prim2[cur_prim_idx] = t
+                next_prim_done = t + s1
+                state = PRIMARY
+            elif n_sq2 > 0:
+                # Елементи черги S2 обслуговуються за таблицею типу 2
+                item = sq2[sq2_head]
+                sq2_head = (sq2_head + 1) & mask
+                n_sq2 -= 1
+                cur_sec_type = item & JOB_TYPE_MASK
+                cur_sec_idx = item >> JOB_INDEX_SHIFT
+                if start_sec2[cur_sec_idx] == 0:
+                    start_sec2[cur_sec_idx] = t
+                rem = rem_sec2[cur_sec_idx]
+                rem_sec2[cur_sec_idx] = 0
+                next_sec_done = t + (rem if rem > 0 else s2b)
+                state = SECONDARY
+            elif n_sq1 > 0:
+                item = sq1[sq1_head]
+                sq1_head = (sq1_head + 1) & mask
+                n_sq1 -= 1
+                cur_sec_type = item & JOB_TYPE_MASK
+                cur_sec_idx = item >> JOB_INDEX_SHIFT
+                if start_sec1[cur_sec_idx] == 0:
+                    start_sec1[cur_sec_idx] = t
+                rem = rem_sec1[cur_sec_idx]
+                rem_sec1[cur_sec_idx] = 0
+                next_sec_done = t + (rem if rem > 0 else s2)
+                state = SECONDARY
+            else:
+                state = IDLE
+
+    istate[I_POS] = pos
+    istate[I_ARRIVALS1] = arrivals1
+    istate[I_CNT2] = cnt2
+    istate[I_STATE] = state
+    istate[I_PRIM_TYPE] = cur_prim_type
+    istate[I_PRIM_IDX] = cur_prim_idx
+    istate[I_SEC_TYPE] = cur_sec_type
+    istate[I_SEC_IDX] = cur_sec_idx
+    istate[I_PQ_HEAD] = pq_head
+    istate[I_PQ_LEN] = n_pq
+    istate[I_SQ1_HEAD] = sq1_head
+    istate[I_SQ1_LEN] = n_sq1
+    istate[I_SQ2_HEAD] = sq2_head
+    istate[I_SQ2_LEN] = n_sq2
+
+    fstate[F_PRIM_DONE] = next_prim_done
+    fstate[F_SEC_DONE] = next_sec_done
+    fstate[F_PREV] = t_prev
+    fstate[F_AREA_P] = area_p
+    fstate[F_AREA_S1] = area_s1
+    fstate[F_AREA_S2] = area_s2
+    fstate[F_BUSY_P] = busy_p
+    fstate[F_BUSY_S1] = busy_s1
+    fstate[F_BUSY_S2] = busy_s2
+    return status
+
+
+def _grow_queues(queues, istate):
+    """Кільцеві буфери черг удвічі більшої ємності; елементи — з початку буфера."""
+    capacity = queues.shape[1]
+    grown = np.zeros((queues.shape[0], 2 * capacity), dtype=np.int64)
+    for row, head, length in ((Q_PRIMARY, I_PQ_HEAD, I_PQ_LEN), (Q_SEC1, I_SQ1_HEAD, I_SQ1_LEN),
+                              (Q_SEC2, I_SQ2_HEAD, I_SQ2_LEN)):
+        order = (istate[head] + np.arange(istate[length])) & (capacity - 1)
+        grown[row, :len(order)] = queues[row, order]
+        istate[head] = 0
+    return grown
+
+
+_compiled_kernel = None  # Скомпільоване ядро; False — numba не встановлено
+
+
+def _compile_kernel():
+    """
+    Скомпільоване numba ядро _event_loop_kernel або None, якщо numba не
+    встановлено. numba імпортується при першому виклику.
+    """
+    global _compiled_kernel
+    if _compiled_kernel is None:
+        try:
+            import numba # type: ignore
+        except ImportError:
+            _compiled_kernel = False
+        else:
+            _compiled_kernel = numba.njit(cache=True)(_event_loop_kernel)
+    return _compiled_kernel or None
+
+
+def _run_kernel(arr1, N: int, lambda2: float, s1: float, s2: float, s2b: float, cap2: int,
+                t_start: float, t_end: float, should_stop=None, kernel=_event_loop_kernel):
+    """
+    Виконати ядро до кінця (результат як у run_coded_event_loop).
+
+    kernel — _event_loop_kernel (інтерпретується Python) або результат
+    _compile_kernel.
+    """
+    table1 = JobTable(JOB_COLUMNS1, N + 1)
+    table2 = JobTable(JOB_COLUMNS2, max(cap2, N + 1))
+    sched_times, sched_codes = merge_arrivals(arr1[1:N + 1], type2_arrivals(lambda2, arr1[N]))
+    queues = np.zeros((3, QUEUE_CAPACITY), dtype=np.int64)
+    istate = np.zeros(ISTATE_SIZE, dtype=np.int64)
+    istate[I_STATE] = IDLE
+    fstate = np.zeros(FSTATE_SIZE)
+    fstate[[F_PRIM_DONE, F_SEC_DONE, F_PREV]] = INF
+
+    while True:
+        # Пауза на кожній події типу 1 з номером, кратним STOP_CHECK_MASK + 1
+        stop_at = (int(istate[I_ARRIVALS1]) | STOP_CHECK_MASK) + 1 if should_stop is not None else N + 1
+        status = kernel(sched_times, sched_codes, N, float(lambda2), float(s1), float(s2),
+                        float(s2b), float(t_start), float(t_end), stop_at,
+                        table1.block, table2.block, queues, istate, fstate)
+        if status == KERNEL_DONE:
+            break
+        if status == KERNEL_GROW_TABLE2:
+            table2.ensure(int(istate[I_CNT2]) + 1)
+        elif status == KERNEL_GROW_QUEUES:
+            queues = _grow_queues(queues, istate)
+        elif should_stop():
+            raise SimulationCancelled()
+
+    jobs = {**table1.arrays(), **table2.arrays()}
+    del jobs['rem_sec1'], jobs['rem_sec2']
+    areas = tuple(float(value) for value in fstate[F_AREA_P:F_BUSY_S2 + 1])
+    return int(istate[I_CNT2]), jobs, areas
+
+
+def run_jit_event_loop(arr1, N: int, lambda2: float, s1: float, s2: float, s2b: float,
+                       cap2: int, t_start: float, t_end: float, should_stop=None):
+    """
+    Цикл подій рушія "jit": скомпільоване ядро, якщо встановлено numba, інакше
+    run_coded_event_loop.
+
+    Аргументи і результат — як у run_coded_event_loop без необов'язкових
+    накопичувачів (area_marks, sec2_starts і контрольних точок).
+    Перший виклик у процесі імпортує numba і компілює ядро (кешується на диску).
+    """
+    kernel = _compile_kernel()
+    if kernel is None:
+        return run_coded_event_loop(arr1, N, lambda2, s1, s2, s2b, cap2, t_start, t_end, should_stop)
+    return _run_kernel(arr1, N, lambda2, s1, s2, s2b, cap2, t_start, t_end, should_stop, kernel)
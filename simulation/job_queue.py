@@ -0,0 +1,80 @@
+import numpy as np # type: ignore
+
+# ======================================
+# ЧЕРГИ ЗАВДАНЬ У КІЛЬЦЕВИХ БУФЕРАХ
+# ======================================
+# Елемент черги — одне ціле int64: номер завдання, зсунутий на JOB_INDEX_SHIFT
+# біт, і тип події (1 або 2) у молодших бітах. Черга — кільцевий буфер
+# фіксованої ємності (степінь двійки) з додаванням в обидва кінці: перервана
+# вторинна обробка повертається на початок черги. Буфер подвоюється, лише
+# коли заповнений, тож постановка в чергу не створює кортежів і об'єктів
+# Python, а елемент займає 8 байт.
+
+JOB_INDEX_SHIFT = 2
+JOB_TYPE_MASK = (1 << JOB_INDEX_SHIFT) - 1
+
+QUEUE_CAPACITY = 1024  # Початкова ємність черги (степінь двійки)
+
+
+def pack_job(typ: int, idx: int) -> int:
+    """Елемент черги для завдання idx типу typ."""
+    return idx << JOB_INDEX_SHIFT | typ
+
+
+def unpack_job(code: int):
+    """(тип, номер) завдання з елемента черги."""
+    return code & JOB_TYPE_MASK, code >> JOB_INDEX_SHIFT
+
+
+class JobQueue:
+    """FIFO-черга завдань (елементи pack_job) у кільцевому буфері int64."""
+
+    __slots__ = ('_block', '_buf', '_mask', '_head', '_count')
+
+    def __init__(self, capacity: int = QUEUE_CAPACITY):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self._block = np.zeros(size, dtype=np.int64)
+        self._buf = memoryview(self._block)
+        self._mask = size - 1
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self) -> None:
+        """Подвоїти ємність; елементи — з початку нового буфера."""
+        size = self._mask + 1
+        order = (self._head + np.arange(self._count)) & self._mask
+        grown = np.zeros(2 * size, dtype=np.int64)
+        grown[:self._count] = self._block[order]
+        self._block = grown
+        self._buf = memoryview(grown)
+        self._mask = 2 * size - 1
+        self._head = 0
+
+    def push_back(self, code: int) -> None:
+        if self._count > self._mask:
+            self._grow()
+        self._buf[(self._head + self._count) & self._mask] = code
+        self._count += 1
+
+    def push_front(self, code: int) -> None:
+        if self._count > self._mask:
+            self._grow()
+        self._head = (self._head - 1) & self._mask
+        self._buf[self._head] = code
+        self._count += 1
+
+    def pop_front(self) -> int:
+        """Елемент з початку черги (черга не порожня)."""
+        code = self._buf[self._head]
+        self._head = (self._head + 1) & self._mask
+        self._count -= 1
+        return code
+
+    def codes(self) -> np.ndarray:
+        """Елементи черги від початку до кінця (копія)."""
+        return self._block[(self._head + np.arange(self._count)) & self._mask]
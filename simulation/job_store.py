@@ -0,0 +1,94 @@
+import numpy as np # type: ignore
+
+# ======================================
+# ТАБЛИЦІ ЗАВДАНЬ
+# ======================================
+# Записи завдань одного типу (класу) — одна таблиця: блок float64 розміром
+# «стовпці × ємність», де рядок блоку — одна величина (момент прибуття,
+# початки й кінці обробок, залишок вторинної обробки), а індекс у рядку —
+# номер завдання. Цикли подій читають і пишуть рядки через memoryview:
+# індексація майже така ж швидка, як у списках Python, але кожен запис займає
+# 8 байт без окремого об'єкта float. Статистика бере рядки як масиви numpy
+# без копіювання.
+#
+# Прибуття типу 2 детерміновані, тож ємність таблиці типу 2 відома наперед
+# (type2_capacity); розширюється вона лише у виняткових випадках (дуже довге
+# спорожнення черг) — доповненням нулями, без повтору вмісту.
+
+JOB_COLUMNS1 = ('start_prim1', 'end_prim1', 'start_sec1', 'end_sec1', 'rem_sec1')
+JOB_COLUMNS2 = ('arr2', 'start_prim2', 'end_prim2', 'start_sec2', 'end_sec2', 'rem_sec2')
+
+# Запас ємності на прибуття під час спорожнення черг після останньої події типу 1
+DRAIN_SLACK = 1024
+
+
+def arrival_capacity(rate: float, horizon: float, periodic: bool = True) -> int:
+    """
+    Ємність таблиці завдань класу з інтенсивністю rate до моменту horizon.
+
+    Для періодичного потоку прибуттів у моменти k / rate рівно floor(rate · horizon)
+    (+1 на округлення), для пуассонівського — середнє з запасом
+    у 6 стандартних відхилень; номери завдань починаються з 1, плюс DRAIN_SLACK.
+    """
+    if rate <= 0:
+        return 1 + DRAIN_SLACK
+    mean = rate * horizon
+    arrivals = int(mean) + 1 if periodic else int(mean + 6 * np.sqrt(mean)) + 1
+    return arrivals + 1 + DRAIN_SLACK
+
+
+def type2_capacity(N: int, horizon: float, lambda2: float) -> int:
+    """
+    Ємність таблиці подій типу 2 для прогону з N подіями типу 1.
+
+    horizon — момент останньої події типу 1. Не менше N + 1: завдання типу 1,
+    що обслуговуються з черги S2, використовують комірку типу 2 зі своїм номером.
+    """
+    return max(N + 1, arrival_capacity(lambda2, horizon))
+
+
+class JobTable:
+    """Таблиця завдань: стовпці columns у спільному блоці float64."""
+
+    def __init__(self, columns, capacity: int):
+        self.columns = tuple(columns)
+        self.block = np.zeros((len(self.columns), capacity))
+
+    def __len__(self) -> int:
+        return self.block.shape[1]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.block[self.columns.index(name)]
+
+    def arrays(self):
+        """dict стовпців (масиви numpy — представлення блоку, без копіювання)."""
+        return dict(zip(self.columns, self.block))
+
+    def views(self):
+        """
+        memoryview кожного стовпця в порядку columns (для циклів подій).
+
+        Після ensure, що розширила таблицю, їх треба отримати заново.
+        """
+        return [memoryview(row) for row in self.block]
+
+    def ensure(self, index: int) -> bool:
+        """
+        Розширити таблицю (щонайменше вдвічі, доповненням нулями), щоб index був дійсним.
+
+        Повернення:
+            True, якщо таблицю розширено
+        """
+        size = len(self)
+        if index < size:
+            return False
+        grown = np.zeros((len(self.columns), max(2 * size, index + 1)))
+        grown[:, :size] = self.block
+        self.block = grown
+        return True
+
+    def fill(self, lists) -> None:
+        """Записати значення зі знімка (dict стовпців) на початок таблиці; зайве відкидається."""
+        for row, name in zip(self.block, self.columns):
+            values = np.asarray(lists[name], dtype=float)[:len(row)]
+            row[:len(values)] = values
@@ -0,0 +1,54 @@
+import numpy as np # type: ignore
+
+from simulation.arrivals import type2_arrivals, merge_positions
+
+# ======================================
+# ШВИДКИЙ РОЗРАХУНОК ПЕРВИННОЇ ОБРОБКИ (РЕКУРСІЯ ЛІНДЛІ)
+# ======================================
+# Первинний обробник обслуговує всі події у порядку FIFO з детермінованою
+# тривалістю s1 і витісняє вторинну обробку, тому моменти початку первинної
+# обробки залежать лише від об'єднаного потоку прибуттів:
+#     start_k = max(a_k, start_{k-1} + s1)
+# Розгортання рекурсії дає start_k = k·s1 + max_{j<=k}(a_j - j·s1), що
+# обчислюється одним np.maximum.accumulate.
+
+
+def primary_start_times(arrivals: np.ndarray, s1: float) -> np.ndarray:
+    """Моменти початку первинної обробки для впорядкованого потоку прибуттів."""
+    shift = np.arange(len(arrivals)) * s1
+    return np.maximum.accumulate(arrivals - shift) + shift
+
+
+def primary_stage_metrics(arr1: np.ndarray, i_start: int, i_end: int,
+                          t_start: float, t_end: float,
+                          s1: float, lambda2: float) -> dict:
+    """
+    Показники 1, 6 і 14 без відтворення циклу подій.
+
+    Аргументи:
+        arr1: Часи прибуття подій типу 1 (arr1[0] = 0, далі 1..N)
+        i_start, i_end, t_start, t_end: Стаціонарне вікно
+        s1: Тривалість первинної обробки
+        lambda2: Частота детермінованих подій типу 2
+
+    Повернення:
+        dict {1: середнє очікування, 6: максимальне очікування, 14: завантаження}
+    """
+    # На показники у вікні впливають лише прибуття до t_end
+    a1 = arr1[1:i_end + 1]
+    a2 = type2_arrivals(lambda2, t_end)
+    pos1, pos2 = merge_positions(a1, a2)
+
+    merged = np.empty(len(a1) + len(a2))
+    merged[pos1] = a1
+    merged[pos2] = a2
+    start = primary_start_times(merged, s1)
+
+    wp = start[pos1[i_start - 1:]] - a1[i_start - 1:]
+    busy = np.clip(start + s1, t_start, t_end) - np.clip(start, t_start, t_end)
+
+    return {
+        1: float(wp.mean()) if len(wp) else 0.0,
+        6: max(0.0, float(wp.max())) if len(wp) else 0.0,
+        14: float(busy.sum()) / (t_end - t_start)
+    }
@@ -0,0 +1,257 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+from simulation.priority_simulator import (PriorityQueueSimulation, QUANTILE_METRICS, SEQUENTIAL_METRICS,
+                                           CONTROL_VARIATE_METRICS, RARE_EVENT_METRICS)
+from simulation.coded_engine import SimulationCancelled
+from simulation.deadlines import dynamics_key
+from simulation.checkpoint import checkpoint_file
+
+# ======================================
+# ПАРАЛЕЛЬНИЙ ЗАПУСК СЦЕНАРІЇВ
+# ======================================
+
+ERROR_VALUE = "Помилка"
+
+# Подія скасування у процесі-воркері (встановлюється через initializer пулу)
+_worker_cancel_event = None
+
+
+def _init_worker(cancel_event):
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+
+
+def error_result() -> Dict:
+    """Результат сценарію, що завершився помилкою (усі показники, з квантилями, — "Помилка")."""
+    return {j: ERROR_VALUE for j in (*range(1, 19), *QUANTILE_METRICS, *SEQUENTIAL_METRICS,
+                                     *CONTROL_VARIATE_METRICS, *RARE_EVENT_METRICS)}
+
+
+def run_scenario(params: Dict, seed, engine: str = "coded",
+                 arrival_sampler: str = "inverse", primary_only: bool = False,
+                 cancel_event=None, quantiles: bool = False, stopping: Optional[Dict] = None,
+                 warmup: str = "fixed", control_variates: bool = False,
+                 rare_events: bool = False, checkpoint_dir: Optional[str] = None):
+    """
+    Виконати один сценарій з власним генератором.
+
+    Функція верхнього рівня, щоб її можна було передати у процес-воркер.
+    Якщо cancel_event не передано, використовується подія скасування воркера.
+    quantiles — додати показники 19-28 (див. PriorityQueueSimulation);
+    stopping — аргументи run_until_precision (N з params стає верхньою межею);
+    warmup — правило перехідного періоду ("fixed" або "mser");
+    control_variates — уточнити показники контрольними змінними (показники 31-32);
+    rare_events — оцінювати показник 18 умовним методом (показник 33);
+    checkpoint_dir — папка контрольних точок (див. _checkpoint_options).
+
+    Повернення:
+        (результат, текст помилки або None); (None, None) — сценарій скасовано
+    """
+    if cancel_event is None:
+        cancel_event = _worker_cancel_event
+    should_stop = cancel_event.is_set if cancel_event is not None else None
+    if should_stop is not None and should_stop():
+        return None, None
+    
+    try:
+        sim = PriorityQueueSimulation(seed=seed, engine=engine, arrival_sampler=arrival_sampler,
+                                      should_stop=should_stop, quantiles=quantiles, warmup=warmup,
+                                      control_variates=control_variates, rare_events=rare_events,
+                                      **_checkpoint_options(checkpoint_dir, params, seed, arrival_sampler))
+        if primary_only:
+            return sim.run_primary_stage(**params), None
+        if stopping is not None:
+            return sim.run_until_precision(**params, **stopping), None
+        return sim.run_simulation_priority2_full(**params), None
+    except SimulationCancelled:
+        return None, None
+    except Exception as e:
+        return error_result(), str(e)
+
+
+def run_scenario_group(param_sets: List[Dict], seed, engine: str = "coded",
+                       arrival_sampler: str = "inverse", primary_only: bool = False,
+                       cancel_event=None, quantiles: bool = False, stopping: Optional[Dict] = None,
+                       warmup: str = "fixed", control_variates: bool = False,
+                       rare_events: bool = False, checkpoint_dir: Optional[str] = None):
+    """
+    Виконати сценарії, що відрізняються лише D1/D2 і мають спільний seed.
+
+    Симуляція виконується один раз, а показники 17 і 18 для решти сценаріїв
+    беруться з розподілу часу перебування — результати такі самі, як при
+    окремих запусках run_scenario.
+
+    Повернення:
+        (список результатів у порядку param_sets, текст помилки або None)
+    """
+    if len(param_sets) == 1:
+        result, error = run_scenario(param_sets[0], seed, engine, arrival_sampler,
+                                     primary_only, cancel_event, quantiles, stopping, warmup,
+                                     control_variates, rare_events, checkpoint_dir)
+        return [result], error
+    
+    if cancel_event is None:
+        cancel_event = _worker_cancel_event
+    should_stop = cancel_event.is_set if cancel_event is not None else None
+    if should_stop is not None and should_stop():
+        return [None] * len(param_sets), None
+    
+    try:
+        sim = PriorityQueueSimulation(seed=seed, engine=engine, arrival_sampler=arrival_sampler,
+                                      should_stop=should_stop, quantiles=quantiles, warmup=warmup,
+                                      control_variates=control_variates, rare_events=rare_events,
+                                      **_checkpoint_options(checkpoint_dir, param_sets[0], seed,
+                                                            arrival_sampler))
+        result, profile = sim.run_with_sojourn_profile(**param_sets[0])
+        return [profile.apply_deadlines(result, p['D1'], p['D2']) for p in param_sets], None
+    except SimulationCancelled:
+        return [None] * len(param_sets), None
+    except Exception as e:
+        return [error_result() for _ in param_sets], str(e)
+
+
+def _checkpoint_options(checkpoint_dir, params, seed, arrival_sampler):
+    """
+    Аргументи PriorityQueueSimulation для контрольних точок сценарію.
+
+    Файл визначається параметрами динаміки і seed (checkpoint_file), тож
+    перерваний прогін продовжується при повторному запуску, а прогін з
+    більшим N — з останнього стану попереднього.
+    """
+    if checkpoint_dir is None:
+        return {}
+    return {'checkpoint_path': checkpoint_file(checkpoint_dir, params, seed, arrival_sampler),
+            'checkpoint_interval': Config.CHECKPOINT_INTERVAL}
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Кількість процесів: None або 0 — усі ядра процесора."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def run_scenarios(parameters: List[Optional[Dict]], seeds: List, workers: Optional[int] = None,
+                  engine: str = "coded", arrival_sampler: str = "inverse",
+                  primary_only: bool = False,
+                  on_result: Optional[Callable] = None,
+                  cancel_event=None, cache=None, quantiles: bool = False,
+                  stopping: Optional[Dict] = None, warmup: str = "fixed",
+                  control_variates: bool = False, rare_events: bool = False,
+                  checkpoint_dir: Optional[str] = None) -> List[Optional[Dict]]:
+    """
+    Запустити сценарії у пулі процесів.
+
+    Кожен сценарій отримує свій seed наперед, тож результати не залежать ні від
+    кількості процесів, ні від порядку їх завершення. Результати повертаються у
+    порядку parameters; для None-параметрів (порожніх стовпців) результат None,
+    для сценаріїв з помилкою — error_result().
+
+    Сценарії з однаковим seed, що відрізняються лише D1/D2, симулюються один раз
+    (run_scenario_group); щоб так об'єднати точки кривої дедлайнів, передайте
+    seeds з deadlines.shared_deadline_seeds.
+
+    Скасування (cancel_event.set()) зупиняє ще не розпочаті сценарії, а поточні —
+    всередині циклу подій; їх результати лишаються None, а вже завершені
+    зберігаються.
+
+    Аргументи:
+        parameters: Список словників параметрів (None — пропустити сценарій)
+        seeds: Seed для кожного сценарію
+        workers: Кількість процесів (None — усі ядра, 1 — без пулу, у поточному процесі)
+        on_result: Виклик on_result(індекс, результат, помилка) після кожного
+            завершеного (не скасованого) сценарію
+        cancel_event: multiprocessing.Event для скасування
+        cache: Необов'язковий ResultCache; знайдені в ньому сценарії не
+            перераховуються, а нові успішні результати до нього додаються
+        quantiles: Додати показники 19-28 — квантилі часу очікування і перебування
+        stopping: Аргументи PriorityQueueSimulation.run_until_precision
+            (rel_half_width, metrics, time_budget) — послідовна зупинка замість
+            фіксованого N; такі сценарії не об'єднуються за дедлайнами
+        warmup: Правило перехідного періоду: "fixed" (5%/95%) або "mser"
+        control_variates: Уточнити показники контрольними змінними (показники 31-32)
+        rare_events: Оцінювати ймовірність порушення D2 (показник 18) умовним
+            методом Монте-Карло з відносною похибкою в показнику 33; такі
+            сценарії не об'єднуються за дедлайнами
+        checkpoint_dir: Папка контрольних точок довгих прогонів (None — без них);
+            на результати не впливає
+
+    Повернення:
+        Список словників результатів
+    """
+    results: List[Optional[Dict]] = [None] * len(parameters)
+    pending = [i for i, params in enumerate(parameters) if params is not None]
+    workers = resolve_workers(workers)
+
+    keys = {}
+    if cache is not None:
+        for i in list(pending):
+            keys[i] = cache.make_key(parameters[i], seeds[i], arrival_sampler, primary_only, quantiles,
+                                     stopping, warmup, control_variates, rare_events)
+            cached = cache.get(keys[i])
+            if cached is not None:
+                results[i] = cached
+                pending.remove(i)
+                if on_result:
+                    on_result(i, cached, None)
+
+    def collect(i, result, error):
+        results[i] = result
+        if result is None:
+            return
+        if cache is not None and error is None:
+            cache.put(keys[i], result)
+        if on_result:
+            on_result(i, result, error)
+
+    # Сценарії, які дають одну й ту саму симуляцію, виконуються разом
+    groups = {}
+    for i in pending:
+        # Послідовна зупинка може залежати від D1/D2 (показники 17, 18), умовна
+        # оцінка показника 18 рахується для конкретного D2, а рушій streaming не
+        # зберігає часів перебування для інших дедлайнів
+        key = i if primary_only or stopping or rare_events or engine == "streaming" else (dynamics_key(parameters[i]), seeds[i])
+        groups.setdefault(key, []).append(i)
+    groups = list(groups.values())
+
+    def collect_group(group, group_results, error):
+        for i, result in zip(group, group_results):
+            collect(i, result, error)
+
+    if workers == 1 or len(groups) <= 1:
+        for group in groups:
+            collect_group(group, *run_scenario_group([parameters[i] for i in group], seeds[group[0]],
+                                                     engine, arrival_sampler, primary_only, cancel_event,
+                                                     quantiles, stopping, warmup, control_variates,
+                                                     rare_events, checkpoint_dir))
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(groups)),
+                             initializer=_init_worker, initargs=(cancel_event,)) as executor:
+        futures = {
+            executor.submit(run_scenario_group, [parameters[i] for i in group], seeds[group[0]],
+                            engine, arrival_sampler, primary_only,
+                            quantiles=quantiles, stopping=stopping, warmup=warmup,
+                            control_variates=control_variates, rare_events=rare_events,
+                            checkpoint_dir=checkpoint_dir): group
+            for group in groups
+        }
+        for future in as_completed(futures):
+            if cancel_event is not None and cancel_event.is_set():
+                for other in futures:
+                    other.cancel()
+            if future.cancelled():
+                continue
+            
+            group = futures[future]
+            try:
+                group_results, error = future.result()
+            except Exception as e:
+                # Аварійне завершення процесу-воркера
+                group_results, error = [error_result() for _ in group], str(e)
+            collect_group(group, group_results, error)
+
+    return results
@@ -1,6 +1,65 @@
+import time
 import numpy as np # type: ignore
-from collections import deque
+from array import array
 from typing import List, Tuple, Dict
+from simulation.coded_engine import run_coded_event_loop, INF, area_marks_table
+from simulation.jit_engine import run_jit_event_loop
+from simulation.lindley import primary_stage_metrics
+from simulation.deadlines import SojournProfile, late_threshold
+from simulation.quantiles import LogHistogram
+from simulation.warmup import mser_truncation
+from simulation.control_variates import control_variate_adjustment
+from simulation.rare_events import deadline_probabilities_after_start
+from simulation.checkpoint import CheckpointWriter, load_checkpoint, resumable_snapshot
+from simulation.streaming import WindowAccumulator, run_streaming_event_loop
+from simulation.event_calendar import run_calendar_event_loop, two_class_model, periodic_arrivals
+from simulation.job_queue import JobQueue, pack_job, unpack_job
+from simulation.job_store import JobTable, JOB_COLUMNS1, JOB_COLUMNS2, arrival_capacity, type2_capacity
+
+# Версія моделі: змінюється, коли змінюються результати для того самого seed
+# (використовується як частина ключа дискового кешу результатів)
+SIMULATOR_VERSION = "1.4"
+
+# Рівні квантилів хвостових показників. Показники 19-28 — квантилі тих самих
+# величин, середні яких дають показники 1-5: для кожної з них спершу рівень
+# 0.95, потім 0.99 (19-20 — очікування первинної обробки, ..., 27-28 —
+# перебування подій типу 2)
+QUANTILE_LEVELS = (0.95, 0.99)
+QUANTILE_SOURCES = ('wait_prim1', 'wait_sec1', 'wait_sec2', 'sojourn1', 'sojourn2')
+QUANTILE_METRICS = tuple(range(19, 19 + len(QUANTILE_SOURCES) * len(QUANTILE_LEVELS)))
+
+# Показники послідовної зупинки (run_until_precision): 29 — фактична кількість
+# подій типу 1, 30 — найбільша відносна напівширина довірчого інтервалу
+SEQUENTIAL_METRICS = (29, 30)
+
+# Показники, для яких run_until_precision будує довірчі інтервали, і вибірки,
+# середні яких вони є (17 і 18 — частки вибірок, що перевищують дедлайн)
+PRECISION_SOURCES = {1: 'wait_prim1', 2: 'wait_sec1', 3: 'wait_sec2',
+                     4: 'sojourn1', 5: 'sojourn2', 17: 'sojourn1', 18: 'sojourn2'}
+
+# Показники, які уточнюються контрольними змінними (control_variates=True):
+# середні по завданнях (вибірки _window_samples) і часові середні 11-13, 15, 16.
+# Контрольні змінні — середній інтервал між подіями типу 1 (сподівання 1/λ1) і
+# завантаження первинного обробника (сподівання (λ1 + λ2)·s1, якщо воно < 1).
+# Показники 31-32 — частка дисперсії, на яку зменшилась оцінка показника 4 і 11
+CONTROL_VARIATE_SOURCES = {1: 'wait_prim1', 2: 'wait_sec1', 3: 'wait_sec2',
+                           4: 'sojourn1', 5: 'sojourn2'}
+CONTROL_VARIATE_TIME_METRICS = (11, 12, 13, 15, 16)
+CONTROL_VARIATE_METRICS = {31: 4, 32: 11}
+
+# Показник режиму малих ймовірностей (rare_events=True): 33 — відносна
+# напівширина 95% довірчого інтервалу умовної оцінки показника 18
+RARE_EVENT_METRICS = (33,)
+
+
+def _ordered_sum(values) -> float:
+    """
+    Сума елементів у порядку їх слідування.
+
+    np.sum використовує попарне підсумовування, а np.cumsum — послідовне, як
+    і скалярний цикл, тому векторизовані показники збігаються зі скалярними побітово.
+    """
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
 
 # ======================================
 # ОСНОВНИЙ КЛАС СИМУЛЯЦІЇ
@@ -18,28 +77,148 @@ class PriorityQueueSimulation:
     - стаціонарність: відкидаємо перші 5% і останні 5% по потоку type1
     - точний розрахунок часових середніх на інтервалі [tStart,tEnd] по журналу подій
     """    
-    def __init__(self, seed=None):
+    ENGINES = ("classic", "coded", "jit", "streaming", "calendar")
+    CODED_ENGINES = ("coded", "jit")  # Рушії з площами, накопиченими в циклі (без журналу подій)
+    ARRIVAL_SAMPLERS = ("inverse", "exponential")
+    WARMUP_RULES = ("fixed", "mser")
+    MSER_BATCH = 5  # Розмір пакета MSER (MSER-5)
+    ARRIVAL_CHUNK = 1 << 20  # Розмір блоку генерації прибуттів
+    BATCH_COUNT = 20  # Кількість пакетів для довірчих інтервалів методом пакетних середніх
+    BATCH_T_QUANTILE = 2.093  # Квантиль t-розподілу (0.975, BATCH_COUNT - 1 ступенів свободи)
+    SEQUENTIAL_START_N = 20000  # Початкова кількість подій послідовної зупинки
+
+    def __init__(self, seed=None, engine: str = "classic", arrival_sampler: str = "inverse",
+                 should_stop=None, quantiles: bool = False, warmup: str = "fixed",
+                 control_variates: bool = False, rare_events: bool = False,
+                 checkpoint_path: str = None, checkpoint_interval: float = None):
         """
         Ініціалізуйте симуляцію.
 
         Аргументи:
             початкове значення: Випадкове початкове значення для відтворюваності. Якщо немає, результати будуть відрізнятися після кожного запуску.
+            engine: Реалізація циклу подій: "classic" — еталонна на рядкових станах,
+                "coded" — швидка на цілочисельних кодах, "jit" — цикл "coded", скомпільований
+                numba, якщо її встановлено (simulation.jit_engine; з контрольними змінними,
+                рідкісними подіями, MSER і контрольними точками — звичайний "coded"),
+                "streaming" — "coded" з пам'яттю, що не залежить від N (simulation.streaming; без вибірок завдань, тож лише
+                з warmup="fixed" і без контрольних змінних, рідкісних подій, контрольних
+                точок, run_with_sojourn_profile і run_until_precision), "calendar" — цикл
+                для K класів з календарем подій (simulation.event_calendar; лише з
+                warmup="fixed" і без контрольних змінних, рідкісних подій і контрольних
+                точок). Для того ж seed результати ті самі
+            arrival_sampler: Генератор інтервалів між подіями типу 1: "inverse" — -ln(U)/λ1
+                (той самий потік випадкових чисел, що й у попередніх версіях),
+                "exponential" — вбудований експоненційний семплер Generator
+            should_stop: Необов'язкова функція без аргументів для скасування довгої
+                симуляції (рушії "coded" і "jit"); при True — виняток SimulationCancelled
+            quantiles: Додати до результатів показники 19-28 — квантилі QUANTILE_LEVELS
+                часу очікування і перебування (потокові логарифмічні гістограми)
+            warmup: Вибір стаціонарного вікна: "fixed" — відкинути перші й останні 5%
+                подій типу 1 і по 100 подій типу 2; "mser" — обрізати перехідний період
+                за правилом MSER-5 для часу перебування подій типу 1 (вікно — до
+                останньої події типу 1); run_primary_stage завжди використовує "fixed"
+            control_variates: Уточнити показники з CONTROL_VARIATE_SOURCES і
+                CONTROL_VARIATE_TIME_METRICS контрольними змінними з відомим середнім
+                і додати показники 31-32 — досягнуте зменшення дисперсії
+            rare_events: Оцінювати показник 18 умовним методом Монте-Карло
+                (simulation.rare_events) — для малих ймовірностей порушення D2 — і
+                додати показник 33 — його відносну похибку
+            checkpoint_path: Файл контрольної точки (simulation.checkpoint). Якщо задано,
+                повна симуляція пише в нього стан циклу подій кожні checkpoint_interval
+                секунд і після останньої події типу 1, а якщо в ньому вже є сумісний
+                стан (той самий seed і параметри динаміки, N не менше збереженого) —
+                продовжує з нього. Цикл подій — рушія "coded", часові середні — з
+                накопичених площ у моменти подій типу 1; результати ті самі, що й у
+                рушія "coded" без перерви (при продовженні з більшим N показники
+                11-16 — різниця накопичених площ і можуть відрізнятися в останніх
+                розрядах)
+            checkpoint_interval: Мінімальний інтервал між записами, с (None — лише
+                після останньої події типу 1)
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Невідомий рушій симуляції: {engine}")
+        if arrival_sampler not in self.ARRIVAL_SAMPLERS:
+            raise ValueError(f"Невідомий генератор прибуттів: {arrival_sampler}")
+        if warmup not in self.WARMUP_RULES:
+            raise ValueError(f"Невідоме правило перехідного періоду: {warmup}")
+        if engine == "streaming" and (warmup != "fixed" or control_variates or rare_events
+                                      or checkpoint_path is not None):
+            raise ValueError("Рушій streaming підтримує лише фіксоване вікно без контрольних "
+                             "змінних, рідкісних подій і контрольних точок")
+        if engine == "calendar" and (warmup != "fixed" or control_variates or rare_events
+                                     or checkpoint_path is not None):
+            raise ValueError("Рушій calendar підтримує лише фіксоване вікно без контрольних "
+                             "змінних, рідкісних подій і контрольних точок")
         self.rng = np.random.default_rng(seed)
+        self.engine = engine
+        self.arrival_sampler = arrival_sampler
+        self.should_stop = should_stop
+        self.quantiles = quantiles
+        self.warmup = warmup
+        self.control_variates = control_variates
+        self.rare_events = rare_events
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
     
-    def simulate_multiple_systems(self, parameters: List[Dict]) -> List[Dict]:
+    @classmethod
+    def from_checkpoint(cls, path: str, **options):
+        """
+        Симуляція, що продовжує прогін з контрольної точки.
+
+        Генератор отримує збережений стан, тож run_simulation_priority2_full з
+        повернутими параметрами (або з більшим N) продовжить прогін з файлу.
+
+        Аргументи:
+            path: Файл контрольної точки
+            options: Інші аргументи конструктора (quantiles, warmup, ...)
+
+        Повернення:
+            (PriorityQueueSimulation, dict параметрів прогону)
+        """
+        loaded = load_checkpoint(path)
+        if loaded is None:
+            raise ValueError(f"Не вдалося прочитати контрольну точку: {path}")
+        header, _ = loaded
+        
+        options.setdefault('arrival_sampler', header['arrival_sampler'])
+        options.setdefault('rare_events', header['rare_events'])
+        sim = cls(checkpoint_path=path, **options)
+        sim.rng.bit_generator.state = header['rng_state']
+        return sim, {**header['params'], 'N': header['N'], **header['deadlines']}
+    
+    def simulate_multiple_systems(self, parameters: List[Dict], primary_only: bool = False,
+                                  workers: int = None, cache=None) -> List[Dict]:
         """
         Запуск моделювання для кількох наборів параметрів.
 
         Аргументи:
             параметри: Список словників з ключами: lambda1, s1, s2, N, D1, lambda2, s2b, D2
+            primary_only: Обчислити лише показники первинної обробки (1, 6, 14)
+                швидким методом run_primary_stage
+            workers: Якщо задано — паралельний запуск у пулі з workers процесів
+                (0 — усі ядра). Кожен сценарій отримує власний seed з генератора
+                цього об'єкта, тож результати не залежать від кількості процесів;
+                помилка сценарію дає результат "Помилка" замість винятку.
+                Якщо None — послідовний запуск зі спільним генератором.
+            cache: Необов'язковий ResultCache (лише разом із workers)
 
         Повернення:
             Список словників результатів
         """
+        if workers is not None:
+            from simulation.parallel_runner import run_scenarios
+            seeds = [int(x) for x in self.rng.integers(0, 2**63 - 1, size=len(parameters))]
+            return run_scenarios(parameters, seeds, workers=workers, engine=self.engine,
+                                 arrival_sampler=self.arrival_sampler, primary_only=primary_only,
+                                 cache=cache)
+        
         all_results = []
         
         for params in parameters:
+            if primary_only:
+                all_results.append(self.run_primary_stage(**params))
+                continue
+            
             results = self.run_simulation_priority2_full(
                 lambda1=params['lambda1'],
                 s1=params['s1'],
@@ -66,36 +245,547 @@ class PriorityQueueSimulation:
         11-13: Середня довжина черги (основна, вторинна1, вторинна2)
         14-16: Коефіцієнти використання (основна, вторинна1, вторинна2)
         17-18: Частка запізнілих завдань
+        19-28: Квантилі часу очікування і перебування (лише якщо quantiles=True)
+        31-32: Зменшення дисперсії контрольними змінними (лише якщо control_variates=True)
+        33: Відносна похибка показника 18 (лише якщо rare_events=True)
+        """
+        return self._simulate_full(lambda1, s1, s2, N, D1, lambda2, s2b, D2)[0]
+    
+    def run_with_sojourn_profile(self, lambda1: float, s1: float, s2: float,
+                                 N: int, D1: float, lambda2: float,
+                                 s2b: float, D2: float) -> Tuple[Dict, SojournProfile]:
+        """
+        Те саме, що run_simulation_priority2_full, плюс розподіл часу перебування.
+
+        SojournProfile дозволяє обчислити показники 17 і 18 для будь-яких інших
+        дедлайнів без повторної симуляції (D1 і D2 не впливають на динаміку).
+
+        Повернення:
+            (dict з 18 показниками, SojournProfile)
+        """
+        results, samples = self._simulate_full(lambda1, s1, s2, N, D1, lambda2, s2b, D2,
+                                               keep_samples=True)
+        return results, SojournProfile(samples['sojourn1'], samples['sojourn2'])
+    
+    def run_simulation_multiclass(self, classes, N: int, legacy_slots: bool = False) -> Dict:
+        """
+        Моделювання з довільною кількістю класів подій (simulation.event_calendar).
+
+        Перший клас — опорний, з пуассонівським потоком: моделюється N його
+        прибуттів, а стаціонарне вікно — як у run_simulation_priority2_full
+        (перші й останні 5% його подій; для інших класів — прибуття у вікні без
+        перших і останніх 100 подій). Для two_class_model з legacy_slots=True
+        результати збігаються з показниками run_simulation_priority2_full для
+        того ж seed.
+
+        Аргументи:
+            classes: Список JobClass
+            N: Кількість подій опорного класу
+            legacy_slots: Як у run_calendar_event_loop (за замовчуванням перервана
+                подія завжди повертається на початок своєї черги)
+
+        Повернення:
+            dict: 'queue_prim' і 'busy_prim' — середня довжина черги первинної
+            обробки і її зайнятість, 'classes' — для кожного класу (за назвою)
+            dict середніх і максимумів wait_prim, wait_sec, sojourn, частки
+            запізнілих подій late, середньої довжини його черги вторинної обробки
+            queue_sec і зайнятості вторинною обробкою його подій busy_sec
+        """
+        if not classes or classes[0].arrival != "poisson":
+            raise ValueError("Опорний (перший) клас має бути з пуассонівським потоком")
+        reference = classes[0]
+        
+        arr1 = self._generate_type1_arrivals(reference.rate, N)
+        streams = [arr1[1:N + 1].tolist()]
+        capacities = [N + 1]
+        for job_class in classes[1:]:
+            periodic = job_class.arrival == "periodic"
+            if periodic:
+                streams.append(periodic_arrivals(job_class.rate))
+            else:
+                streams.append(self._iter_poisson_arrivals(job_class.rate))
+            capacity = arrival_capacity(job_class.rate, arr1[N], periodic)
+            # З legacy_slots у таблиці є й комірки для номерів завдань опорного класу
+            capacities.append(max(capacity, N + 1) if legacy_slots else capacity)
+        
+        window = self._stationary_window(arr1, N) if N > 0 else None
+        if window is None:
+            i_start = i_end = 0
+            t_start = t_end = 0.0
+        else:
+            i_start, i_end, t_start, t_end = window
+        counts, tables, (area_p, busy_p, area_sq, busy_sec) = run_calendar_event_loop(
+            classes, streams, N, capacities, t_start, t_end, self.should_stop, legacy_slots
+        )
+        
+        total_t = t_end - t_start
+        per_class = {}
+        for k, job_class in enumerate(classes):
+            if k == 0:
+                stats = self._class_statistics(tables[k], i_start, i_end + 1, job_class.deadline)
+            else:
+                stats = self._class_statistics(tables[k], 100, max(100, counts[k] - 99),
+                                               job_class.deadline, (t_start, t_end))
+            stats['queue_sec'] = area_sq[k] / total_t if total_t > 0 else 0.0
+            stats['busy_sec'] = busy_sec[k] / total_t if total_t > 0 else 0.0
+            per_class[job_class.name] = stats
+        
+        return {
+            'queue_prim': area_p / total_t if total_t > 0 else 0.0,
+            'busy_prim': busy_p / total_t if total_t > 0 else 0.0,
+            'classes': per_class,
+        }
+    
+    def run_until_precision(self, lambda1: float, s1: float, s2: float,
+                            N: int, D1: float, lambda2: float,
+                            s2b: float, D2: float, rel_half_width: float = 0.05,
+                            metrics=(1, 4, 5), time_budget: float = None,
+                            N_start: int = None) -> Dict:
         """
+        Моделювання з послідовною зупинкою за точністю.
+
+        Кількість подій типу 1 збільшується (щонайменше вдвічі за крок, з
+        прогнозом за поточною шириною інтервалу), доки відносна напівширина 95%
+        довірчого інтервалу (метод пакетних середніх) для кожного показника з
+        metrics не стане не більшою за rel_half_width. N — верхня межа кількості
+        подій. Кожен крок повторює симуляцію з того самого стану генератора, тож
+        результат збігається з run_simulation_priority2_full для фактичного N.
+
+        Аргументи:
+            rel_half_width: Цільова відносна напівширина інтервалу
+            metrics: Контрольовані показники (з PRECISION_SOURCES)
+            time_budget: Обмеження часу в секундах (None — без обмеження); крок,
+                що почався до його вичерпання, завершується
+            N_start: Початкова кількість подій (за замовчуванням SEQUENTIAL_START_N)
+
+        Повернення:
+            dict з показниками run_simulation_priority2_full, а також
+            29 — фактичне N і 30 — досягнута найбільша відносна напівширина
+        """
+        unknown = [m for m in metrics if m not in PRECISION_SOURCES]
+        if unknown:
+            raise ValueError(f"Довірчі інтервали не підтримуються для показників: {unknown}")
+        
         if N <= 0:
-            return {i: 0.0 for i in range(1, 19)}
+            results = self._empty_results()
+            results.update({metric: 0.0 for metric in SEQUENTIAL_METRICS})
+            return results
         
-        # Ініціалізація масивів для подій типу 1
-        arr1 = np.zeros(N + 1)
-        start_prim1 = np.zeros(N + 1)
-        end_prim1 = np.zeros(N + 1)
-        start_sec1 = np.zeros(N + 1)
-        end_sec1 = np.zeros(N + 1)
-        rem_sec1 = np.zeros(N + 1)
-        
-        # Ініціалізація масивів для подій типу 2 (динамічна)
-        cap2 = max(1024, int(4 * N * lambda2 / lambda1))
-        cnt2 = 0
-        arr2 = np.zeros(cap2)
-        start_prim2 = np.zeros(cap2)
-        end_prim2 = np.zeros(cap2)
-        start_sec2 = np.zeros(cap2)
-        end_sec2 = np.zeros(cap2)
-        rem_sec2 = np.zeros(cap2)
+        started = time.perf_counter()
+        state = self.rng.bit_generator.state
+        n = max(1, min(N, N_start or self.SEQUENTIAL_START_N))
+        
+        while True:
+            self.rng.bit_generator.state = state
+            results, samples = self._simulate_full(lambda1, s1, s2, n, D1, lambda2, s2b, D2,
+                                                   keep_samples=True)
+            precision = self._relative_half_width(results, samples, metrics, D1, D2)
+            
+            out_of_time = time_budget is not None and time.perf_counter() - started >= time_budget
+            if precision <= rel_half_width or n >= N or out_of_time:
+                break
+            
+            # Напівширина спадає як 1/sqrt(n)
+            predicted = n * (precision / rel_half_width) ** 2 * 1.1 if np.isfinite(precision) else 0
+            n = int(min(N, max(2 * n, predicted)))
+        
+        results[SEQUENTIAL_METRICS[0]] = n
+        results[SEQUENTIAL_METRICS[1]] = precision
+        return results
+    
+    def _relative_half_width(self, results, samples, metrics, D1, D2):
+        """Найбільша серед metrics відносна напівширина довірчого інтервалу."""
+        worst = 0.0
+        
+        for metric in metrics:
+            values = samples[PRECISION_SOURCES[metric]]
+            if metric == 17:
+                values = (values > late_threshold(D1)).astype(float)
+            elif metric == 18:
+                values = (values > late_threshold(D2)).astype(float)
+            
+            half_width = self._batch_means_half_width(values)
+            if half_width == 0:
+                continue
+            mean = abs(results[metric])
+            worst = max(worst, half_width / mean if mean > 0 else np.inf)
+        
+        return worst
+    
+    def _batch_means_half_width(self, values):
+        """
+        Напівширина 95% довірчого інтервалу середнього методом пакетних середніх.
+
+        Послідовність ділиться на BATCH_COUNT рівних пакетів; середні пакетів
+        вважаються майже незалежними, що враховує автокореляцію часу очікування.
+        """
+        batch = len(values) // self.BATCH_COUNT
+        if batch < 2:
+            return np.inf
+        
+        means = np.asarray(values[:batch * self.BATCH_COUNT]).reshape(self.BATCH_COUNT, batch).mean(axis=1)
+        return float(self.BATCH_T_QUANTILE * means.std(ddof=1) / np.sqrt(self.BATCH_COUNT))
+    
+    def _simulate_full(self, lambda1, s1, s2, N, D1, lambda2, s2b, D2, keep_samples=False):
+        """
+        Повна симуляція.
+
+        Повернення:
+            (показники, вибірки _window_samples або None, якщо keep_samples=False)
+        """
+        if N <= 0:
+            return self._empty_results(), self._empty_samples()
+        
+        if self.engine == "streaming":
+            if keep_samples:
+                raise ValueError("Рушій streaming не зберігає вибірок завдань")
+            return self._simulate_streaming(lambda1, s1, s2, N, D1, lambda2, s2b, D2), None
+        
+        # Стан генератора до прибуттів визначає весь прогін (ключ контрольної точки)
+        checkpoint = None
+        if self.checkpoint_path is not None:
+            checkpoint = {
+                'version': SIMULATOR_VERSION,
+                'params': {'lambda1': lambda1, 's1': s1, 's2': s2, 'lambda2': lambda2, 's2b': s2b},
+                'deadlines': {'D1': D1, 'D2': D2},
+                'rng_state': self.rng.bit_generator.state,
+                'arrival_sampler': self.arrival_sampler,
+                'rare_events': self.rare_events,
+            }
         
         # Генерація часу прибуття для типу1 (процес Пуассона)
+        arr1 = self._generate_type1_arrivals(lambda1, N)
+        
+        # Обчислити стаціонарний інтервал
+        window = self._stationary_window(arr1, N)
+        if window is None:
+            return self._empty_results(), self._empty_samples()
+        i_start, i_end, t_start, t_end = window
+        
+        # Ємність таблиці подій типу 2 відома наперед (прибуття детерміновані)
+        cap2 = type2_capacity(N, arr1[N], lambda2)
+        if checkpoint is not None:
+            checkpoint['N'] = N
+        
+        # Головний цикл подій; trace — накопичені площі в моменти подій типу 1
+        # або журнал подій (потрібні лише для контрольних змінних)
+        type2_range = None
+        trace = None
+        sec2_starts = {} if self.rare_events else None
+        if self.warmup == "mser":
+            cnt2, jobs, time_avg_results, window, trace = self._run_with_mser_window(
+                arr1, N, lambda2, s1, s2, s2b, cap2, sec2_starts, checkpoint
+            )
+            if window is None:
+                return self._empty_results(), self._empty_samples()
+            i_start, i_end, t_start, t_end = window
+            # Вікно за часом уже відсікає перехідний період і для подій типу 2
+            type2_range = (1, cnt2 + 1)
+        elif checkpoint is not None:
+            cnt2, jobs, marks = self._run_checkpointed_event_loop(arr1, N, lambda2, s1, s2, s2b, cap2,
+                                                                  t_start, sec2_starts, checkpoint)
+            areas = tuple(float(area) for area in marks[i_end - 1] - marks[i_start - 1])
+            time_avg_results = self._time_averages_from_areas(areas, t_start, t_end)
+            trace = marks if self.control_variates else None
+        elif self.engine == "calendar":
+            cnt2, jobs, areas = self._run_calendar_two_class(arr1, N, lambda1, s1, s2, lambda2, s2b,
+                                                             cap2, t_start, t_end)
+            time_avg_results = self._time_averages_from_areas(areas, t_start, t_end)
+        elif self.engine in self.CODED_ENGINES:
+            # Часові середні накопичуються в циклі — журнал подій не потрібен
+            marks = array('d') if self.control_variates else None
+            if self.engine == "jit" and marks is None and sec2_starts is None:
+                cnt2, jobs, areas = run_jit_event_loop(arr1, N, lambda2, s1, s2, s2b, cap2,
+                                                       t_start, t_end, self.should_stop)
+            else:
+                cnt2, jobs, areas = run_coded_event_loop(arr1, N, lambda2, s1, s2, s2b, cap2,
+                                                         t_start, t_end, self.should_stop,
+                                                         area_marks=marks, sec2_starts=sec2_starts)
+            time_avg_results = self._time_averages_from_areas(areas, t_start, t_end)
+            trace = area_marks_table(marks) if marks is not None else None
+        else:
+            cnt2, jobs, log = self._run_event_loop_classic(arr1, N, lambda2, s1, s2, s2b, cap2,
+                                                           sec2_starts)
+            trace = log
+            # Обчислити часові середні з журналу подій
+            time_avg_results = self._calculate_time_averages_vectorized(
+                t_start=t_start, t_end=t_end, **log
+            )
+        
+        # Обчислити статистику по окремих завданнях
+        results = self._calculate_job_statistics_vectorized(
+            i_start, i_end, cnt2, t_start, t_end,
+            arr1=arr1, D1=D1, D2=D2, type2_range=type2_range, **jobs
+        )
+        
+        results.update(time_avg_results)
+        
+        samples = None
+        if keep_samples or self.quantiles or self.control_variates or self.rare_events:
+            samples = self._window_samples(i_start, i_end, cnt2, t_start, t_end, arr1=arr1,
+                                           type2_range=type2_range, **jobs)
+            if self.quantiles:
+                results.update(self._tail_quantiles(samples))
+            if self.control_variates:
+                results.update(self._apply_control_variates(results, samples, arr1, i_start, i_end,
+                                                            trace, lambda1, lambda2, s1))
+            if self.rare_events:
+                results.update(self._rare_event_deadline2(samples, sec2_starts, lambda1, lambda2,
+                                                          s1, s2b, D2))
+        
+        return results, samples if keep_samples else None
+    
+    def _simulate_streaming(self, lambda1, s1, s2, N, D1, lambda2, s2b, D2):
+        """
+        Повна симуляція рушієм "streaming": прибуття генеруються блоками по
+        ARRIVAL_CHUNK, а статистика завдань накопичується під час циклу.
+        """
+        i_start = int(np.ceil(N * 0.05))
+        i_end = int(np.floor(N * 0.95))
+        if i_end <= i_start:
+            # Прибуття все одно генеруються — стан генератора як в інших рушіїв
+            self._generate_type1_arrivals(lambda1, N)
+            return self._empty_results()
+        
+        histograms = {source: LogHistogram() for source in QUANTILE_SOURCES} if self.quantiles else None
+        stats1 = WindowAccumulator(3, D1, histograms and [histograms[source] for source in
+                                                          ('wait_prim1', 'wait_sec1', 'sojourn1')])
+        stats2 = WindowAccumulator(2, D2, histograms and [histograms[source] for source in
+                                                          ('wait_sec2', 'sojourn2')])
+        
+        cnt2, areas, t_start, t_end = run_streaming_event_loop(
+            self._iter_type1_arrivals(lambda1, N), N, lambda2, s1, s2, s2b,
+            i_start, i_end, stats1, stats2, self.should_stop
+        )
+        if t_end <= t_start:
+            return self._empty_results()
+        
+        wait_prim1, wait_sec1, sojourn1 = stats1.means()
+        wait_sec2, sojourn2 = stats2.means()
+        results = {
+            1: wait_prim1, 2: wait_sec1, 3: wait_sec2, 4: sojourn1, 5: sojourn2,
+            6: stats1.maxima[0], 7: stats1.maxima[1], 8: stats2.maxima[0],
+            9: stats1.maxima[2], 10: stats2.maxima[1],
+            17: stats1.late_fraction(), 18: stats2.late_fraction(),
+        }
+        results.update(self._time_averages_from_areas(areas, t_start, t_end))
+        if histograms is not None:
+            results.update(self._histogram_quantiles(histograms))
+        return results
+    
+    def _empty_results(self):
+        results = {i: 0.0 for i in range(1, 19)}
+        if self.quantiles:
+            results.update({i: 0.0 for i in QUANTILE_METRICS})
+        if self.control_variates:
+            results.update({i: 0.0 for i in CONTROL_VARIATE_METRICS})
+        if self.rare_events:
+            results.update({i: 0.0 for i in RARE_EVENT_METRICS})
+        return results
+    
+    def _empty_samples(self):
+        samples = {source: np.zeros(0) for source in (*QUANTILE_SOURCES, 'arrival1', 'arrival2')}
+        samples['index2'] = np.zeros(0, dtype=np.int64)
+        return samples
+    
+    def run_primary_stage(self, lambda1: float, s1: float, N: int, lambda2: float,
+                          **unused_params) -> Dict:
+        """
+        Швидкий розрахунок лише показників первинної обробки (1, 6, 14).
+
+        Первинний обробник не залежить від вторинної обробки, тому його моменти
+        початку обчислюються векторизованою рекурсією Ліндлі по об'єднаному потоку
+        прибуттів без відтворення циклу подій. Прибуття генеруються так само, як
+        у run_simulation_priority2_full, тож для того ж seed значення збігаються
+        з повною симуляцією з точністю до похибки округлення.
+
+        Решта параметрів (s2, D1, s2b, D2) приймаються для сумісності і ігноруються.
+        """
+        if N <= 0:
+            return {1: 0.0, 6: 0.0, 14: 0.0}
+        
+        arr1 = self._generate_type1_arrivals(lambda1, N)
+        window = self._stationary_window(arr1, N)
+        if window is None:
+            return {1: 0.0, 6: 0.0, 14: 0.0}
+        
+        return primary_stage_metrics(arr1, *window, s1, lambda2)
+    
+    def _run_with_mser_window(self, arr1, N, lambda2, s1, s2, s2b, cap2, sec2_starts=None,
+                              checkpoint=None):
+        """
+        Цикл подій з вікном, визначеним після моделювання за правилом MSER.
+
+        Рушій "coded" (і будь-який рушій з контрольними точками) запам'ятовує
+        накопичені площі в моменти подій типу 1, "classic" — журнал подій, тож
+        часові середні рахуються для вікна, яке стає відомим лише після циклу.
+
+        Повернення:
+            (cnt2, jobs, часові середні, (i_start, i_end, t_start, t_end) або None,
+             накопичені площі в моменти подій типу 1 або журнал подій)
+        """
+        log = None
+        if checkpoint is not None:
+            cnt2, jobs, marks = self._run_checkpointed_event_loop(arr1, N, lambda2, s1, s2, s2b, cap2,
+                                                                  0.0, sec2_starts, checkpoint)
+        elif self.engine in self.CODED_ENGINES:
+            marks = array('d')
+            cnt2, jobs, _ = run_coded_event_loop(arr1, N, lambda2, s1, s2, s2b, cap2,
+                                                 0.0, INF, self.should_stop, area_marks=marks,
+                                                 sec2_starts=sec2_starts)
+            marks = area_marks_table(marks)
+        else:
+            cnt2, jobs, log = self._run_event_loop_classic(arr1, N, lambda2, s1, s2, s2b, cap2,
+                                                           sec2_starts)
+            marks = log
+        
+        # Після циклу всі події типу 1 обслуговано (цикл триває до спорожнення черг)
+        sojourn1 = np.asarray(jobs['end_sec1'][1:N + 1]) - arr1[1:N + 1]
+        i_start = 1 + mser_truncation(sojourn1, self.MSER_BATCH)
+        i_end = N
+        t_start, t_end = arr1[i_start], arr1[i_end]
+        if i_end <= i_start or t_end <= t_start:
+            return cnt2, jobs, None, None, marks
+        
+        if log is None:
+            areas = tuple(marks[i_end - 1] - marks[i_start - 1])
+            time_avg_results = self._time_averages_from_areas(areas, t_start, t_end)
+        else:
+            time_avg_results = self._calculate_time_averages_vectorized(
+                t_start=t_start, t_end=t_end, **log
+            )
+        
+        return cnt2, jobs, time_avg_results, (i_start, i_end, t_start, t_end), marks
+    
+    def _run_checkpointed_event_loop(self, arr1, N, lambda2, s1, s2, s2b, cap2, window_start,
+                                     sec2_starts, checkpoint):
+        """
+        Цикл "coded" з контрольними точками (продовжується зі збереженого знімка).
+
+        Площі накопичуються від window_start без обрізання справа і
+        запам'ятовуються в моменти подій типу 1, тож площі вікна [t_start, t_end] —
+        різниця рядків i_end - 1 та i_start - 1. Якщо window_start = t_start,
+        рядок i_start - 1 нульовий, а рядок i_end - 1 — ті самі площі, що й у
+        циклу з вікном [t_start, t_end], побітово.
+
+        Аргументи:
+            window_start: t_start вікна прогону (0 — вікно стане відомим після циклу)
+            checkpoint: Заголовок контрольної точки (див. _simulate_full)
+
+        Повернення:
+            (cnt2, jobs, накопичені площі — масив area_marks_table)
+        """
+        resume = resumable_snapshot(self.checkpoint_path, checkpoint, window_start)
+        marks = array('d')
+        cnt2, jobs, _ = run_coded_event_loop(
+            arr1, N, lambda2, s1, s2, s2b, cap2,
+            window_start if resume is None else resume['t_start'], INF, self.should_stop,
+            area_marks=marks, sec2_starts=sec2_starts,
+            on_snapshot=CheckpointWriter(self.checkpoint_path, checkpoint, self.checkpoint_interval),
+            resume=resume
+        )
+        return cnt2, jobs, area_marks_table(marks)
+    
+    def _run_calendar_two_class(self, arr1, N, lambda1, s1, s2, lambda2, s2b, cap2, t_start, t_end):
+        """
+        Цикл run_calendar_event_loop для моделі з двома класами.
+
+        Повернення:
+            (cnt2, jobs, площі) — як у run_coded_event_loop
+        """
+        counts, tables, (area_p, busy_p, area_sq, busy_sec) = run_calendar_event_loop(
+            two_class_model(lambda1, s1, s2, lambda2, s2b),
+            [arr1[1:N + 1].tolist(), periodic_arrivals(lambda2)],
+            N, [N + 1, cap2], t_start, t_end, self.should_stop, legacy_slots=True
+        )
+        table1, table2 = tables
+        jobs = {
+            'start_prim1': table1['start_prim'], 'end_prim1': table1['end_prim'],
+            'start_sec1': table1['start_sec'], 'end_sec1': table1['end_sec'],
+            'arr2': table2['arr'], 'start_prim2': table2['start_prim'], 'end_prim2': table2['end_prim'],
+            'start_sec2': table2['start_sec'], 'end_sec2': table2['end_sec'],
+        }
+        return counts[1], jobs, (area_p, area_sq[0], area_sq[1], busy_p, busy_sec[0], busy_sec[1])
+    
+    def _stationary_window(self, arr1, N):
+        """
+        Стаціонарний інтервал: відкидаємо перші 5% і останні 5% подій типу 1.
+
+        Повертає (i_start, i_end, t_start, t_end) або None, якщо інтервал порожній.
+        """
+        i_start = int(np.ceil(N * 0.05))
+        i_end = int(np.floor(N * 0.95))
+        
+        if i_end <= i_start:
+            return None
+        
+        t_start = arr1[i_start]
+        t_end = arr1[i_end]
+        
+        if t_end <= t_start:
+            return None
+        
+        return i_start, i_end, t_start, t_end
+    
+    def _generate_type1_arrivals(self, lambda1: float, N: int) -> np.ndarray:
+        """
+        Згенерувати часи прибуття подій типу 1 одним масивом.
+
+        Повертає масив довжини N + 1, де arr1[0] = 0, а arr1[1..N] — часи прибуття.
+        Масив заповнюється блоками, тож тимчасова пам'ять обмежена ARRIVAL_CHUNK.
+        """
+        arr1 = np.zeros(N + 1)
+        pos = 1
+        for chunk in self._iter_type1_arrivals(lambda1, N):
+            arr1[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+        return arr1
+    
+    def _iter_poisson_arrivals(self, rate: float):
+        """Необмежений пуассонівський потік прибуттів (блоками, як _iter_type1_arrivals)."""
+        if rate <= 0:
+            return
+        for chunk in self._iter_type1_arrivals(rate, np.iinfo(np.int64).max):
+            yield from chunk.tolist()
+    
+    def _iter_type1_arrivals(self, lambda1: float, N: int, chunk_size: int = None):
+        """
+        Генерувати часи прибуття подій типу 1 блоками по chunk_size.
+
+        Інтервали між подіями вибираються одним викликом семплера на блок і
+        накопичуються через np.cumsum з перенесенням часу між блоками, тому
+        результат не залежить від розміру блоку.
+        """
+        chunk_size = chunk_size or self.ARRIVAL_CHUNK
         t = 0.0
-        for i in range(1, N + 1):
-            r = self.rng.random()
-            if r == 0:
-                r = 1e-7
-            t = t - np.log(r) / lambda1
-            arr1[i] = t
+        remaining = N
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            if self.arrival_sampler == "exponential":
+                gaps = self.rng.standard_exponential(n) / lambda1
+            else:
+                r = self.rng.random(n)
+                r[r == 0] = 1e-7
+                gaps = -np.log(r) / lambda1
+            gaps[0] += t
+            chunk = np.cumsum(gaps)
+            t = chunk[-1]
+            remaining -= n
+            yield chunk
+    
+    def _run_event_loop_classic(self, arr1, N, lambda2, s1, s2, s2b, cap2, sec2_starts=None):
+        """
+        Класичний цикл подій на рядкових станах (еталонна реалізація).
+
+        sec2_starts — як у run_coded_event_loop.
+        """
+        # Таблиці завдань типу 1 і типу 2 (стовпці — масиви numpy)
+        table1 = JobTable(JOB_COLUMNS1, N + 1)
+        start_prim1, end_prim1, start_sec1, end_sec1, rem_sec1 = table1.block
+        
+        cnt2 = 0
+        table2 = JobTable(JOB_COLUMNS2, max(cap2, N + 1))
+        arr2, start_prim2, end_prim2, start_sec2, end_sec2, rem_sec2 = table2.block
         
         # Налаштування детермінованих прибуттів типу 2
         next_arr1 = arr1[1]
@@ -106,10 +796,10 @@ class PriorityQueueSimulation:
         next_sec_done = 1e30
         state = "idle"  # "простій", "основний", "додатковий"
         
-        # Черги
-        primary_q = deque()
-        secondary_q1 = deque()
-        secondary_q2 = deque()
+        # Черги (кільцеві буфери; тип і номер завдання — в одному цілому)
+        primary_q = JobQueue()
+        secondary_q1 = JobQueue()
+        secondary_q2 = JobQueue()
         
         # Поточна послуга
         cur_prim_type = 0
@@ -168,22 +858,22 @@ class PriorityQueueSimulation:
                 
                 # Обробка переривання та обслуговування
                 if state == "primary":
-                    primary_q.append((1, arrivals1))
+                    primary_q.push_back(pack_job(1, arrivals1))
                 elif state == "secondary":
                     # Перервати вторинну обробку, повернути її в чергу
                     rem_time_cur = max(0, next_sec_done - t)
                     if cur_sec_type == 1:
                         rem_sec1[cur_sec_idx] = rem_time_cur
                         if len(secondary_q1) > 0:
-                            secondary_q1.appendleft((1, cur_sec_idx))
+                            secondary_q1.push_front(pack_job(1, cur_sec_idx))
                         else:
-                            secondary_q2.append((1, cur_sec_idx))
+                            secondary_q2.push_back(pack_job(1, cur_sec_idx))
                     elif cur_sec_type == 2:
                         rem_sec2[cur_sec_idx] = rem_time_cur
                         if len(secondary_q2) > 0:
-                            secondary_q2.appendleft((2, cur_sec_idx))
+                            secondary_q2.push_front(pack_job(2, cur_sec_idx))
                         else:
-                            secondary_q2.append((2, cur_sec_idx))
+                            secondary_q2.push_back(pack_job(2, cur_sec_idx))
                     
                     cur_sec_type = 0
                     cur_sec_idx = 0
@@ -206,40 +896,36 @@ class PriorityQueueSimulation:
                 # Створити нове прибуття події типу 2
                 cnt2 += 1
                 if cnt2 >= len(arr2):
-                    # Розширити масиви
-                    new_cap = len(arr2) * 2
-                    arr2 = np.resize(arr2, new_cap)
-                    start_prim2 = np.resize(start_prim2, new_cap)
-                    end_prim2 = np.resize(end_prim2, new_cap)
-                    start_sec2 = np.resize(start_sec2, new_cap)
-                    end_sec2 = np.resize(end_sec2, new_cap)
-                    rem_sec2 = np.resize(rem_sec2, new_cap)
+                    # Розширити таблицю (доповнення нулями)
+                    table2.ensure(cnt2)
+                    arr2, start_prim2, end_prim2, start_sec2, end_sec2, rem_sec2 = table2.block
                 
                 arr2[cnt2] = t
                 
-                # Запланувати наступне детерміністичне прибуття
+                # Запланувати наступне детерміністичне прибуття: (k+1)-ше — рівно
+                # в момент (k+1) / λ2, без накопичення похибки
                 if lambda2 > 0:
-                    next_arr2_scheduled = t + 1.0 / lambda2
+                    next_arr2_scheduled = (cnt2 + 1) / lambda2
                 else:
                     next_arr2_scheduled = 1e30
                 
                 # Обробити аналогічно до arr1
                 if state == "primary":
-                    primary_q.append((2, cnt2))
+                    primary_q.push_back(pack_job(2, cnt2))
                 elif state == "secondary":
                     rem_time_cur2 = max(0, next_sec_done - t)
                     if cur_sec_type == 1:
                         rem_sec1[cur_sec_idx] = rem_time_cur2
                         if len(secondary_q1) > 0:
-                            secondary_q1.appendleft((1, cur_sec_idx))
+                            secondary_q1.push_front(pack_job(1, cur_sec_idx))
                         else:
-                            secondary_q2.append((1, cur_sec_idx))
+                            secondary_q2.push_back(pack_job(1, cur_sec_idx))
                     elif cur_sec_type == 2:
                         rem_sec2[cur_sec_idx] = rem_time_cur2
                         if len(secondary_q2) > 0:
-                            secondary_q2.appendleft((2, cur_sec_idx))
+                            secondary_q2.push_front(pack_job(2, cur_sec_idx))
                         else:
-                            secondary_q2.append((2, cur_sec_idx))
+                            secondary_q2.push_back(pack_job(2, cur_sec_idx))
                     
                     cur_sec_type = 0
                     cur_sec_idx = 0
@@ -263,12 +949,12 @@ class PriorityQueueSimulation:
                     end_prim1[cur_prim_idx] = t
                     if rem_sec1[cur_prim_idx] <= 0:
                         rem_sec1[cur_prim_idx] = s2
-                    secondary_q1.append((1, cur_prim_idx))
+                    secondary_q1.push_back(pack_job(1, cur_prim_idx))
                 elif cur_prim_type == 2:
                     end_prim2[cur_prim_idx] = t
                     if rem_sec2[cur_prim_idx] <= 0:
                         rem_sec2[cur_prim_idx] = s2b
-                    secondary_q2.append((2, cur_prim_idx))
+                    secondary_q2.push_back(pack_job(2, cur_prim_idx))
                 
                 cur_prim_type = 0
                 cur_prim_idx = 0
@@ -279,6 +965,8 @@ class PriorityQueueSimulation:
                     self._schedule_next(t, primary_q, secondary_q1, secondary_q2, 
                                        start_prim1, start_prim2, start_sec1, start_sec2,
                                        rem_sec1, rem_sec2, s1, s2, s2b)
+                if sec2_starts is not None and cur_sec_type == 2:
+                    sec2_starts.setdefault(cur_sec_idx, t)
             
             elif ev == "sec_done":
                 # Завершити вторинну обробку
@@ -297,6 +985,8 @@ class PriorityQueueSimulation:
                     self._schedule_next(t, primary_q, secondary_q1, secondary_q2,
                                        start_prim1, start_prim2, start_sec1, start_sec2,
                                        rem_sec1, rem_sec2, s1, s2, s2b)
+                if sec2_starts is not None and cur_sec_type == 2:
+                    sec2_starts.setdefault(cur_sec_idx, t)
             
             # Записати стан події в журнал
             ev_times.append(t)
@@ -307,35 +997,17 @@ class PriorityQueueSimulation:
             ev_busy_s1.append(1 if state == "secondary" and cur_sec_type == 1 else 0)
             ev_busy_s2.append(1 if state == "secondary" and cur_sec_type == 2 else 0)
         
-        # Обчислити стаціонарний інтервал (відкинути перші 5% і останні 5% подій типу 1)
-        i_start = int(np.ceil(N * 0.05))
-        i_end = int(np.floor(N * 0.95))
-        
-        if i_end <= i_start:
-            return {i: 0.0 for i in range(1, 19)}
-        
-        t_start = arr1[i_start]
-        t_end = arr1[i_end]
-        
-        if t_end <= t_start:
-            return {i: 0.0 for i in range(1, 19)}
-        
-        # Обчислити статистику по окремих завданнях
-        results = self._calculate_job_statistics(
-            i_start, i_end, cnt2, t_start, t_end,
-            arr1, arr2, start_prim1, start_prim2, end_prim1, end_prim2,
-            start_sec1, start_sec2, end_sec1, end_sec2, D1, D2
-        )
-        
-        # Обчислити часові середні з журналу подій
-        time_avg_results = self._calculate_time_averages(
-            ev_times, ev_pq, ev_sq1, ev_sq2, ev_busy_p, ev_busy_s1, ev_busy_s2,
-            t_start, t_end
-        )
-        
-        results.update(time_avg_results)
-        
-        return results
+        jobs = {
+            'start_prim1': start_prim1, 'end_prim1': end_prim1,
+            'start_sec1': start_sec1, 'end_sec1': end_sec1,
+            'arr2': arr2, 'start_prim2': start_prim2, 'end_prim2': end_prim2,
+            'start_sec2': start_sec2, 'end_sec2': end_sec2,
+        }
+        log = {
+            'ev_times': ev_times, 'ev_pq': ev_pq, 'ev_sq1': ev_sq1, 'ev_sq2': ev_sq2,
+            'ev_busy_p': ev_busy_p, 'ev_busy_s1': ev_busy_s1, 'ev_busy_s2': ev_busy_s2,
+        }
+        return cnt2, jobs, log
     
     def _schedule_next(self, t, primary_q, secondary_q1, secondary_q2,
                       start_prim1, start_prim2, start_sec1, start_sec2,
@@ -350,8 +1022,7 @@ class PriorityQueueSimulation:
         next_sec_done = 1e30
         
         if len(primary_q) > 0:
-            item = primary_q.popleft()
-            cur_prim_type, cur_prim_idx = item
+            cur_prim_type, cur_prim_idx = unpack_job(primary_q.pop_front())
             if cur_prim_type == 1:
                 start_prim1[cur_prim_idx] = t
             else:
@@ -359,8 +1030,7 @@ class PriorityQueueSimulation:
             next_prim_done = t + s1
             state = "primary"
         elif len(secondary_q2) > 0:
-            item = secondary_q2.popleft()
-            cur_sec_type, cur_sec_idx = item
+            cur_sec_type, cur_sec_idx = unpack_job(secondary_q2.pop_front())
             if start_sec2[cur_sec_idx] == 0:
                 start_sec2[cur_sec_idx] = t
             rem_t2 = rem_sec2[cur_sec_idx] if rem_sec2[cur_sec_idx] > 0 else s2b
@@ -368,8 +1038,7 @@ class PriorityQueueSimulation:
             next_sec_done = t + rem_t2
             state = "secondary"
         elif len(secondary_q1) > 0:
-            item = secondary_q1.popleft()
-            cur_sec_type, cur_sec_idx = item
+            cur_sec_type, cur_sec_idx = unpack_job(secondary_q1.pop_front())
             if start_sec1[cur_sec_idx] == 0:
                 start_sec1[cur_sec_idx] = t
             rem_t1 = rem_sec1[cur_sec_idx] if rem_sec1[cur_sec_idx] > 0 else s2
@@ -382,8 +1051,10 @@ class PriorityQueueSimulation:
     def _calculate_job_statistics(self, i_start, i_end, cnt2, t_start, t_end,
                                   arr1, arr2, start_prim1, start_prim2, end_prim1, end_prim2,
                                   start_sec1, start_sec2, end_sec1, end_sec2, D1, D2):
-        """Розрахування статистики для окремих завдань."""
+        """Розрахування статистики для окремих завдань (скалярна еталонна версія)."""
         results = {}
+        late1_threshold = late_threshold(D1)
+        late2_threshold = late_threshold(D2)
         
         # Статистика типу 1
         sum_wp = 0.0
@@ -408,7 +1079,7 @@ class PriorityQueueSimulation:
                 max_ws1 = max(max_ws1, ws1)
                 max_soj1 = max(max_soj1, soj1)
                 
-                if soj1 > D1:
+                if soj1 > late1_threshold:
                     late1 += 1
                 n_done1 += 1
         
@@ -430,7 +1101,7 @@ class PriorityQueueSimulation:
                 max_ws2 = max(max_ws2, ws2)
                 max_soj2 = max(max_soj2, soj2)
                 
-                if soj2 > D2:
+                if soj2 > late2_threshold:
                     late2 += 1
                 n_done2 += 1
         
@@ -464,7 +1135,7 @@ class PriorityQueueSimulation:
     def _calculate_time_averages(self, ev_times, ev_pq, ev_sq1, ev_sq2,
                                 ev_busy_p, ev_busy_s1, ev_busy_s2,
                                 t_start, t_end):
-        """Обчислити часові середні статистики з журналу подій."""
+        """Обчислити часові середні статистики з журналу подій (скалярна еталонна версія)."""
         area_p = 0.0
         area_s1 = 0.0
         area_s2 = 0.0
@@ -488,6 +1159,13 @@ class PriorityQueueSimulation:
                 busy_s1 += ev_busy_s1[k] * dt_seg
                 busy_s2 += ev_busy_s2[k] * dt_seg
         
+        return self._time_averages_from_areas(
+            (area_p, area_s1, area_s2, busy_p, busy_s1, busy_s2), t_start, t_end
+        )
+    
+    def _time_averages_from_areas(self, areas, t_start, t_end):
+        """Показники 11-16 з площ (черга P, S1, S2, зайнятість P, S1, S2) на [t_start, t_end]."""
+        area_p, area_s1, area_s2, busy_p, busy_s1, busy_s2 = areas
         total_t = t_end - t_start
         
         if total_t <= 0:
@@ -501,4 +1179,261 @@ class PriorityQueueSimulation:
             15: busy_s1 / total_t,
             16: busy_s2 / total_t
         }
+    
+    def _calculate_job_statistics_vectorized(self, i_start, i_end, cnt2, t_start, t_end,
+                                             arr1, arr2, start_prim1, start_prim2, end_prim1, end_prim2,
+                                             start_sec1, start_sec2, end_sec1, end_sec2, D1, D2,
+                                             type2_range=None):
+        """
+        Векторизований розрахунок статистики для окремих завдань.
+
+        Повертає той самий dict, що й _calculate_job_statistics, побітово.
+        Приймає як масиви NumPy, так і списки (рушій "coded"). type2_range —
+        діапазон індексів подій типу 2 (за замовчуванням без перших і останніх 100).
+        """
+        results = {}
+        
+        # Статистика типу 1 у вікні [i_start, i_end]
+        lo, hi = i_start, i_end + 1
+        done1 = np.asarray(end_sec1[lo:hi]) > 0
+        a1 = np.asarray(arr1[lo:hi])[done1]
+        wp = np.asarray(start_prim1[lo:hi])[done1] - a1
+        ws1 = np.asarray(start_sec1[lo:hi])[done1] - np.asarray(end_prim1[lo:hi])[done1]
+        soj1 = np.asarray(end_sec1[lo:hi])[done1] - a1
+        n_done1 = len(a1)
+        
+        if n_done1 > 0:
+            results[1] = _ordered_sum(wp) / n_done1
+            results[2] = _ordered_sum(ws1) / n_done1
+            results[4] = _ordered_sum(soj1) / n_done1
+            results[6] = max(0.0, float(wp.max()))
+            results[7] = max(0.0, float(ws1.max()))
+            results[9] = max(0.0, float(soj1.max()))
+            results[17] = int(np.count_nonzero(soj1 > late_threshold(D1))) / n_done1
+        else:
+            results[1] = results[2] = results[4] = 0.0
+            results[6] = results[7] = results[9] = 0.0
+            results[17] = 0.0
+        
+        # Статистика типу 2: без перших і останніх 100 подій, лише прибуття у вікні
+        lo, hi = type2_range or (100, max(100, cnt2 - 99))
+        a2 = np.asarray(arr2[lo:hi])
+        e2 = np.asarray(end_sec2[lo:hi])
+        done2 = (a2 >= t_start) & (a2 <= t_end) & (e2 > 0)
+        a2 = a2[done2]
+        ws2 = np.asarray(start_sec2[lo:hi])[done2] - np.asarray(end_prim2[lo:hi])[done2]
+        soj2 = e2[done2] - a2
+        n_done2 = len(a2)
+        
+        if n_done2 > 0:
+            results[3] = _ordered_sum(ws2) / n_done2
+            results[5] = _ordered_sum(soj2) / n_done2
+            results[8] = max(0.0, float(ws2.max()))
+            results[10] = max(0.0, float(soj2.max()))
+            results[18] = int(np.count_nonzero(soj2 > late_threshold(D2))) / n_done2
+        else:
+            results[3] = results[5] = 0.0
+            results[8] = results[10] = 0.0
+            results[18] = 0.0
+        
+        return results
+    
+    def _class_statistics(self, table, lo, hi, deadline, time_window=None):
+        """
+        Статистика завдань класу з номерами lo..hi - 1 (JobTable run_calendar_event_loop).
+
+        time_window — (t_start, t_end), якщо враховувати лише прибуття в ньому.
+        Суми ті самі, що й у _calculate_job_statistics_vectorized.
+        """
+        arr = table['arr'][lo:hi]
+        end = table['end_sec'][lo:hi]
+        done = end > 0
+        if time_window is not None:
+            done &= (arr >= time_window[0]) & (arr <= time_window[1])
+        arr = arr[done]
+        values = {
+            'wait_prim': table['start_prim'][lo:hi][done] - arr,
+            'wait_sec': table['start_sec'][lo:hi][done] - table['end_prim'][lo:hi][done],
+            'sojourn': end[done] - arr,
+        }
+        
+        n_done = len(arr)
+        stats = {}
+        for name, samples in values.items():
+            stats[name] = _ordered_sum(samples) / n_done if n_done else 0.0
+            stats['max_' + name] = max(0.0, float(samples.max())) if n_done else 0.0
+        stats['late'] = (int(np.count_nonzero(values['sojourn'] > late_threshold(deadline))) / n_done
+                         if n_done else 0.0)
+        return stats
+    
+    def _window_samples(self, i_start, i_end, cnt2, t_start, t_end,
+                        arr1, arr2, start_prim1, end_prim1, start_sec1, end_sec1,
+                        end_prim2, start_sec2, end_sec2, type2_range=None, **unused_jobs):
+        """
+        Часи очікування і перебування завершених завдань у стаціонарному вікні.
+
+        Ті самі вибірки, за якими _calculate_job_statistics_vectorized рахує
+        показники 1-10, 17 і 18.
+
+        Повернення:
+            dict {назва з QUANTILE_SOURCES: масив значень, 'arrival1', 'arrival2':
+            часи прибуття відповідних подій типу 1 і типу 2, 'index2': номери подій типу 2}
+        """
+        lo, hi = i_start, i_end + 1
+        e1 = np.asarray(end_sec1[lo:hi])
+        done1 = e1 > 0
+        a1 = np.asarray(arr1[lo:hi])[done1]
+        
+        lo2, hi2 = type2_range or (100, max(100, cnt2 - 99))
+        a2 = np.asarray(arr2[lo2:hi2])
+        e2 = np.asarray(end_sec2[lo2:hi2])
+        done2 = (a2 >= t_start) & (a2 <= t_end) & (e2 > 0)
+        
+        return {
+            'wait_prim1': np.asarray(start_prim1[lo:hi])[done1] - a1,
+            'wait_sec1': np.asarray(start_sec1[lo:hi])[done1] - np.asarray(end_prim1[lo:hi])[done1],
+            'wait_sec2': np.asarray(start_sec2[lo2:hi2])[done2] - np.asarray(end_prim2[lo2:hi2])[done2],
+            'sojourn1': e1[done1] - a1,
+            'sojourn2': e2[done2] - a2[done2],
+            'arrival1': a1,
+            'arrival2': a2[done2],
+            'index2': np.arange(lo2, lo2 + len(a2))[done2],
+        }
+    
+    def _apply_control_variates(self, results, samples, arr1, i_start, i_end, trace,
+                                lambda1, lambda2, s1):
+        """
+        Уточнити показники контрольними змінними.
+
+        Вікно ділиться на BATCH_COUNT пакетів з однаковою кількістю подій типу 1;
+        завдання потрапляють у пакет за часом прибуття, часові середні пакетів
+        беруться з накопичених площ (рушій "coded") або з журналу подій.
+
+        Повернення:
+            dict з уточненими показниками і показниками 31-32
+        """
+        updated = {metric: 0.0 for metric in CONTROL_VARIATE_METRICS}
+        m = (i_end - i_start) // self.BATCH_COUNT
+        if m < 2 or trace is None:
+            return updated
+        
+        edge_idx = i_start + m * np.arange(self.BATCH_COUNT + 1)
+        edges = arr1[edge_idx]
+        spans = np.diff(edges)
+        
+        # Часові середні 11-16 по пакетах (рядки — пакети)
+        if isinstance(trace, dict):
+            batch_avgs = [self._calculate_time_averages_vectorized(t_start=lo, t_end=hi, **trace)
+                          for lo, hi in zip(edges[:-1], edges[1:])]
+            areas = np.array([[avg[i] for i in range(11, 17)] for avg in batch_avgs]) * spans[:, None]
+        else:
+            areas = np.diff(np.asarray(trace)[edge_idx - 1], axis=0)
+        time_batches = {metric: areas[:, k] / spans for k, metric in enumerate(range(11, 17))}
+        
+        # Контрольні змінні: середній інтервал між подіями типу 1 і завантаження первинного обробника
+        control_batches = [spans / m]
+        control_values = [(edges[-1] - edges[0]) / (m * self.BATCH_COUNT)]
+        control_means = [1.0 / lambda1]
+        rho = (lambda1 + lambda2) * s1
+        if rho < 1:
+            control_batches.append(time_batches[14])
+            control_values.append(areas[:, 3].sum() / spans.sum())
+            control_means.append(rho)
+        control_batches = np.column_stack(control_batches)
+        
+        targets = dict(time_batches)
+        for metric, source in CONTROL_VARIATE_SOURCES.items():
+            arrivals = samples['arrival1' if source in ('wait_prim1', 'wait_sec1', 'sojourn1')
+                               else 'arrival2']
+            batch = np.searchsorted(edges, arrivals, side='right') - 1
+            inside = (batch >= 0) & (batch < self.BATCH_COUNT)
+            counts = np.bincount(batch[inside], minlength=self.BATCH_COUNT)
+            if counts.min() == 0:
+                continue
+            targets[metric] = np.bincount(batch[inside], weights=samples[source][inside],
+                                          minlength=self.BATCH_COUNT) / counts
+        
+        remaining = {}
+        for metric in (*CONTROL_VARIATE_SOURCES, *CONTROL_VARIATE_TIME_METRICS):
+            if metric not in targets:
+                continue
+            adjustment, remaining[metric] = control_variate_adjustment(
+                targets[metric], control_batches, control_values, control_means
+            )
+            updated[metric] = results[metric] - adjustment
+        
+        for report, metric in CONTROL_VARIATE_METRICS.items():
+            updated[report] = 1.0 - remaining.get(metric, 1.0)
+        
+        return updated
+    
+    def _rare_event_deadline2(self, samples, sec2_starts, lambda1, lambda2, s1, s2b, D2):
+        """
+        Показник 18 умовним методом Монте-Карло і показник 33 — його відносна похибка.
+
+        Індикатор запізнення кожної завершеної події типу 2 замінюється точною
+        ймовірністю запізнення за станом у момент першого початку її вторинної
+        обробки (sec2_starts): з цього моменту вона залишається на чолі черги S2,
+        і її завершення залежить лише від майбутніх прибуттів (див.
+        simulation.rare_events). Відносна похибка — напівширина 95% довірчого
+        інтервалу (метод пакетних середніх), поділена на оцінку.
+        """
+        arrival2, index2 = samples['arrival2'], samples['index2']
+        if len(arrival2) == 0:
+            return {18: 0.0, RARE_EVENT_METRICS[0]: 0.0}
+        
+        started = np.array([sec2_starts[j] for j in index2.tolist()])
+        probabilities = deadline_probabilities_after_start(started - arrival2, D2, s1, s2b,
+                                                           lambda1, lambda2)
+        estimate = float(probabilities.mean())
+        half_width = self._batch_means_half_width(probabilities)
+        relative = half_width / estimate if estimate > 0 else np.inf
+        
+        return {18: estimate, RARE_EVENT_METRICS[0]: relative}
+    
+    def _tail_quantiles(self, samples):
+        """
+        Показники 19-28: квантилі QUANTILE_LEVELS для кожної величини QUANTILE_SOURCES.
+
+        Вибірки передаються в гістограми блоками по ARRIVAL_CHUNK значень, тож
+        оцінювачу не потрібно зберігати самі значення.
+        """
+        histograms = {}
+        for source in QUANTILE_SOURCES:
+            histograms[source] = LogHistogram()
+            values = samples[source]
+            for lo in range(0, len(values), self.ARRIVAL_CHUNK):
+                histograms[source].add(values[lo:lo + self.ARRIVAL_CHUNK])
+        
+        return self._histogram_quantiles(histograms)
+    
+    def _histogram_quantiles(self, histograms):
+        """Показники 19-28 з гістограм {назва з QUANTILE_SOURCES: LogHistogram}."""
+        results = {}
+        keys = iter(QUANTILE_METRICS)
+        
+        for source in QUANTILE_SOURCES:
+            for level in QUANTILE_LEVELS:
+                results[next(keys)] = histograms[source].quantile(level)
+        
+        return results
+    
+    def _calculate_time_averages_vectorized(self, ev_times, ev_pq, ev_sq1, ev_sq2,
+                                            ev_busy_p, ev_busy_s1, ev_busy_s2,
+                                            t_start, t_end, **unused_log):
+        """
+        Векторизоване обчислення часових середніх з журналу подій.
+
+        Часи подій обрізаються до [t_start, t_end] (np.clip), тож відрізки поза
+        вікном отримують нульову тривалість і не змінюють суми. Результат
+        побітово збігається з _calculate_time_averages.
+        """
+        dt = np.diff(np.clip(np.asarray(ev_times, dtype=float), t_start, t_end))
+        
+        areas = tuple(
+            _ordered_sum(np.asarray(counts[:-1], dtype=float) * dt)
+            for counts in (ev_pq, ev_sq1, ev_sq2, ev_busy_p, ev_busy_s1, ev_busy_s2)
+        )
+        
+        return self._time_averages_from_areas(areas, t_start, t_end)
 
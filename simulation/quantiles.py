@@ -0,0 +1,76 @@
+import numpy as np # type: ignore
+
+# ======================================
+# ПОТОКОВІ ОЦІНКИ КВАНТИЛІВ
+# ======================================
+# Логарифмічна гістограма з фіксованими кошиками: значення v потрапляє в кошик
+# ceil(log_γ v), де γ = (1 + α) / (1 - α). Будь-який квантиль оцінюється з
+# відносною похибкою не більше α, пам'ять не залежить від кількості завдань,
+# а гістограми різних блоків (чи процесів) об'єднуються додаванням лічильників.
+
+
+class LogHistogram:
+    """
+    Потоковий оцінювач квантилів з гарантованою відносною похибкою.
+
+    Значення не більші за min_value вважаються нулем (наприклад, нульове
+    очікування), значення більші за max_value потрапляють в останній кошик.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005,
+                 min_value: float = 1e-6, max_value: float = 1e6):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Відносна похибка має бути в (0, 1): {relative_accuracy}")
+
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self._gamma)
+        self._offset = int(np.ceil(np.log(min_value) / self._log_gamma))
+        n_bins = int(np.ceil(np.log(max_value) / self._log_gamma)) - self._offset + 1
+
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, values) -> None:
+        """Додати блок значень (масив або список)."""
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+
+        positive = values[values > self.min_value]
+        bins = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64) - self._offset
+        np.clip(bins, 0, len(self.counts) - 1, out=bins)
+
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        self.zero_count += len(values) - len(positive)
+        self.count += len(values)
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Додати лічильники іншої гістограми з тими самими налаштуваннями."""
+        if len(other.counts) != len(self.counts) or other._offset != self._offset:
+            raise ValueError("Гістограми мають різні кошики")
+
+        self.counts += other.counts
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """
+        Оцінка квантиля рівня q (0 <= q <= 1).
+
+        Повертає 0.0 для порожньої гістограми або якщо квантиль потрапляє в нульовий кошик.
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        idx = int(np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, side='right'))
+        idx = min(idx, len(self.counts) - 1)
+        # Середина кошика (γ^(i-1), γ^i] з відносною похибкою не більше α
+        return float(2.0 * self._gamma ** (idx + self._offset) / (self._gamma + 1.0))
@@ -0,0 +1,161 @@
+import numpy as np # type: ignore
+
+from simulation.deadlines import late_threshold
+
+# ======================================
+# ОЦІНКА МАЛИХ ЙМОВІРНОСТЕЙ ПОРУШЕННЯ ДЕДЛАЙНУ D2
+# ======================================
+# Умовний метод Монте-Карло. Коли подія типу 2 вперше починає вторинну
+# обробку (момент τ, через e = τ - a після прибуття), вона на чолі черги S2 і
+# залишається там: перервана, вона повертається на початок S2, а вторинна
+# обробка нових подій іде після неї. Первинна обробка має пріоритет, тож далі
+# обробник виконує її залишок s2b і по s1 на кожне нове прибуття, і подія
+# завершиться в першій точці u, де
+#     X(u) = s2b + s1 · (N1(u) + N2(u)) - u = 0,
+# N1 — пуассонівський потік типу 1 (без пам'яті, тож не залежить від минулого),
+# N2 — детерміновані прибуття типу 2 у моменти a + m / λ2.
+#
+# X спадає неперервно лише між стрибками, тож подія може завершитися тільки в
+# моменти τ_k: u = s2b + s1 · (k + N2(u)), і лише якщо до τ_k надійшло рівно k
+# подій типу 1. Дедлайн порушено, якщо для всіх τ_k <= D2 - e виконано
+# N1(τ_k) >= k + 1; ця ймовірність рахується точно рекурсією по розподілу N1(τ_k).
+#
+# Індикатор 1{T > D2} замінюється цією умовною ймовірністю: математичне
+# сподівання те саме, а для малих ймовірностей відносна похибка набагато менша.
+# Завершення, що збігається з прибуттям типу 2, вважається завершенням; симулятор
+# у такому збігу віддає перевагу прибуттю (вирішується округленням float), тож
+# при λ2, кратних 1 / s1, оцінки можуть трохи відрізнятися від показника 18.
+# Завершення в момент дедлайну — вчасне, з тим самим допуском, що й у показнику
+# 18 без цього режиму (simulation.deadlines.late_threshold).
+
+POISSON_TAIL_SIGMAS = 12  # Запас хвоста розподілу Пуассона в рекурсії (стандартних відхилень)
+
+# Точність, з якою збігаються значення часу до початку вторинної обробки
+TIME_TOLERANCE = 1e-9
+
+
+def _completion_times(work, horizon, s1, lambda2, elapsed):
+    """Моменти τ_0 < τ_1 < ... <= horizon можливого завершення роботи work."""
+    row = _completion_time_table(work, np.array([horizon]), s1, lambda2, np.array([elapsed]))[0]
+    return row[np.isfinite(row)].tolist()
+
+
+def _completion_time_table(work, horizons, s1, lambda2, elapsed):
+    """
+    Моменти _completion_times для масивів horizons і elapsed одночасно.
+
+    Повернення:
+        Масив (len(elapsed) × K): рядок — моменти τ_k для відповідного значення,
+        після останнього моменту (і для work > horizon) — inf
+    """
+    passed2 = np.floor(lambda2 * elapsed) if lambda2 > 0 else np.zeros(len(elapsed))
+    alive = work <= horizons
+    columns = []
+    k = 0
+    while alive.any():
+        u = np.where(alive, work + s1 * k, np.inf)
+        # Нерухома точка u = work + s1 · (k + N2(u)); ітерації монотонно зростають
+        moving = np.flatnonzero(u <= horizons)
+        while len(moving):
+            if lambda2 > 0:
+                arrivals2 = np.floor(lambda2 * (u[moving] + elapsed[moving])) - passed2[moving]
+            else:
+                arrivals2 = np.zeros(len(moving))
+            nxt = work + s1 * (k + arrivals2)
+            grows = nxt > u[moving]
+            moving = moving[grows]
+            u[moving] = nxt[grows]
+            moving = moving[u[moving] <= horizons[moving]]
+        alive &= u <= horizons
+        columns.append(np.where(alive, u, np.inf))
+        k += 1
+    if not columns:
+        return np.full((len(elapsed), 0), np.inf)
+    return np.column_stack(columns)
+
+
+def _survival(times, lambda1: float) -> float:
+    """
+    P(N1(τ_k) >= k + 1 для всіх моментів τ_k з times) — ймовірність, що подія
+    не завершиться в жодному з них.
+    """
+    K = len(times)
+    if K == 0:
+        return 1.0
+
+    # dist[n] — ймовірність N1(τ_k) = n без завершення раніше (n < K); safe —
+    # маса станів n >= K, для яких усі наступні умови вже виконані
+    dist = np.zeros(K)
+    dist[0] = 1.0
+    safe = 0.0
+    t_prev = 0.0
+
+    for k, t in enumerate(times):
+        mean = lambda1 * (t - t_prev)
+        J = min(K, int(mean + POISSON_TAIL_SIGMAS * np.sqrt(mean) + 20))
+        j = np.arange(J + 1)
+        if mean > 0:
+            pmf = np.exp(j * np.log(mean) - mean - np.cumsum(np.log(np.maximum(j, 1))))
+        else:
+            pmf = (j == 0).astype(float)
+
+        full = np.convolve(dist, pmf)
+        safe += float(full[K:].sum()) + float(dist.sum()) * max(0.0, 1.0 - float(pmf.sum()))
+        dist = full[:K]
+        dist[:k + 1] = 0.0  # Завершення в τ_k, якщо надійшло рівно k подій
+        t_prev = t
+
+    return float(dist.sum() + safe)
+
+
+def violation_probability(work: float, horizon: float, s1: float, lambda1: float,
+                          lambda2: float, elapsed: float = 0.0) -> float:
+    """
+    Ймовірність, що робота work разом з первинною обробкою нових прибуттів не
+    завершиться за час horizon.
+
+    Аргументи:
+        work: Робота, що лишилась до завершення події без нових прибуттів
+        horizon: Час, що лишився до дедлайну
+        s1: Тривалість первинної обробки
+        lambda1, lambda2: Інтенсивності потоків
+        elapsed: Час від прибуття події типу 2 (фаза детермінованого потоку)
+
+    Повернення:
+        P(X(u) > 0 для всіх u <= horizon) — завершення рівно в момент horizon вчасне
+    """
+    if work > horizon:
+        return 1.0
+    return _survival(_completion_times(work, horizon, s1, lambda2, elapsed), lambda1)
+
+
+def deadline_probabilities_after_start(elapsed, deadline: float, s1: float, s2b: float,
+                                       lambda1: float, lambda2: float):
+    """
+    Умовні ймовірності запізнення подій типу 2 за моментом початку вторинної обробки.
+
+    Ймовірність залежить від elapsed лише через моменти можливого завершення
+    τ_k — точки сітки s2b + s1 · n, тож різних послідовностей τ_k мало, навіть
+    коли значення elapsed майже не повторюються. Моменти рахуються для всіх
+    значень разом, а рекурсія (_survival) — один раз для кожної різної
+    послідовності; результат той самий, що й violation_probability для кожного
+    значення.
+
+    Аргументи:
+        elapsed: Масив часу від прибуття до першого початку вторинної обробки
+        deadline: Дедлайн D2
+        s1, s2b, lambda1, lambda2: Параметри моделі
+
+    Повернення:
+        np.ndarray ймовірностей тієї ж довжини
+    """
+    elapsed = np.asarray(elapsed, dtype=float)
+    if len(elapsed) == 0:
+        return np.zeros(0)
+    keys, inverse = np.unique(np.round(elapsed / TIME_TOLERANCE), return_inverse=True)
+    starts = keys * TIME_TOLERANCE
+    threshold = float(late_threshold(deadline))
+    table = _completion_time_table(s2b, threshold - starts, s1, lambda2, starts)
+    rows, row_of_key = np.unique(table, axis=0, return_inverse=True)
+    values = np.array([_survival(row[np.isfinite(row)].tolist(), lambda1) for row in rows])
+    return values[row_of_key.ravel()][inverse.ravel()]
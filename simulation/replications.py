@@ -0,0 +1,81 @@
+import numpy as np # type: ignore
+from typing import Dict, Optional
+
+from simulation.parallel_runner import run_scenarios
+
+# ======================================
+# НЕЗАЛЕЖНІ РЕПЛІКАЦІЇ СЦЕНАРІЮ
+# ======================================
+# R прогонів того самого сценарію з різними seed виконуються в пулі процесів
+# (run_scenarios) скомпільованим або кодованим рушієм, а показники зводяться
+# в матрицю (реплікація × показник) із середніми і напівширинами 95% довірчих
+# інтервалів за t-розподілом. Реплікація r дає ті самі показники, що й
+# PriorityQueueSimulation(seed=seeds[r]) з тим самим рушієм.
+
+# Квантилі t-розподілу рівня 0.975 для 1..30 ступенів свободи
+_T_975 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+          2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+          2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+
+def t_quantile_975(df: int) -> float:
+    """Квантиль 0.975 t-розподілу (таблиця до 30 ступенів, далі розклад Корніша-Фішера)."""
+    if df <= len(_T_975):
+        return _T_975[df - 1]
+    z = 1.959964
+    return z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+
+
+def replication_seeds(R: int, seed=None):
+    """Seed кожної з R реплікацій, отримані з генератора default_rng(seed)."""
+    rng = np.random.default_rng(seed)
+    return [int(x) for x in rng.integers(0, 2**63 - 1, size=R)]
+
+
+def run_replications(params: Dict, R: int, seed=None, workers: Optional[int] = None,
+                     engine: str = "jit", arrival_sampler: str = "inverse",
+                     cancel_event=None, quantiles: bool = False, warmup: str = "fixed",
+                     control_variates: bool = False) -> Optional[Dict]:
+    """
+    Виконати R незалежних реплікацій сценарію в пулі процесів.
+
+    Помилка будь-якої реплікації — RuntimeError (середні без неї були б
+    зміщені), R < 1 — ValueError.
+
+    Аргументи:
+        params: Параметри сценарію (lambda1, s1, s2, N, D1, lambda2, s2b, D2)
+        R: Кількість реплікацій
+        seed: Seed, з якого виводяться seed реплікацій (replication_seeds)
+        workers: Кількість процесів (None — усі ядра, 1 — без пулу)
+        engine: Рушій кожної реплікації ("jit" без numba працює як "coded")
+        cancel_event: multiprocessing.Event для скасування
+        quantiles, warmup, control_variates: Як у run_scenarios
+
+    Повернення:
+        dict {'seeds': seed реплікацій, 'metrics': номери показників,
+              'values': масив R × показники, 'mean': середні,
+              'half_width': напівширини 95% ДІ (t-розподіл з R - 1 ступенями
+              свободи; для R = 1 — нулі)}; None, якщо прогін скасовано
+    """
+    if R < 1:
+        raise ValueError(f"Кількість реплікацій має бути не менше 1: {R}")
+    seeds = replication_seeds(R, seed)
+    errors = []
+    results = run_scenarios([params] * R, seeds, workers=workers, engine=engine,
+                            arrival_sampler=arrival_sampler, cancel_event=cancel_event,
+                            quantiles=quantiles, warmup=warmup, control_variates=control_variates,
+                            on_result=lambda i, result, error: error and errors.append(error))
+    if errors:
+        raise RuntimeError(f"Помилка реплікації: {errors[0]}")
+    if any(result is None for result in results):
+        return None
+
+    metrics = list(results[0])
+    values = np.array([[float(result[m]) for m in metrics] for result in results])
+    mean = values.mean(axis=0)
+    if R > 1:
+        half_width = t_quantile_975(R - 1) * values.std(axis=0, ddof=1) / np.sqrt(R)
+    else:
+        half_width = np.zeros(len(metrics))
+    return {'seeds': seeds, 'metrics': metrics, 'values': values,
+            'mean': mean, 'half_width': half_width}
@@ -0,0 +1,94 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import closing
+from typing import Dict, Optional
+
+from config import Config
+from simulation.priority_simulator import SIMULATOR_VERSION
+
+# ======================================
+# ДИСКОВИЙ КЕШ РЕЗУЛЬТАТІВ СЦЕНАРІЇВ
+# ======================================
+
+
+class ResultCache:
+    """
+    Постійний кеш 18 показників сценарію у файлі SQLite.
+
+    Ключ — хеш від параметрів, seed, генератора прибуттів і версії симулятора
+    (SIMULATOR_VERSION), тож зміна будь-чого з цього дає новий запис. Кількість
+    записів обмежена max_entries; при переповненні видаляються ті, що найдовше
+    не використовувались (LRU). З'єднання відкривається на кожну операцію, тому
+    кеш можна використовувати з будь-якого потоку.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        self.path = path or os.path.join(Config.CACHE_FOLDER, "results.sqlite")
+        self.max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS results ("
+                         "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON results (last_used)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(params: Dict, seed, arrival_sampler: str = "inverse",
+                 primary_only: bool = False, quantiles: bool = False,
+                 stopping: Optional[Dict] = None, warmup: str = "fixed",
+                 control_variates: bool = False, rare_events: bool = False) -> str:
+        """Ключ кешу для сценарію (рушій не входить — усі рушії дають ті самі результати)."""
+        payload = {
+            'params': {name: params[name] for name in sorted(params)},
+            'seed': seed if seed is None else int(seed),
+            'arrival_sampler': arrival_sampler,
+            'primary_only': primary_only,
+            'quantiles': quantiles,
+            'stopping': stopping,
+            'warmup': warmup,
+            'control_variates': control_variates,
+            'rare_events': rare_events,
+            'version': SIMULATOR_VERSION,
+        }
+        raw = json.dumps(payload, sort_keys=True, default=float)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Результат за ключем або None; вдале звернення оновлює час використання."""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+
+        return {int(metric): value for metric, value in json.loads(row[0]).items()}
+
+    def put(self, key: str, result: Dict) -> None:
+        """Зберегти результат і за потреби витіснити найстаріші записи."""
+        value = json.dumps({str(metric): float(v) for metric, v in result.items()})
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+                         (key, value, time.time()))
+            count = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute("DELETE FROM results WHERE key IN ("
+                             "SELECT key FROM results ORDER BY last_used ASC LIMIT ?)",
+                             (count - self.max_entries,))
+
+    def clear(self) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
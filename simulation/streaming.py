@@ -0,0 +1,376 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+from simulation.coded_engine import (IDLE, PRIMARY, SECONDARY, EV_ARR1, EV_ARR2, EV_PRIM_DONE,
+                                     EV_SEC_DONE, INF, STOP_CHECK_MASK, SimulationCancelled)
+from simulation.arrivals import arrival_schedule, split_blocks
+from simulation.deadlines import late_threshold
+
+# ======================================
+# ПОТОКОВИЙ ЦИКЛ ПОДІЙ З ОБМЕЖЕНОЮ ПАМ'ЯТТЮ
+# ======================================
+# Той самий цикл, що й run_coded_event_loop, але без масивів на весь прогін:
+# прибуття надходять блоками об'єднаного розкладу (simulation.arrivals),
+# записи завдань зберігаються в словниках лише поки завдання в системі, а
+# завершені завдання одразу додаються до сум статистики — у порядку номерів,
+# тож суми побітово ті самі, що й у _calculate_job_statistics. Пам'ять
+# залежить від кількості завдань у системі, а не від N.
+#
+# Особливість таблиці типу 2 відтворюється: завдання типу 1, що обслуговується
+# з черги S2, використовує слот типу 2 з тим самим номером (слот завершеної
+# події лише читається). Для ще не прибулої події типу 2 від такого
+# обслуговування лишається тільки момент початку — він стане її початком
+# вторинної обробки. Ці моменти зберігаються компактно (8 + 8 байт) і лише для
+# подій, що прибудуть у стаціонарне вікно; при λ1 > λ2 їх кількість усе ж
+# росте пропорційно N — це єдиний стан, що не обмежений кількістю завдань у
+# системі.
+
+TYPE2_MARGIN = 100  # Відкинуті перші й останні події типу 2 (як у _calculate_job_statistics)
+HISTOGRAM_BLOCK = 1 << 16  # Розмір блоку значень для гістограм квантилів
+
+
+class WindowAccumulator:
+    """
+    Статистика завершених завдань одного типу у стаціонарному вікні.
+
+    Для кожного завдання додається кортеж величин (останньою — час перебування):
+    рахуються суми, максимуми (не менше 0), кількість завдань і кількість
+    запізнілих (час перебування більше late_threshold(deadline)). Якщо задано histograms —
+    для кожної величини LogHistogram (або None), значення додаються блоками.
+    """
+
+    def __init__(self, size: int, deadline: float, histograms=None):
+        self.threshold = late_threshold(deadline)
+        self.count = 0
+        self.late = 0
+        self.sums = [0.0] * size
+        self.maxima = [0.0] * size
+        self.histograms = histograms
+        self._buffers = [[] for _ in range(size)] if histograms is not None else None
+
+    def add(self, values) -> None:
+        self.count += 1
+        sums, maxima = self.sums, self.maxima
+        for k, value in enumerate(values):
+            sums[k] += value
+            if value > maxima[k]:
+                maxima[k] = value
+        if values[-1] > self.threshold:
+            self.late += 1
+
+        if self._buffers is not None:
+            for buffer, value in zip(self._buffers, values):
+                buffer.append(value)
+            if len(self._buffers[0]) >= HISTOGRAM_BLOCK:
+                self.flush()
+
+    def flush(self) -> None:
+        """Передати накопичені значення в гістограми."""
+        if self._buffers is None:
+            return
+        for histogram, buffer in zip(self.histograms, self._buffers):
+            if histogram is not None and buffer:
+                histogram.add(buffer)
+            buffer.clear()
+
+    def means(self):
+        return [total / self.count if self.count else 0.0 for total in self.sums]
+
+    def late_fraction(self) -> float:
+        return self.late / self.count if self.count else 0.0
+
+
+def run_streaming_event_loop(arrival_chunks, N: int, lambda2: float, s1: float, s2: float,
+                             s2b: float, i_start: int, i_end: int, stats1: WindowAccumulator,
+                             stats2: WindowAccumulator, should_stop=None):
+    """
+    Цикл подій run_coded_event_loop з потоковим підрахунком статистики.
+
+    Аргументи:
+        arrival_chunks: Ітератор блоків часів прибуття подій типу 1 (разом N значень)
+        N: Кількість подій типу 1
+        lambda2, s1, s2, s2b: Параметри моделі
+        i_start, i_end: Номери подій типу 1, що задають стаціонарне вікно
+            (t_start і t_end — їх часи прибуття, відомі, коли надійде їх блок)
+        stats1: WindowAccumulator для величин (очікування первинної обробки,
+            очікування вторинної обробки, перебування) подій типу 1 з номерами
+            i_start..i_end
+        stats2: WindowAccumulator для (очікування вторинної обробки, перебування)
+            подій типу 2, крім перших і останніх TYPE2_MARGIN, що прибули у вікні
+        should_stop: Як у run_coded_event_loop
+
+    Повернення:
+        (cnt2, площі як у run_coded_event_loop, t_start, t_end)
+    """
+    schedule = arrival_schedule(split_blocks(arrival_chunks), lambda2)
+    chunk, sched_times, sched_codes = next(schedule)
+    chunk_base = 1  # Номер події типу 1 для chunk[0]
+    pos = 0
+
+    t_start = t_end = INF
+    if chunk_base <= i_start < chunk_base + len(chunk):
+        t_start = float(chunk[i_start - chunk_base])
+    if chunk_base <= i_end < chunk_base + len(chunk):
+        t_end = float(chunk[i_end - chunk_base])
+
+    # Записи завдань у системі: номер -> значення
+    arr1 = {}
+    start_prim1 = {}
+    end_prim1 = {}
+    start_sec1 = {}
+    end_sec1 = {}
+    rem_sec1 = {}
+
+    cnt2 = 0
+    arr2 = {}
+    start_prim2 = {}
+    end_prim2 = {}
+    start_sec2 = {}
+    end_sec2 = {}
+    rem_sec2 = {}
+
+    # Моменти початку обслуговування в слотах подій типу 2, що ще не прибули
+    # (номери зростають; прочитані — до pending_head)
+    pending_idx = array('q')
+    pending_start = array('d')
+    pending_head = 0
+
+    start_prim = (None, start_prim1, start_prim2)
+
+    # Наступні за номером завдання, які ще не додано до статистики
+    next_fold1 = i_start
+    next_fold2 = TYPE2_MARGIN
+    add1 = stats1.add
+    add2 = stats2.add
+
+    next_arr = sched_times[0]
+    next_code = sched_codes[0]
+    next_prim_done = INF
+    next_sec_done = INF
+    state = IDLE
+
+    primary_q = deque()
+    secondary_q1 = deque()
+    secondary_q2 = deque()
+    n_pq = n_sq1 = n_sq2 = 0
+
+    cur_prim_type = cur_prim_idx = 0
+    cur_sec_type = cur_sec_idx = 0
+
+    area_p = area_s1 = area_s2 = 0.0
+    busy_p = busy_s1 = busy_s2 = 0.0
+    t_prev = INF
+
+    pq_push = primary_q.append
+    pq_pop = primary_q.popleft
+    sq1_push = secondary_q1.append
+    sq1_push_front = secondary_q1.appendleft
+    sq1_pop = secondary_q1.popleft
+    sq2_push = secondary_q2.append
+    sq2_push_front = secondary_q2.appendleft
+    sq2_pop = secondary_q2.popleft
+
+    arrivals1 = 0
+
+    while arrivals1 < N or state != IDLE or n_pq or n_sq1 or n_sq2:
+        t = next_arr
+        ev = next_code
+        if next_prim_done < t:
+            t = next_prim_done
+            ev = EV_PRIM_DONE
+        if next_sec_done < t:
+            t = next_sec_done
+            ev = EV_SEC_DONE
+
+        if t > t_start and t_prev < t_end:
+            dt = (t if t < t_end else t_end) - (t_prev if t_prev > t_start else t_start)
+            if n_pq:
+                area_p += n_pq * dt
+            if n_sq1:
+                area_s1 += n_sq1 * dt
+            if n_sq2:
+                area_s2 += n_sq2 * dt
+            if state == PRIMARY:
+                busy_p += dt
+            elif cur_sec_type == 1:
+                busy_s1 += dt
+            elif cur_sec_type == 2:
+                busy_s2 += dt
+        t_prev = t
+
+        if ev <= EV_ARR2:
+            pos += 1
+            if pos == len(sched_times):
+                # Наступний блок розкладу; у ньому можуть бути межі вікна
+                chunk_base += len(chunk)
+                chunk, sched_times, sched_codes = next(schedule, (chunk[:0], [INF], [EV_ARR2]))
+                pos = 0
+                if chunk_base <= i_start < chunk_base + len(chunk):
+                    t_start = float(chunk[i_start - chunk_base])
+                if chunk_base <= i_end < chunk_base + len(chunk):
+                    t_end = float(chunk[i_end - chunk_base])
+            next_arr = sched_times[pos]
+            next_code = sched_codes[pos]
+
+            if ev == EV_ARR1:
+                arrivals1 += 1
+                if not arrivals1 & STOP_CHECK_MASK and should_stop is not None and should_stop():
+                    raise SimulationCancelled()
+                typ = 1
+                idx = arrivals1
+                arr1[idx] = t
+                start_sec1[idx] = 0.0
+                rem_sec1[idx] = 0.0
+            else:
+                cnt2 += 1
+                arr2[cnt2] = t
+                typ = 2
+                idx = cnt2
+                # Слот міг бути використаний завданням типу 1 з черги S2
+                if pending_head < len(pending_idx) and pending_idx[pending_head] == idx:
+                    start_sec2[idx] = pending_start[pending_head]
+                    pending_head += 1
+                    if pending_head >= 4096 and 2 * pending_head >= len(pending_idx):
+                        del pending_idx[:pending_head], pending_start[:pending_head]
+                        pending_head = 0
+                else:
+                    start_sec2[idx] = 0.0
+                rem_sec2[idx] = 0.0
+                # Подія з номером cnt2 - TYPE2_MARGIN тепер не серед останніх
+                while next_fold2 + TYPE2_MARGIN <= cnt2 and next_fold2 in end_sec2:
+                    j = next_fold2
+                    a2 = arr2.pop(j)
+                    e2 = end_sec2.pop(j)
+                    ws2 = start_sec2.pop(j) - end_prim2.pop(j)
+                    del start_prim2[j], rem_sec2[j]
+                    if t_start <= a2 <= t_end and e2 > 0:
+                        add2((ws2, e2 - a2))
+                    next_fold2 += 1
+
+            if state == PRIMARY:
+                pq_push((typ, idx))
+                n_pq += 1
+            else:
+                if state == SECONDARY:
+                    rem = next_sec_done - t
+                    if rem < 0:
+                        rem = 0
+                    if cur_sec_type == 1:
+                        rem_sec1[cur_sec_idx] = rem
+                        if n_sq1 > 0:
+                            sq1_push_front((1, cur_sec_idx))
+                            n_sq1 += 1
+                        else:
+                            sq2_push((1, cur_sec_idx))
+                            n_sq2 += 1
+                    else:
+                        rem_sec2[cur_sec_idx] = rem
+                        if n_sq2 > 0:
+                            sq2_push_front((2, cur_sec_idx))
+                        else:
+                            sq2_push((2, cur_sec_idx))
+                        n_sq2 += 1
+                    cur_sec_type = cur_sec_idx = 0
+                    next_sec_done = INF
+
+                state = PRIMARY
+                cur_prim_type = typ
+                cur_prim_idx = idx
+                start_prim[typ][idx] = t
+                next_prim_done = t + s1
+
+        else:
+            if ev == EV_PRIM_DONE:
+                if cur_prim_type == 1:
+                    end_prim1[cur_prim_idx] = t
+                    if rem_sec1[cur_prim_idx] <= 0:
+                        rem_sec1[cur_prim_idx] = s2
+                    sq1_push((1, cur_prim_idx))
+                    n_sq1 += 1
+                else:
+                    end_prim2[cur_prim_idx] = t
+                    if rem_sec2[cur_prim_idx] <= 0:
+                        rem_sec2[cur_prim_idx] = s2b
+                    sq2_push((2, cur_prim_idx))
+                    n_sq2 += 1
+                cur_prim_type = cur_prim_idx = 0
+                next_prim_done = INF
+            else:
+                if cur_sec_type == 1:
+                    end_sec1[cur_sec_idx] = t
+                    if cur_sec_idx < i_start or cur_sec_idx > i_end:
+                        j = cur_sec_idx
+                        del arr1[j], start_prim1[j], end_prim1[j], start_sec1[j], end_sec1[j], rem_sec1[j]
+                    while next_fold1 in end_sec1:
+                        j = next_fold1
+                        a1 = arr1.pop(j)
+                        e1 = end_sec1.pop(j)
+                        wp = start_prim1.pop(j) - a1
+                        ws1 = start_sec1.pop(j) - end_prim1.pop(j)
+                        del rem_sec1[j]
+                        if e1 > 0:
+                            add1((wp, ws1, e1 - a1))
+                        next_fold1 += 1
+                else:
+                    end_sec2[cur_sec_idx] = t
+                    if cur_sec_idx < TYPE2_MARGIN:
+                        j = cur_sec_idx
+                        del arr2[j], start_prim2[j], end_prim2[j], start_sec2[j], end_sec2[j], rem_sec2[j]
+                    while next_fold2 + TYPE2_MARGIN <= cnt2 and next_fold2 in end_sec2:
+                        j = next_fold2
+                        a2 = arr2.pop(j)
+                        e2 = end_sec2.pop(j)
+                        ws2 = start_sec2.pop(j) - end_prim2.pop(j)
+                        del start_prim2[j], rem_sec2[j]
+                        if t_start <= a2 <= t_end and e2 > 0:
+                            add2((ws2, e2 - a2))
+                        next_fold2 += 1
+                cur_sec_type = cur_sec_idx = 0
+                next_sec_done = INF
+
+            if n_pq > 0:
+                cur_prim_type, cur_prim_idx = pq_pop()
+                n_pq -= 1
+                start_prim[cur_prim_type][cur_prim_idx] = t
+                next_prim_done = t + s1
+                state = PRIMARY
+            elif n_sq2 > 0:
+                # Елементи черги S2 обслуговуються за слотами типу 2
+                cur_sec_type, cur_sec_idx = sq2_pop()
+                n_sq2 -= 1
+                j = cur_sec_idx
+                if j in start_sec2:
+                    if start_sec2[j] == 0:
+                        start_sec2[j] = t
+                    rem = rem_sec2[j]
+                    rem_sec2[j] = 0
+                elif j > cnt2:
+                    # Слот події типу 2, що ще не прибула: залишку немає, а момент
+                    # початку потрібен, лише якщо вона прибуде у вікно
+                    rem = 0
+                    if lambda2 > 0 and not j / lambda2 > t_end:
+                        k = bisect_left(pending_idx, j, pending_head)
+                        if k == len(pending_idx) or pending_idx[k] != j:
+                            pending_idx.insert(k, j)
+                            pending_start.insert(k, t)
+                else:
+                    # Слот уже обслуженої події: початок записано, залишку немає
+                    rem = 0
+                next_sec_done = t + (rem if rem > 0 else s2b)
+                state = SECONDARY
+            elif n_sq1 > 0:
+                cur_sec_type, cur_sec_idx = sq1_pop()
+                n_sq1 -= 1
+                if start_sec1[cur_sec_idx] == 0:
+                    start_sec1[cur_sec_idx] = t
+                rem = rem_sec1[cur_sec_idx]
+                rem_sec1[cur_sec_idx] = 0
+                next_sec_done = t + (rem if rem > 0 else s2)
+                state = SECONDARY
+            else:
+                state = IDLE
+
+    stats1.flush()
+    stats2.flush()
+    return cnt2, (area_p, area_s1, area_s2, busy_p, busy_s1, busy_s2), t_start, t_end
@@ -0,0 +1,40 @@
+import numpy as np # type: ignore
+
+# ======================================
+# ВИЗНАЧЕННЯ ПЕРЕХІДНОГО ПЕРІОДУ (MSER)
+# ======================================
+# MSER (Marginal Standard Error Rule): точка обрізання d вибирається так, щоб
+# мінімізувати квадрат стандартної похибки середнього решти вибірки
+#     MSER(d) = Σ_{j>d} (Y_j - Ȳ_d)² / (k - d)²,
+# де Y_j — середні пакетів по batch_size спостережень (MSER-5 при batch_size = 5).
+# Пошук обмежено першою половиною вибірки, як рекомендують автори методу.
+
+
+def mser_truncation(values, batch_size: int = 5) -> int:
+    """
+    Кількість початкових спостережень, які слід відкинути як перехідний період.
+
+    Аргументи:
+        values: Послідовність спостережень у порядку часу (наприклад, час перебування)
+        batch_size: Розмір пакета для усереднення
+
+    Повернення:
+        Кількість спостережень (кратна batch_size); 0 — якщо вибірка замала
+    """
+    values = np.asarray(values, dtype=float)
+    k = len(values) // batch_size
+    if k < 4:
+        return 0
+
+    batches = values[:k * batch_size].reshape(k, batch_size).mean(axis=1)
+
+    # Суми і суми квадратів "хвостів" batches[d:] для всіх d одразу
+    tail_sum = np.cumsum(batches[::-1])[::-1]
+    tail_sq = np.cumsum((batches ** 2)[::-1])[::-1]
+    remaining = np.arange(k, 0, -1, dtype=float)
+
+    sse = tail_sq - tail_sum ** 2 / remaining
+    mser = sse / remaining ** 2
+
+    d = int(np.argmin(mser[:k // 2 + 1]))
+    return d * batch_size
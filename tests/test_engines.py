@@ -0,0 +1,77 @@
+import pytest # type: ignore
+
+from simulation.checkpoint import load_checkpoint
+from simulation.coded_engine import SimulationCancelled
+from simulation.job_queue import JobQueue, pack_job, unpack_job
+from simulation.priority_simulator import PriorityQueueSimulation
+
+# Набори параметрів: звичайне навантаження, без подій типу 2 (λ2 = 0),
+# λ1 > λ2 (завдання типу 1 з черги S2 пишуть у ще не прибулі події типу 2)
+# і майже повне завантаження з довгими чергами
+CASES = {
+    "base": dict(lambda1=0.5, s1=0.7, s2=0.6, N=20000, D1=4, lambda2=0.3, s2b=0.9, D2=5),
+    "no_type2": dict(lambda1=1.0, s1=0.1, s2=0.2, N=20000, D1=1.0, lambda2=0.0, s2b=0.3, D2=0.8),
+    "lambda1_gt_lambda2": dict(lambda1=1.0, s1=0.1, s2=0.2, N=20000, D1=1.0, lambda2=0.5, s2b=0.3, D2=0.8),
+    "heavy": dict(lambda1=0.9, s1=0.5, s2=0.4, N=20000, D1=3, lambda2=0.5, s2b=0.8, D2=4),
+}
+
+
+def _run(params, seed=3, **options):
+    return PriorityQueueSimulation(seed=seed, **options).run_simulation_priority2_full(**params)
+
+
+def _assert_same(expected, actual):
+    assert expected.keys() == actual.keys()
+    for metric in expected:
+        a, b = expected[metric], actual[metric]
+        assert a == b or (a != a and b != b), f"показник {metric}: {a} != {b}"
+
+
+@pytest.mark.parametrize("engine", ["coded", "jit", "streaming", "calendar"])
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_engine_matches_classic(engine, case):
+    params = CASES[case]
+    _assert_same(_run(params, engine="classic"), _run(params, engine=engine))
+
+
+def test_checkpoint_resume_matches_uninterrupted_run(tmp_path):
+    # Перевірка скасування — кожні 65536 подій типу 1; третя перерве прогін
+    # після двох записів (заголовок з першим сегментом і дописаний сегмент)
+    params = dict(CASES["lambda1_gt_lambda2"], N=200000)
+    path = str(tmp_path / "run.ckpt")
+    calls = [0]
+
+    def stop():
+        calls[0] += 1
+        return calls[0] >= 3
+
+    with pytest.raises(SimulationCancelled):
+        _run(params, engine="coded", checkpoint_path=path, checkpoint_interval=0, should_stop=stop)
+    _, snapshot = load_checkpoint(path)
+    assert snapshot['arrivals1'] == 2 * 65536
+    resumed = _run(params, engine="coded", checkpoint_path=path)
+    _assert_same(_run(params, engine="coded"), resumed)
+
+
+def test_job_queue_wraparound():
+    assert unpack_job(pack_job(2, 123456789)) == (2, 123456789)
+    assert unpack_job(pack_job(1, 0)) == (1, 0)
+
+    queue = JobQueue(capacity=4)
+    expected = []
+    # Голова обходить кінець буфера кілька разів, потім буфер подвоюється
+    for idx in range(10):
+        queue.push_back(pack_job(1, idx))
+        expected.append((1, idx))
+        if idx % 2:
+            assert unpack_job(queue.pop_front()) == expected.pop(0)
+    queue.push_front(pack_job(2, 99))
+    expected.insert(0, (2, 99))
+    for idx in range(10, 13):
+        queue.push_back(pack_job(2, idx))
+        expected.append((2, idx))
+
+    assert len(queue) == len(expected)
+    assert [unpack_job(int(code)) for code in queue.codes()] == expected
+    assert [unpack_job(queue.pop_front()) for _ in range(len(expected))] == expected
+    assert len(queue) == 0
@@ -0,0 +1,37 @@
+import numpy as np # type: ignore
+
+from simulation.deadlines import SojournProfile, late_threshold
+from simulation.priority_simulator import PriorityQueueSimulation
+
+# Параметри, за яких час перебування подій типу 2 з додатною ймовірністю
+# дорівнює D2 = s2b + 5·s1 точно (дедлайн на «сітці» детермінованих тривалостей)
+ON_GRID = dict(lambda1=1.0, s1=0.1, s2=0.2, N=30000, D1=1.0, lambda2=0.5, s2b=0.3, D2=0.8)
+SEEDS = range(4)
+
+
+def _metric18(rare_events: bool, params) -> float:
+    return float(np.mean([
+        PriorityQueueSimulation(seed=seed, rare_events=rare_events).run_simulation_priority2_full(**params)[18]
+        for seed in SEEDS
+    ]))
+
+
+def test_deadline_tie_is_on_time():
+    # 0.1 + 0.2 > 0.3 у float, але завершення в момент дедлайну — вчасне
+    assert 0.1 + 0.2 <= late_threshold(0.3)
+    profile = SojournProfile(sojourn2=[0.1 + 0.2, 0.5])
+    assert profile.violation_probability(0.3, 2) == 0.5
+
+
+def test_rare_event_estimate_agrees_with_plain_on_grid_deadline():
+    plain = _metric18(False, ON_GRID)
+    rare = _metric18(True, ON_GRID)
+    assert plain > 0
+    assert abs(rare - plain) < 0.15 * plain
+
+
+def test_rare_event_estimate_agrees_with_plain_off_grid_deadline():
+    params = dict(ON_GRID, D2=0.83)
+    plain = _metric18(False, params)
+    rare = _metric18(True, params)
+    assert abs(rare - plain) < 0.15 * plain
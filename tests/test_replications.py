@@ -0,0 +1,21 @@
+import numpy as np # type: ignore
+
+from simulation.priority_simulator import PriorityQueueSimulation
+from simulation.replications import replication_seeds, run_replications, t_quantile_975
+
+PARAMS = dict(lambda1=0.5, s1=0.7, s2=0.6, N=5000, D1=4, lambda2=0.3, s2b=0.9, D2=5)
+
+
+def test_replications_match_seeds_run_one_by_one():
+    summary = run_replications(PARAMS, R=5, seed=11, workers=2)
+
+    seeds = replication_seeds(5, 11)
+    assert summary['seeds'] == seeds
+    single = [PriorityQueueSimulation(seed=seed, engine="jit").run_simulation_priority2_full(**PARAMS)
+              for seed in seeds]
+    values = np.array([[float(result[m]) for m in summary['metrics']] for result in single])
+
+    assert np.array_equal(summary['values'], values, equal_nan=True)
+    assert np.allclose(summary['mean'], values.mean(axis=0), rtol=1e-12, equal_nan=True)
+    half_width = t_quantile_975(4) * values.std(axis=0, ddof=1) / np.sqrt(5)
+    assert np.allclose(summary['half_width'], half_width, rtol=1e-12, equal_nan=True)
@@ -0,0 +1,233 @@
+import os
+import pandas as pd
+from datetime import datetime
+from openpyxl.utils import get_column_letter
+from config import Config
+from simulation.deadlines import shared_deadline_seeds
+
+# ==================== РОБОТА З КНИГАМИ EXCEL (БЕЗ GUI) ====================
+# Спільна логіка для вкладок GUI та консольного запуску: перетворення вхідної
+# таблиці на набори параметрів і формування книги експорту.
+
+
+# Конвертує дані Excel у набір параметрів для симуляції (None — порожній стовпець)
+def excel_to_parameters(excel_data):
+    if excel_data is None:
+        return []
+
+    return [extract_column_params(excel_data, col) for col in range(1, excel_data.shape[1])]
+
+
+# Витягує параметри з одного стовпця
+def extract_column_params(excel_data, col):
+    if not column_has_data(excel_data, col):
+        return None
+
+    params = {}
+    try:
+        for row, param_name in enumerate(Config.PARAM_NAMES):
+            value_str = str(excel_data.iloc[row, col]).strip()
+
+            if param_name == 'N':
+                params[param_name] = int(float(value_str.replace(',', '.'))) if value_str else 0
+            else:
+                params[param_name] = convert_to_float(value_str)
+
+        if all(v == 0 or v == 0.0 for v in params.values()):
+            return None
+
+        return params
+
+    except Exception as e:
+        print(f"Помилка стовпця {col}: {e}")
+        return None
+
+
+# Перевіряє чи стовпець має хоча б одне непорожнє значення
+def column_has_data(excel_data, col):
+    for row in range(Config.MIN_ROWS):
+        cell_value = excel_data.iloc[row, col]
+        if pd.notna(cell_value) and str(cell_value).strip() != "":
+            return True
+    return False
+
+
+# Конвертує рядок у float
+def convert_to_float(value_str):
+    try:
+        clean_str = str(value_str).strip().replace(',', '.')
+        return float(clean_str) if clean_str else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+# Пари (номер показника, назва) для відображення і експорту: 1-18, процентилі
+# 19-28 (Config.REPORT_QUANTILES), 29-30 послідовної зупинки (Config.TARGET_REL_HALF_WIDTH)
+# 31-32 контрольних змінних (Config.CONTROL_VARIATES) і 33 умовної оцінки
+# рідкісних подій (Config.RARE_EVENT_MODE)
+def result_metrics():
+    metrics = list(enumerate(Config.METRIC_NAMES, 1))
+    if Config.REPORT_QUANTILES:
+        metrics += enumerate(Config.QUANTILE_METRIC_NAMES, 19)
+    if Config.TARGET_REL_HALF_WIDTH is not None:
+        metrics += enumerate(Config.SEQUENTIAL_METRIC_NAMES, 29)
+    if Config.CONTROL_VARIATES:
+        metrics += enumerate(Config.CONTROL_VARIATE_METRIC_NAMES, 31)
+    if Config.RARE_EVENT_MODE:
+        metrics += enumerate(Config.RARE_EVENT_METRIC_NAMES, 33)
+    return metrics
+
+
+# Правило послідовної зупинки для run_scenarios або None (фіксоване N)
+def stopping_rule(rel_half_width=None):
+    rel_half_width = rel_half_width or Config.TARGET_REL_HALF_WIDTH
+    if rel_half_width is None:
+        return None
+    return {'rel_half_width': rel_half_width,
+            'metrics': list(Config.PRECISION_METRICS),
+            'time_budget': Config.PRECISION_TIME_BUDGET}
+
+
+# Seed сценаріїв: BASE_SEED + i для стовпця i або, з Config.COMMON_RANDOM_NUMBERS, спільний
+# BASE_SEED + 1 для всіх (єдине джерело випадковості — потік подій типу 1, тож усі
+# сценарії отримують той самий потік рівномірних чисел, масштабований на 1/λ1)
+def scenario_seeds(parameters, common=None):
+    common = Config.COMMON_RANDOM_NUMBERS if common is None else common
+    if common:
+        return [Config.BASE_SEED + 1] * len(parameters)
+    seeds = [Config.BASE_SEED + i for i in range(1, len(parameters) + 1)]
+    if Config.SHARE_DEADLINE_RUNS:
+        # Стовпці, що відрізняються лише D1/D2, рахуються одним прогоном
+        seeds = shared_deadline_seeds(parameters, seeds)
+    return seeds
+
+
+# Ім'я файлу експорту з позначкою часу
+def export_file_name(timestamp=None):
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"симуляція_експорт_{timestamp}.xlsx"
+
+
+# Підготовка вхідних даних
+def prepare_input_data(excel_data):
+    input_df = excel_data.copy()
+
+    if input_df.shape[0] >= Config.MIN_ROWS:
+        param_names = Config.PARAMETER_NAMES[:Config.MIN_ROWS] + [""] * (input_df.shape[0] - Config.MIN_ROWS)
+        input_df.iloc[:, 0] = param_names
+        input_df.rename(columns={input_df.columns[0]: "Параметр"}, inplace=True)
+
+    for i in range(1, len(input_df.columns)):
+        input_df.rename(columns={input_df.columns[i]: f"Стовпець {i}"}, inplace=True)
+
+    return input_df
+
+
+# Підготовка результатів симуляції
+def prepare_results_data(simulation_results):
+    results_by_metric = []
+    valid_scenarios = empty_scenarios = 0 # Лічильники для статистики
+
+    for metric_idx, metric_label in result_metrics():
+        metric_row = {"Метрика": metric_label}
+
+        for scenario_idx, result in enumerate(simulation_results, 1):
+            if result is None:
+                metric_row[f"Сценарій {scenario_idx}"] = ""
+                if scenario_idx == 1: # Лічимо пусті сценарії тільки один раз
+                    empty_scenarios += 1
+            elif metric_idx in result:
+                value = result[metric_idx]
+                metric_row[f"Сценарій {scenario_idx}"] = format_export_value(value)
+            else:
+                metric_row[f"Сценарій {scenario_idx}"] = "(відсутня метрика)"
+
+        results_by_metric.append(metric_row)
+
+    valid_scenarios = len(simulation_results) - empty_scenarios
+    results_df = pd.DataFrame(results_by_metric)
+
+    stats = {'total': len(simulation_results),
+             'valid': valid_scenarios,
+             'empty': empty_scenarios }
+
+    return results_df, stats
+
+
+# Форматує значення для експорту
+def format_export_value(value):
+    if isinstance(value, str) and value == "Помилка":
+        return "Помилка"
+
+    if value is None:
+        return "(пропущено)"
+
+    if not isinstance(value, (int, float)):
+        return str(value)
+
+    try:
+        if value == 0:
+            return "0"
+        elif abs(value) >= 1000:
+            return f"{value:.2f}"
+        elif abs(value) >= 1:
+            return f"{value:.6f}"
+        else:
+            return f"{value:.8f}"
+    except:
+        return str(value)
+
+
+# Підготовка метаданих
+def prepare_metadata(simulation_results, file_name, export_folder, source_path=None):
+    valid_count = len([r for r in simulation_results if r is not None])
+    empty_count = len([r for r in simulation_results if r is None])
+
+    metadata = {
+        "Дата_експорту": [datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
+        "Ім'я_файлу": [file_name],
+        "Загальна_кількість_сценаріїв": [valid_count + empty_count],
+        "Валідних_сценаріїв": [valid_count],
+        "Порожніх_сценаріїв": [empty_count],
+        "Кількість_метрик": [len(result_metrics())],
+        "Версія_програми": ["1.0"],
+        "Оригінальний_файл": [os.path.basename(source_path) if source_path else "Не вказано"],
+        "Папка_збереження": [os.path.abspath(export_folder)]
+    }
+    # Додатковий стовпець — лише в режимі спільних випадкових чисел, щоб звичайні
+    # експорти зберігали попередній порядок полів
+    if Config.COMMON_RANDOM_NUMBERS:
+        metadata["Спільні_випадкові_числа"] = ["Так"]
+
+    return pd.DataFrame(metadata)
+
+
+# Експорт у Excel
+def export_to_excel(file_path, data_dict):
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        for sheet_name, df in data_dict.items():
+            sheet_name = str(sheet_name)[:31]
+
+            if not isinstance(df, pd.DataFrame):
+                df = pd.DataFrame(df)
+
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+            try:
+                worksheet = writer.sheets[sheet_name]
+                for idx, column in enumerate(df.columns, 1):
+                    try:
+                        if df[column].dtype == 'object':
+                            max_length = df[column].astype(str).str.len().max()
+                        else:
+                            max_length = max(df[column].astype(str).str.len().max(), len(str(df[column].dtype)))
+
+                        column_length = max(max_length, len(str(column))) + 2
+                        column_width = min(column_length, 50)
+
+                        column_letter = get_column_letter(idx)
+                        worksheet.column_dimensions[column_letter].width = column_width
+                    except:
+                        continue
+            except:
+                pass